@@ -0,0 +1,85 @@
+"""Бюджеты запросов к базе по действиям представлений.
+
+Представление объявляет, сколько запросов может сделать каждое действие:
+
+    class TitleViewSet(viewsets.ModelViewSet):
+        query_budget = {'list': 3, 'retrieve': 2}
+
+Ключи - действия viewset (list, create, ...), методы APIView (get, post)
+или имена представлений ModelAdmin (changelist_view). В тестах бюджеты
+проверяет фикстура assert_query_budget, при разработке - middleware:
+QUERY_BUDGET = 'log' пишет превышения в лог, 'raise' - падает с
+QueryBudgetExceeded. По умолчанию middleware убирает себя из цепочки.
+"""
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def get_budget(view_func, method):
+    """(имя действия, бюджет) для функции представления из urls.
+
+    Бюджет None - действие ничего не объявило.
+    """
+    owner = getattr(view_func, 'cls', None)
+    if owner is not None:
+        actions = getattr(view_func, 'actions', None)
+        name = actions.get(method.lower()) if actions else method.lower()
+        label = owner.__name__
+    elif hasattr(view_func, 'model_admin'):
+        # Представления ModelAdmin: обёртка из ModelAdmin.get_urls.
+        owner = view_func.model_admin
+        name = view_func.__name__
+        label = type(owner).__name__
+    else:
+        return view_func.__name__, None
+    budgets = getattr(owner, 'query_budget', None) or {}
+    return f'{label}.{name}', budgets.get(name)
+
+
+def over_budget(name, budget, queries):
+    """Текст ошибки, если запросов больше бюджета, иначе None."""
+    if budget is None or queries <= budget:
+        return None
+    return f'{name}: {queries} запросов к базе при бюджете {budget}'
+
+
+class QueryBudgetMiddleware:
+
+    def __init__(self, get_response):
+        if settings.QUERY_BUDGET not in ('log', 'raise'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.query_budget = None
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count))
+            response = self.get_response(request)
+        if request.query_budget is not None:
+            error = over_budget(*request.query_budget, queries)
+            if error and settings.QUERY_BUDGET == 'raise':
+                raise QueryBudgetExceeded(error)
+            if error:
+                logger.warning(error)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = get_budget(view_func, request.method)
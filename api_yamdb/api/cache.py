@@ -0,0 +1,127 @@
+import hashlib
+import math
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+from . import metrics
+
+GENERATION_KEY = 'catalog:generation'
+
+
+def _cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def generation(key):
+    """Текущее поколение данных под ключом key."""
+    cache = _cache()
+    value = cache.get(key)
+    if value is None:
+        # Если счётчик вытеснен из кэша, начинаем с текущего времени,
+        # чтобы не вернуться к одному из старых поколений.
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        value = cache.get(key)
+    return value
+
+
+def last_modified(key):
+    """Время последней записи под ключом key для Last-Modified.
+
+    Хранится с округлением вверх до секунды, как точен заголовок. Пока эта
+    секунда не прошла, возвращается None: ответ с ней дал бы 304 на
+    запись, сделанную в ту же секунду позже ответа.
+    """
+    cache = _cache()
+    value = cache.get(f'{key}:modified')
+    if value is None:
+        # Отметка вытеснена: считаем, что данные изменились сейчас.
+        cache.add(f'{key}:modified', math.ceil(time.time()), timeout=None)
+        value = cache.get(f'{key}:modified')
+    if value is None or value > time.time():
+        return None
+    return datetime.fromtimestamp(value, timezone.utc)
+
+
+def _bump(key):
+    cache = _cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        generation(key)
+    cache.set(f'{key}:modified', math.ceil(time.time()), timeout=None)
+    if settings.DATABASE_REPLICAS:
+        cache.set(f'{key}:written', True, settings.DB_REPLICA_PIN_SECONDS)
+
+
+def recently_written(key):
+    """Менялись ли данные под ключом key за время отставания реплик.
+
+    В это время ответ мог быть собран по старой реплике, и его нельзя
+    запоминать под новым поколением ни в кэше, ни в ETag.
+    """
+    return bool(settings.DATABASE_REPLICAS) and bool(
+        _cache().get(f'{key}:written')
+    )
+
+
+def bump_generation(key):
+    """Сдвигает поколение под ключом key.
+
+    Поколение сдвигается сразу и ещё раз после коммита: иначе параллельный
+    запрос успеет закэшировать в новом поколении данные до коммита.
+    После коммита обновляются и ответы в кэше nginx.
+    """
+    # edge импортирует этот модуль.
+    from .edge import purge
+
+    _bump(key)
+    transaction.on_commit(lambda: _bump(key))
+    transaction.on_commit(lambda: purge(key))
+
+
+def catalog_generation():
+    return generation(GENERATION_KEY)
+
+
+def catalog_last_modified():
+    return last_modified(GENERATION_KEY)
+
+
+def bump_catalog_generation():
+    """Инвалидирует все закэшированные ответы каталога."""
+    bump_generation(GENERATION_KEY)
+
+
+def request_digest(request):
+    query = '&'.join(
+        f'{name}={value}'
+        for name, values in sorted(request.query_params.lists())
+        for value in values
+    )
+    # В ключ входит хост: ссылки next/previous в ответе абсолютные.
+    url = f'{request.build_absolute_uri(request.path)}?{query}'
+    return hashlib.md5(url.encode()).hexdigest()
+
+
+def catalog_cache_key(request):
+    return f'catalog:{catalog_generation()}:{request_digest(request)}'
+
+
+def cached_response(view_method, request, *args, **kwargs):
+    """Отдаёт данные ответа из кэша или кладёт их туда после view_method."""
+    cache = _cache()
+    key = catalog_cache_key(request)
+    data = cache.get(key)
+    if data is not None:
+        metrics.incr('catalog_cache.hit')
+        return Response(data)
+    metrics.incr('catalog_cache.miss')
+    response = view_method(request, *args, **kwargs)
+    if response.status_code == 200 and not recently_written(GENERATION_KEY):
+        cache.set(key, response.data, settings.CATALOG_CACHE_TIMEOUT)
+    return response
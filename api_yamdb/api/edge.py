@@ -0,0 +1,149 @@
+"""Заголовки для кэша nginx и его обновление после изменений.
+
+Анонимные GET к каталогу, отзывам и комментариям получают Cache-Control с
+s-maxage и Surrogate-Key - тот же ключ поколения, что у кэша приложения
+(catalog:generation, reviews:<title_id>, comments:<review_id>). Когда ключ
+сдвигается, purge() перезапрашивает его адреса через внутренний порт nginx
+(EDGE_PURGE_URL) в обход кэша, и nginx сохраняет свежий ответ.
+
+Адреса ключа лежат в кэше по одному на слот (edge:url:<ключ>:<слот>),
+поэтому одновременные запросы не затирают друг друга. Обновления одного
+ключа схлопываются: пока обновление ждёт в очереди, новые сдвиги ключа его
+не дублируют; очередь ограничена EDGE_PURGE_MAX_PENDING ключами.
+"""
+import logging
+import re
+import threading
+import urllib.request
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from . import metrics
+from .cache import GENERATION_KEY, recently_written
+
+logger = logging.getLogger(__name__)
+
+KEYS = (
+    (re.compile(r'^/api/v1/titles/\d+/reviews/(?P<id>\d+)/comments/'),
+     'comments:{}'),
+    (re.compile(r'^/api/v1/titles/(?P<id>\d+)/reviews/'), 'reviews:{}'),
+    (re.compile(r'^/api/v1/(?P<id>titles|categories|genres)/'),
+     GENERATION_KEY),
+)
+
+# Один поток: обновления не должны отнимать воркеры у запросов.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='edge')
+# Ключи, обновление которых стоит в очереди и ещё не началось.
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def _cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def surrogate_key(path):
+    for pattern, template in KEYS:
+        match = pattern.match(path)
+        if match:
+            return template.format(match.group('id'))
+    return None
+
+
+def _slot_key(key, slot):
+    return f'edge:url:{key}:{slot}'
+
+
+def remember(key, request):
+    """Запоминает адрес, который nginx положил в кэш под ключом key.
+
+    Слот - crc32 адреса (hash() у процессов разный). Совпавшие адреса
+    вытесняют друг друга: не обновлённый из-за этого ответ доживёт свой
+    s-maxage.
+    """
+    url = (request.get_host(), request.get_full_path())
+    slot = zlib.crc32('{}{}'.format(*url).encode()) % (
+        settings.EDGE_PURGE_MAX_URLS
+    )
+    _cache().set(_slot_key(key, slot), url, None)
+
+
+def remembered(key):
+    """Адреса под ключом key, одним запросом к кэшу."""
+    return list(_cache().get_many([
+        _slot_key(key, slot)
+        for slot in range(settings.EDGE_PURGE_MAX_URLS)
+    ]).values())
+
+
+def purge(key):
+    """Обновляет в nginx ответы под ключом key; работает в фоне."""
+    if not settings.EDGE_PURGE_URL:
+        return
+    with _pending_lock:
+        if key in _pending:
+            metrics.incr('edge.refresh_coalesced')
+            return
+        if len(_pending) >= settings.EDGE_PURGE_MAX_PENDING:
+            # Ответ без обновления доживёт свой s-maxage.
+            metrics.incr('edge.refresh_dropped')
+            return
+        _pending.add(key)
+    _executor.submit(_refresh, key)
+
+
+def _refresh(key):
+    # Сдвиг ключа во время обновления поставит в очередь следующее:
+    # адреса, уже запрошенные здесь, могли получить старые данные.
+    with _pending_lock:
+        _pending.discard(key)
+    for host, path in remembered(key):
+        request = urllib.request.Request(
+            settings.EDGE_PURGE_URL + path, headers={'Host': host}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                response.read()
+        except OSError as error:
+            metrics.incr('edge.refresh_error')
+            logger.warning('Не удалось обновить %s%s: %s', host, path, error)
+        else:
+            metrics.incr('edge.refresh')
+
+
+class EdgeCacheMiddleware:
+    """Cache-Control, Vary и Surrogate-Key для кэша nginx."""
+    SAFE_METHODS = ('GET', 'HEAD')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in self.SAFE_METHODS:
+            return response
+        key = surrogate_key(request.path)
+        if key is None:
+            return response
+        patch_vary_headers(response, ('Authorization',))
+        if 'HTTP_AUTHORIZATION' in request.META:
+            patch_cache_control(response, private=True)
+            return response
+        # 304 тоже: по нему nginx продлевает запись (proxy_cache_revalidate).
+        if response.status_code not in (200, 304):
+            return response
+        # Пока реплики могут отставать, ответ живёт в nginx секунду: этого
+        # хватает, чтобы обновление из purge() заменило старую запись.
+        ttl = 1 if recently_written(key) else settings.EDGE_CACHE_TTL
+        patch_cache_control(
+            response, public=True, max_age=0, s_maxage=ttl,
+            stale_while_revalidate=settings.EDGE_CACHE_STALE,
+        )
+        response['Surrogate-Key'] = key
+        if settings.EDGE_PURGE_URL:
+            remember(key, request)
+        return response
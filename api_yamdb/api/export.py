@@ -0,0 +1,191 @@
+import csv
+import io
+import json
+from itertools import groupby
+from operator import itemgetter
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from reviews.models import Comment, GenreTitle, Review, Title
+
+CHUNK_SIZE = 2000
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+def iter_titles(chunk_size=CHUNK_SIZE, nested=False):
+    """Произведения пачками по id с категорией и жанрами.
+
+    prefetch_related не работает с iterator(), поэтому жанры каждой пачки
+    читаются отдельным запросом: два запроса на chunk_size произведений.
+    С nested у каждого произведения ещё отзывы с комментариями
+    (reviews_by_title).
+    """
+    last_id = 0
+    while True:
+        titles = list(
+            Title.objects.filter(id__gt=last_id)
+            .order_by('id')
+            .values('id', 'name', 'year', 'description', 'rating',
+                    'review_count', 'category__name', 'category__slug')
+            [:chunk_size]
+        )
+        if not titles:
+            return
+        first_id, last_id = titles[0]['id'], titles[-1]['id']
+        links = (
+            GenreTitle.objects
+            .filter(title_id__gte=first_id, title_id__lte=last_id)
+            .order_by('title_id', 'id')
+            .values_list('title_id', 'genre__name', 'genre__slug')
+        )
+        genres = {
+            title_id: [{'name': name, 'slug': slug}
+                       for _, name, slug in group]
+            for title_id, group in groupby(links, key=lambda link: link[0])
+        }
+        if nested:
+            reviews = reviews_by_title(first_id, last_id, chunk_size)
+            pending = next(reviews, None)
+        for title in titles:
+            record = {
+                'id': title['id'],
+                'name': title['name'],
+                'year': title['year'],
+                'description': title['description'],
+                'category': {
+                    'name': title['category__name'],
+                    'slug': title['category__slug'],
+                },
+                'genre': genres.get(title['id'], []),
+                'rating': title['rating'],
+                'review_count': title['review_count'],
+            }
+            if nested:
+                record['reviews'] = []
+                if pending is not None and pending[0] == title['id']:
+                    record['reviews'] = pending[1]
+                    pending = next(reviews, None)
+            yield record
+
+
+def reviews_by_title(first_id, last_id, chunk_size=CHUNK_SIZE):
+    """Пары (title_id, отзывы с комментариями) по возрастанию title_id.
+
+    Отзывы и комментарии диапазона произведений читаются двумя
+    iterator() в одном порядке и сливаются, поэтому в памяти только
+    отзывы одного произведения.
+    """
+    reviews = (
+        Review.objects
+        .filter(title_id__gte=first_id, title_id__lte=last_id)
+        .order_by('title_id', 'id')
+        .values_list('title_id', 'id', 'author__username', 'text', 'score',
+                     'pub_date')
+        .iterator(chunk_size=chunk_size)
+    )
+    comments = groupby(
+        Comment.objects
+        .filter(review__title_id__gte=first_id, review__title_id__lte=last_id)
+        .order_by('review__title_id', 'review_id', 'id')
+        .values_list('review_id', 'id', 'author__username', 'text',
+                     'pub_date')
+        .iterator(chunk_size=chunk_size),
+        key=itemgetter(0),
+    )
+    pending = next(comments, None)
+    for title_id, group in groupby(reviews, key=itemgetter(0)):
+        items = []
+        for _, id, author, text, score, pub_date in group:
+            review = {'id': id, 'text': text, 'author': author,
+                      'score': score, 'pub_date': pub_date, 'comments': []}
+            if pending is not None and pending[0] == id:
+                review['comments'] = [
+                    {'id': comment_id, 'text': comment_text,
+                     'author': comment_author, 'pub_date': comment_date}
+                    for _, comment_id, comment_author, comment_text,
+                    comment_date in pending[1]
+                ]
+                pending = next(comments, None)
+            items.append(review)
+        yield title_id, items
+
+
+def iter_reviews(chunk_size=CHUNK_SIZE):
+    """Отзывы в колонках review.csv из import_csv."""
+    reviews = Review.objects.order_by('id').values_list(
+        'id', 'title_id', 'author__username', 'text', 'score', 'pub_date'
+    )
+    for id, title, author, text, score, pub_date in reviews.iterator(
+        chunk_size=chunk_size
+    ):
+        yield {'id': id, 'title_id': title, 'text': text, 'author': author,
+               'score': score, 'pub_date': pub_date}
+
+
+def iter_comments(chunk_size=CHUNK_SIZE):
+    """Комментарии в колонках comments.csv из import_csv."""
+    comments = Comment.objects.order_by('id').values_list(
+        'id', 'review_id', 'author__username', 'text', 'pub_date'
+    )
+    for id, review, author, text, pub_date in comments.iterator(
+        chunk_size=chunk_size
+    ):
+        yield {'id': id, 'review_id': review, 'text': text,
+               'author': author, 'pub_date': pub_date}
+
+
+RESOURCES = {
+    'titles': iter_titles,
+    'reviews': iter_reviews,
+    'comments': iter_comments,
+}
+
+
+def _csv_value(value, encoder):
+    if isinstance(value, dict):
+        return value['slug']
+    if isinstance(value, list):
+        return ','.join(item['slug'] for item in value)
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return encoder.default(value)
+
+
+def stream(resource, output, chunk_size=CHUNK_SIZE, nested=False):
+    """Генератор текста выгрузки.
+
+    Первая запись (в CSV - с заголовком) уходит сразу, дальше - по куску
+    на chunk_size записей. nested - только для titles в NDJSON.
+    """
+    if nested:
+        records = iter_titles(chunk_size, nested=True)
+    else:
+        records = RESOURCES[resource](chunk_size)
+    encoder = DjangoJSONEncoder()
+    buffer = io.StringIO()
+    writer = None
+    count = 0
+    for record in records:
+        if output == 'csv':
+            if writer is None:
+                writer = csv.writer(buffer)
+                writer.writerow(record)
+            writer.writerow(
+                _csv_value(value, encoder) for value in record.values()
+            )
+        else:
+            buffer.write(json.dumps(
+                record, cls=DjangoJSONEncoder, ensure_ascii=False
+            ))
+            buffer.write('\n')
+        count += 1
+        if count == 1 or count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,92 @@
+"""HTTP/1.1-клиент на asyncio для нагрузочных замеров.
+
+Без сторонних зависимостей: одна корутина держит одно keep-alive
+соединение, тысячи соединений живут в одном процессе.
+"""
+import asyncio
+import json
+
+
+def percentile(values, share):
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+async def read_response(reader):
+    """Читает один ответ HTTP/1.1: статус, можно ли продолжать соединение
+    и тело.
+
+    Синхронные воркеры gunicorn закрывают соединение после каждого ответа.
+    """
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('Соединение закрыто сервером')
+    status = int(status_line.split()[1])
+    length = 0
+    chunked = False
+    keep_alive = True
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin1').partition(':')
+        name = name.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'transfer-encoding' and 'chunked' in value:
+            chunked = True
+        elif name == 'connection' and 'close' in value.lower():
+            keep_alive = False
+    if not chunked:
+        return status, keep_alive, await reader.readexactly(length)
+    chunks = []
+    while True:
+        size = int((await reader.readline()).split(b';')[0], 16)
+        chunks.append((await reader.readexactly(size + 2))[:-2])
+        if not size:
+            return status, keep_alive, b''.join(chunks)
+
+
+class Connection:
+    """Соединение с сервером; после Connection: close открывается заново."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, data=None, token=None):
+        """Отправляет запрос и возвращает статус и тело ответа."""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+        lines = [
+            f'{method} {path} HTTP/1.1',
+            f'Host: {self.host}',
+            'Accept: application/json',
+        ]
+        body = b''
+        if data is not None:
+            body = json.dumps(data).encode()
+            lines.append('Content-Type: application/json')
+            lines.append(f'Content-Length: {len(body)}')
+        if token is not None:
+            lines.append(f'Authorization: Bearer {token}')
+        head = '\r\n'.join(lines) + '\r\n\r\n'
+        self.writer.write(head.encode() + body)
+        try:
+            status, keep_alive, body = await read_response(self.reader)
+        except BaseException:
+            self.close()
+            raise
+        if not keep_alive:
+            self.close()
+        return status, body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
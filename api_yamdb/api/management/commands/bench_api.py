@@ -0,0 +1,415 @@
+import asyncio
+import json
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from urllib.parse import urlencode, urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import (ThreadedWSGIServer,
+                                          WSGIRequestHandler,
+                                          get_internal_wsgi_application)
+from django.db import connection
+from django.db.models import Count
+
+from api.loadtest import Connection, percentile
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+from users.tokens import make_confirmation_code
+
+# Доли маршрутов в смеси: больше всего анонимного чтения каталога.
+# signup - регистрация и сразу обмен кода на токен (маршрут token).
+MIX = {
+    'titles-list': 30,
+    'titles-detail': 10,
+    'categories-list': 4,
+    'genres-list': 4,
+    'reviews-list': 20,
+    'comments-list': 12,
+    'reviews-create': 8,
+    'comments-create': 8,
+    'signup': 4,
+}
+WRITES = ('reviews-create', 'comments-create')
+PAGE_SIZE = 10
+# Маршрут с меньшим числом запросов в любом из замеров не сравнивается.
+MIN_SAMPLES = 20
+NETWORK_ERRORS = (OSError, ValueError, asyncio.IncompleteReadError)
+# Пауза после сетевой ошибки: недоступный сервер не крутит цикл впустую.
+RETRY_DELAY = 0.05
+
+
+class QuietHandler(WSGIRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+
+def confirmation_code(username):
+    """Код подтверждения по базе. Выполняется в потоке исполнителя, чтобы
+    запрос к базе не останавливал цикл событий и остальных посетителей."""
+    try:
+        return make_confirmation_code(User.objects.get(username=username))
+    finally:
+        connection.close()
+
+
+def page(rng, count):
+    """Номер страницы: чаще первые, но не дальше последней."""
+    last = max(1, -(-count // PAGE_SIZE))
+    return min(last, 1 + int(rng.expovariate(0.7)))
+
+
+class Sample:
+    """Выборка из базы, по которой строятся адреса запросов."""
+
+    def __init__(self, rng, size):
+        ids = list(Title.objects.order_by('id').values_list('id', flat=True))
+        if not ids:
+            raise CommandError(
+                'База пуста: заполните её, например generate_data.'
+            )
+        chosen = rng.sample(ids, min(size, len(ids)))
+        titles = list(Title.objects.filter(id__in=chosen).order_by('id')
+                      .values_list('id', 'review_count', 'year', 'name'))
+        self.titles = [title_id for title_id, *_ in titles]
+        self.reviewed = [(title_id, count)
+                         for title_id, count, *_ in titles if count]
+        self.years = sorted({year for _, _, year, _ in titles})
+        self.words = sorted({name.split()[0].lower()
+                             for *_, name in titles if name.split()})
+        self.categories = list(
+            Category.objects.order_by('id').values_list('slug', flat=True)
+        )
+        self.genres = list(
+            Genre.objects.order_by('id').values_list('slug', flat=True)
+        )
+        last = Review.objects.order_by('-id').values_list(
+            'id', flat=True
+        ).first() or 0
+        review_ids = rng.sample(range(1, last + 1), min(size, last))
+        counts = dict(
+            Comment.objects.filter(review_id__in=review_ids).order_by()
+            .values('review_id').annotate(count=Count('id'))
+            .values_list('review_id', 'count')
+        )
+        self.reviews = [
+            (title_id, review_id, counts.get(review_id, 0))
+            for review_id, title_id in Review.objects.filter(
+                id__in=review_ids
+            ).order_by('id').values_list('id', 'title_id')
+        ]
+
+    def titles_query(self, rng):
+        """Фильтр списка произведений, как у посетителя каталога."""
+        options = [{}]
+        if self.categories:
+            options.append({'category': rng.choice(self.categories)})
+        if self.genres:
+            options.append({'genre': rng.choice(self.genres)})
+        options.append({'year': rng.choice(self.years)})
+        if self.words:
+            options.append({'name': rng.choice(self.words)})
+        query = rng.choice(options)
+        offset = rng.choice((0, 0, 0, 10, 20))
+        if offset:
+            query['offset'] = offset
+        return f'?{urlencode(query)}' if query else ''
+
+
+class Session:
+    """Один посетитель на одном соединении; пишет после регистрации."""
+
+    def __init__(self, traffic, number):
+        self.traffic = traffic
+        self.number = number
+        self.rng = random.Random(f'{traffic.seed}:{number}')
+        self.connection = Connection(traffic.host, traffic.port)
+        self.token = None
+        self.signups = 0
+        self.reviewed = set()
+
+    async def call(self, route, method, path, expected, data=None):
+        started = time.monotonic()
+        status, body = await self.connection.request(
+            method, self.traffic.prefix + path, data, self.token
+        )
+        self.traffic.record(route, started, status != expected)
+        return status == expected, body
+
+    async def run(self, deadline):
+        routes, weights = zip(*MIX.items())
+        try:
+            while time.monotonic() < deadline:
+                route = self.rng.choices(routes, weights)[0]
+                if route in WRITES and self.token is None:
+                    route = 'signup'
+                try:
+                    await getattr(self, route.replace('-', '_'))()
+                except NETWORK_ERRORS:
+                    # Посетитель не выбывает: иначе до конца замера
+                    # соединений меньше заданного. Следующий запрос
+                    # откроет новое соединение.
+                    self.traffic.record(route, None, True)
+                    self.connection.close()
+                    await asyncio.sleep(RETRY_DELAY)
+        finally:
+            self.connection.close()
+
+    async def titles_list(self):
+        query = self.traffic.sample.titles_query(self.rng)
+        await self.call('titles-list', 'GET', f'/titles/{query}', 200)
+
+    async def titles_detail(self):
+        title_id = self.rng.choice(self.traffic.sample.titles)
+        await self.call('titles-detail', 'GET', f'/titles/{title_id}/', 200)
+
+    async def categories_list(self):
+        await self.call('categories-list', 'GET', '/categories/', 200)
+
+    async def genres_list(self):
+        await self.call('genres-list', 'GET', '/genres/', 200)
+
+    async def reviews_list(self):
+        if not self.traffic.sample.reviewed:
+            return await self.titles_list()
+        title_id, count = self.rng.choice(self.traffic.sample.reviewed)
+        await self.call(
+            'reviews-list', 'GET',
+            f'/titles/{title_id}/reviews/?page={page(self.rng, count)}', 200,
+        )
+
+    async def comments_list(self):
+        if not self.traffic.sample.reviews:
+            return await self.titles_list()
+        title_id, review_id, count = self.rng.choice(
+            self.traffic.sample.reviews
+        )
+        await self.call(
+            'comments-list', 'GET',
+            f'/titles/{title_id}/reviews/{review_id}/comments/'
+            f'?page={page(self.rng, count)}', 200,
+        )
+
+    async def reviews_create(self):
+        title_id = self.rng.choice(self.traffic.sample.titles)
+        if title_id in self.reviewed:
+            # Второй отзыв на то же произведение запрещён.
+            return await self.titles_detail()
+        self.reviewed.add(title_id)
+        await self.call(
+            'reviews-create', 'POST', f'/titles/{title_id}/reviews/', 201,
+            {'text': 'Отзыв из нагрузочного замера.',
+             'score': self.rng.randint(1, 10)},
+        )
+
+    async def comments_create(self):
+        if not self.traffic.sample.reviews:
+            return await self.reviews_create()
+        title_id, review_id, _ = self.rng.choice(self.traffic.sample.reviews)
+        await self.call(
+            'comments-create', 'POST',
+            f'/titles/{title_id}/reviews/{review_id}/comments/', 201,
+            {'text': 'Комментарий из нагрузочного замера.'},
+        )
+
+    async def signup(self):
+        """Регистрация нового посетителя и обмен кода на токен.
+
+        Письмо с кодом не читается: код считается из базы так же, как его
+        считает сервер.
+        """
+        self.signups += 1
+        username = f'{self.traffic.user_prefix}-{self.number}-{self.signups}'
+        ok, _ = await self.call(
+            'signup', 'POST', '/auth/signup/', 200,
+            {'username': username, 'email': f'{username}@yamdb.fake'},
+        )
+        if not ok:
+            return
+        code = await asyncio.get_running_loop().run_in_executor(
+            None, confirmation_code, username
+        )
+        ok, body = await self.call(
+            'token', 'POST', '/auth/token/', 201,
+            {'username': username, 'confirmation_code': code},
+        )
+        if ok:
+            self.token = json.loads(body)['token']
+            self.reviewed = set()
+
+
+class Traffic:
+    """Смесь запросов от connections посетителей и её статистика."""
+
+    def __init__(self, url, sample, seed):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.prefix = parts.path.rstrip('/') + '/api/v1'
+        self.sample = sample
+        self.seed = seed
+        self.user_prefix = f'bench-{uuid.uuid4().hex[:8]}'
+        self.measured_from = None
+        self.stats = defaultdict(lambda: {'latencies': [], 'errors': 0})
+
+    def record(self, route, started, error):
+        if started is not None and started < self.measured_from:
+            return
+        stats = self.stats[route]
+        if started is not None:
+            stats['latencies'].append(time.monotonic() - started)
+        stats['errors'] += error
+
+    async def run(self, connections, warmup, duration):
+        self.measured_from = time.monotonic() + warmup
+        deadline = self.measured_from + duration
+        await asyncio.gather(*(
+            Session(self, number).run(deadline)
+            for number in range(connections)
+        ))
+        return time.monotonic() - self.measured_from
+
+    def cleanup(self):
+        # Отзывы и комментарии удаляются каскадом, рейтинги - сигналами.
+        User.objects.filter(username__startswith=self.user_prefix).delete()
+
+
+def summary(stats, elapsed):
+    routes = {}
+    for route in sorted(stats):
+        latencies = stats[route]['latencies']
+        routes[route] = {
+            'requests': len(latencies),
+            'errors': stats[route]['errors'],
+            'rps': round(len(latencies) / elapsed, 1),
+            'p50_ms': round(percentile(latencies, 0.5) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        }
+    requests = sum(route['requests'] for route in routes.values())
+    return {
+        'elapsed': round(elapsed, 2),
+        'requests': requests,
+        'errors': sum(route['errors'] for route in routes.values()),
+        'rps': round(requests / elapsed, 1),
+        'routes': routes,
+    }
+
+
+def regressions(result, baseline, threshold):
+    """Что ухудшилось больше чем на долю threshold: p95 маршрутов и общий
+    RPS."""
+    found = []
+    if result['rps'] < baseline['rps'] * (1 - threshold):
+        found.append(
+            f'RPS {result["rps"]} против {baseline["rps"]} в базовом замере'
+        )
+    for route, base in sorted(baseline['routes'].items()):
+        current = result['routes'].get(route)
+        if current is None or min(
+            current['requests'], base['requests']
+        ) < MIN_SAMPLES:
+            continue
+        if current['p95_ms'] > base['p95_ms'] * (1 + threshold):
+            found.append(
+                f'{route}: p95 {current["p95_ms"]} мс против '
+                f'{base["p95_ms"]} мс в базовом замере'
+            )
+    return found
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный замер всех маршрутов API смесью запросов: просмотр '
+        'каталога с фильтрами, страницы отзывов и комментариев, публикация '
+        'отзывов и комментариев, регистрация и получение токена. Печатает '
+        'RPS и p50/p95/p99 по маршрутам, сохраняет результат в JSON '
+        '(--save) и завершается ошибкой, если он хуже базового (--baseline) '
+        'больше чем на --threshold. Без --url поднимает сервер в процессе. '
+        'Созданных пользователей с их отзывами удаляет после замера.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url', help='Адрес запущенного сервера, например '
+                          'http://web:8000; он должен работать с той же базой.'
+        )
+        parser.add_argument('--connections', type=int, default=50)
+        parser.add_argument('--duration', type=float, default=30)
+        parser.add_argument(
+            '--warmup', type=float, default=3,
+            help='Секунды нагрузки в начале, которые не попадают в замер.'
+        )
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--sample', type=int, default=500,
+            help='Сколько произведений и отзывов брать в адреса запросов.'
+        )
+        parser.add_argument('--save', help='Файл для результата в JSON.')
+        parser.add_argument('--baseline', help='JSON базового замера.')
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Допустимое ухудшение, доля: 0.2 - на 20%%.'
+        )
+        parser.add_argument('--keep-data', action='store_true')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as file:
+                baseline = json.load(file)
+        sample = Sample(random.Random(options['seed']), options['sample'])
+
+        server = None
+        url = options['url']
+        if url is None:
+            server, url = self.boot()
+        traffic = Traffic(url, sample, options['seed'])
+        try:
+            elapsed = asyncio.run(traffic.run(
+                options['connections'], options['warmup'],
+                options['duration'],
+            ))
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+            if not options['keep_data']:
+                traffic.cleanup()
+
+        result = summary(traffic.stats, elapsed)
+        self.report(result)
+        if options['save']:
+            with open(options['save'], 'w', encoding='utf-8') as file:
+                json.dump(result, file, ensure_ascii=False, indent=2)
+        if baseline is not None:
+            found = regressions(result, baseline, options['threshold'])
+            if found:
+                raise CommandError('Регрессия: ' + '; '.join(found))
+            self.stdout.write(self.style.SUCCESS(
+                'Регрессий относительно базового замера нет.'
+            ))
+
+    def boot(self):
+        server = ThreadedWSGIServer(('127.0.0.1', 0), QuietHandler)
+        server.set_app(get_internal_wsgi_application())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server, f'http://127.0.0.1:{server.server_port}'
+
+    def report(self, result):
+        self.stdout.write(
+            f'{"маршрут":<16}{"запросов":>10}{"ошибок":>8}{"RPS":>9}'
+            f'{"p50, мс":>10}{"p95, мс":>10}{"p99, мс":>10}'
+        )
+        for route, row in result['routes'].items():
+            self.stdout.write(
+                f'{route:<16}{row["requests"]:>10}{row["errors"]:>8}'
+                f'{row["rps"]:>9.1f}{row["p50_ms"]:>10.1f}'
+                f'{row["p95_ms"]:>10.1f}{row["p99_ms"]:>10.1f}'
+            )
+        self.stdout.write(
+            f'{"всего":<16}{result["requests"]:>10}{result["errors"]:>8}'
+            f'{result["rps"]:>9.1f}'
+        )
@@ -0,0 +1,77 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.utils import load_backend
+
+MODES = {
+    # Как было: новое соединение на каждый запрос.
+    'connect': {'ENGINE': 'django.db.backends.postgresql',
+                'CONN_MAX_AGE': 0},
+    'persistent': {'ENGINE': 'api_yamdb.postgresql', 'CONN_MAX_AGE': 60,
+                   'CONN_HEALTH_CHECKS': True},
+    'pool': {'ENGINE': 'api_yamdb.postgresql', 'CONN_MAX_AGE': 0,
+             'CONN_HEALTH_CHECKS': True,
+             'POOL': {'MAX_SIZE': 4, 'IDLE_TIMEOUT': 300,
+                      'WAIT_TIMEOUT': 5}},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Замер задержки запроса к API при новом соединении на каждый запрос, '
+        'постоянных соединениях и пуле. Цикл запроса воспроизводится как в '
+        'Django: close_if_unusable_or_obsolete в начале и в конце.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument(
+            '--query', default='SELECT 1',
+            help='SQL, который выполняет каждый запрос.'
+        )
+
+    def handle(self, *args, **options):
+        default = connections['default'].settings_dict
+        if default['ENGINE'] not in (
+            'django.db.backends.postgresql', 'api_yamdb.postgresql'
+        ):
+            raise CommandError('Замер имеет смысл только на postgresql.')
+
+        self.stdout.write(
+            f'{"режим":<12}{"среднее, мс":>13}{"p50, мс":>10}'
+            f'{"p99, мс":>10}{"экономия, мс":>14}'
+        )
+        baseline = None
+        for mode, overrides in MODES.items():
+            settings_dict = {**default, 'POOL': {}, **overrides}
+            backend = load_backend(settings_dict['ENGINE'])
+            wrapper = backend.DatabaseWrapper(settings_dict, f'bench_{mode}')
+            latencies = self.measure(
+                wrapper, options['requests'], options['query']
+            )
+            wrapper.close()
+            mean = statistics.mean(latencies) * 1000
+            if baseline is None:
+                baseline = mean
+            p99 = sorted(latencies)[int(len(latencies) * 0.99)] * 1000
+            self.stdout.write(
+                f'{mode:<12}{mean:>13.2f}'
+                f'{statistics.median(latencies) * 1000:>10.2f}'
+                f'{p99:>10.2f}{baseline - mean:>14.2f}'
+            )
+
+    def measure(self, wrapper, requests, query):
+        latencies = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            wrapper.close_if_unusable_or_obsolete()
+            with wrapper.cursor() as cursor:
+                cursor.execute(query)
+                cursor.fetchall()
+            # При CONN_MAX_AGE = 0 здесь соединение закрывается или
+            # возвращается в пул.
+            wrapper.close_if_unusable_or_obsolete()
+            latencies.append(time.perf_counter() - started)
+        return latencies
@@ -0,0 +1,68 @@
+import io
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.management.commands.bench_serializers import RESOURCES, best_of
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer, orjson
+
+
+class Command(BaseCommand):
+    help = (
+        'Замер JSON: JSONRenderer/JSONParser DRF против FastJSONRenderer/'
+        'FastJSONParser (orjson) на страницах списков из базы, МБ в '
+        'секунду. Заодно проверяет, что байты и разобранные данные '
+        'совпадают.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'resource', nargs='*',
+            help=f'{", ".join(RESOURCES)}; по умолчанию все.'
+        )
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError('orjson не установлен')
+        rows, repeat = options['rows'], options['repeat']
+        unknown = set(options['resource']) - set(RESOURCES)
+        if unknown:
+            raise CommandError(f'Нет ресурсов: {", ".join(sorted(unknown))}')
+        self.stdout.write(
+            f'{"ресурс":<12}{"КБ":>8}{"render DRF":>12}{"orjson":>10}'
+            f'{"parse DRF":>12}{"orjson":>10}'
+        )
+        for name in options['resource'] or RESOURCES:
+            _, projection, queryset = RESOURCES[name]
+            data = {'count': rows, 'next': None, 'previous': None,
+                    'results': projection.represent(
+                        projection.values(queryset())[:rows]
+                    )}
+            slow_render, expected = best_of(
+                repeat, lambda: JSONRenderer().render(data)
+            )
+            fast_render, actual = best_of(
+                repeat, lambda: FastJSONRenderer().render(data)
+            )
+            if actual != expected:
+                raise CommandError(f'{name}: рендер отличается от DRF')
+            slow_parse, expected = best_of(
+                repeat, lambda: JSONParser().parse(io.BytesIO(actual))
+            )
+            fast_parse, parsed = best_of(
+                repeat, lambda: FastJSONParser().parse(io.BytesIO(actual))
+            )
+            if parsed != expected:
+                raise CommandError(f'{name}: разбор отличается от DRF')
+            megabytes = len(actual) / 2 ** 20
+            self.stdout.write(
+                f'{name:<12}{len(actual) / 1024:>8.0f}'
+                f'{megabytes / slow_render:>12.0f}'
+                f'{megabytes / fast_render:>10.0f}'
+                f'{megabytes / slow_parse:>12.0f}'
+                f'{megabytes / fast_parse:>10.0f}'
+            )
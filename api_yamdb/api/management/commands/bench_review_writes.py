@@ -0,0 +1,118 @@
+import statistics
+import threading
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Avg, Count
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from reviews.models import Category, Review, Title
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный замер: параллельные POST отзывов на одно произведение. '
+        'Создаёт временные данные и удаляет их после замера. '
+        'Имеет смысл на postgresql: sqlite выполняет записи по очереди.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8)
+        parser.add_argument('--reviews-per-writer', type=int, default=50)
+
+    def handle(self, *args, **options):
+        writers = options['writers']
+        per_writer = options['reviews_per_writer']
+        prefix = f'bench-{uuid.uuid4().hex[:8]}'
+        category = Category.objects.create(name=prefix, slug=prefix)
+        title = Title.objects.create(name=prefix, year=2000,
+                                     category=category)
+        User.objects.bulk_create(
+            User(username=f'{prefix}-{number}',
+                 email=f'{prefix}-{number}@yamdb.fake')
+            for number in range(writers * per_writer)
+        )
+        users = list(User.objects.filter(username__startswith=prefix))
+        try:
+            latencies, errors, elapsed = self.run(
+                title, users, writers, per_writer
+            )
+            self.report(title, latencies, errors, elapsed)
+        finally:
+            title.delete()
+            category.delete()
+            User.objects.filter(username__startswith=prefix).delete()
+
+    def run(self, title, users, writers, per_writer):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(writers + 1)
+
+        def writer(batch):
+            clients = []
+            for user in batch:
+                client = APIClient()
+                client.credentials(HTTP_AUTHORIZATION='Bearer {}'.format(
+                    RefreshToken.for_user(user).access_token
+                ))
+                clients.append(client)
+            barrier.wait()
+            for number, client in enumerate(clients):
+                started = time.perf_counter()
+                response = client.post(
+                    url, {'text': 'bench', 'score': number % 10 + 1}
+                )
+                spent = time.perf_counter() - started
+                with lock:
+                    latencies.append(spent)
+                    if response.status_code != 201:
+                        errors.append(response.status_code)
+            connection.close()
+
+        threads = [
+            threading.Thread(
+                target=writer,
+                args=(users[number::writers],),
+            )
+            for number in range(writers)
+        ]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        return latencies, errors, time.perf_counter() - started
+
+    def report(self, title, latencies, errors, elapsed):
+        title.refresh_from_db()
+        expected = Review.objects.filter(title=title).aggregate(
+            count=Count('pk'), rating=Avg('score')
+        )
+        if (title.review_count, title.rating) != (
+            expected['count'], expected['rating']
+        ):
+            raise CommandError(
+                f'Агрегаты разошлись: {title.review_count}/{title.rating}, '
+                f'в отзывах {expected["count"]}/{expected["rating"]}'
+            )
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        self.stdout.write(
+            f'POST: {len(latencies)}, ошибок: {len(errors)}, '
+            f'{len(latencies) / elapsed:.1f} запросов/с, '
+            f'p50 {statistics.median(latencies) * 1000:.1f} мс, '
+            f'p99 {p99 * 1000:.1f} мс'
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Агрегаты сходятся: {title.review_count} отзывов, '
+            f'рейтинг {title.rating}'
+        ))
@@ -0,0 +1,86 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+
+from api import projections
+from api.serializers import (CategorySerializer, CommentsSerializer,
+                             GenreSerializer, ReviewsSerializer,
+                             TitleSerializer)
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+
+# Выборки как в get_queryset представлений для list.
+RESOURCES = {
+    'titles': (
+        TitleSerializer, projections.TitleProjection(),
+        lambda: Title.objects.select_related('category').prefetch_related(
+            Prefetch('genretitle_set',
+                     queryset=GenreTitle.objects.select_related(
+                         'genre'
+                     ).order_by('id'))
+        ),
+    ),
+    'categories': (CategorySerializer, projections.CategoryProjection(),
+                   lambda: Category.objects.all()),
+    'genres': (GenreSerializer, projections.GenreProjection(),
+               lambda: Genre.objects.all()),
+    'reviews': (ReviewsSerializer, projections.ReviewProjection(),
+                lambda: Review.objects.select_related('author')),
+    'comments': (CommentsSerializer, projections.CommentProjection(),
+                 lambda: Comment.objects.select_related('author')),
+}
+
+
+def best_of(repeat, function):
+    """Лучшее время из repeat запусков и результат последнего."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+class Command(BaseCommand):
+    help = (
+        'Замер чтения списков: сериализаторы DRF против projection на '
+        'values() (api/projections.py), объектов в секунду вместе с '
+        'запросом к базе. Заодно проверяет, что JSON совпадает байт в байт.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'resource', nargs='*',
+            help=f'{", ".join(RESOURCES)}; по умолчанию все.'
+        )
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        unknown = set(options['resource']) - set(RESOURCES)
+        if unknown:
+            raise CommandError(f'Нет ресурсов: {", ".join(sorted(unknown))}')
+        self.stdout.write(
+            f'{"ресурс":<12}{"объектов":>10}{"DRF, об/с":>14}'
+            f'{"values(), об/с":>16}{"ускорение":>11}'
+        )
+        for name in options['resource'] or RESOURCES:
+            serializer_class, projection, queryset = RESOURCES[name]
+            slow, expected = best_of(repeat, lambda: serializer_class(
+                list(queryset()[:rows]), many=True
+            ).data)
+            fast, actual = best_of(repeat, lambda: projection.represent(
+                projection.values(queryset())[:rows]
+            ))
+            if JSONRenderer().render(actual) != (
+                JSONRenderer().render(expected)
+            ):
+                raise CommandError(f'{name}: JSON отличается от DRF')
+            count = len(actual)
+            self.stdout.write(
+                f'{name:<12}{count:>10}{count / slow:>14.0f}'
+                f'{count / fast:>16.0f}{slow / fast:>10.1f}x'
+            )
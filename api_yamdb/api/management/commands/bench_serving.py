@@ -0,0 +1,103 @@
+import asyncio
+import itertools
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.loadtest import Connection, percentile
+
+READ_PATHS = (
+    '/api/v1/titles/',
+    '/api/v1/categories/',
+    '/api/v1/genres/',
+)
+
+
+async def connection_loop(host, port, paths, deadline, stats):
+    """Одно соединение: запросы подряд до истечения времени."""
+    connection = Connection(host, port)
+    try:
+        for path in paths:
+            if time.monotonic() >= deadline:
+                break
+            started = time.monotonic()
+            status, _ = await connection.request('GET', path)
+            stats['latencies'].append(time.monotonic() - started)
+            if status >= 400:
+                stats['errors'] += 1
+    except (OSError, ValueError, asyncio.IncompleteReadError):
+        stats['errors'] += 1
+    finally:
+        connection.close()
+
+
+async def run_load(url, paths, connections, duration):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    prefix = parts.path.rstrip('/')
+    stats = {'latencies': [], 'errors': 0}
+    started = time.monotonic()
+    deadline = started + duration
+    await asyncio.gather(*(
+        connection_loop(
+            host, port,
+            # Соединения начинают с разных путей, чтобы не идти строем.
+            itertools.islice(
+                itertools.cycle(prefix + path for path in paths),
+                number % len(paths), None,
+            ),
+            deadline, stats,
+        )
+        for number in range(connections)
+    ))
+    stats['elapsed'] = time.monotonic() - started
+    return stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный замер чтения по HTTP: запросы в секунду и p99 для '
+        'одного или нескольких уже запущенных серверов, например WSGI- и '
+        'ASGI-профиля: --target wsgi=http://web:8000 '
+        '--target asgi=http://web-asgi:8000.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target', action='append', required=True,
+            help='ИМЯ=URL сервера; можно указать несколько раз.'
+        )
+        parser.add_argument(
+            '--path', action='append',
+            help=f'Путь для GET; по умолчанию {", ".join(READ_PATHS)}.'
+        )
+        parser.add_argument('--connections', type=int, default=500)
+        parser.add_argument('--duration', type=float, default=30)
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options['target']:
+            name, _, url = target.partition('=')
+            if not url.startswith('http://'):
+                raise CommandError(f'Ожидается ИМЯ=http://..., а не {target}')
+            targets.append((name, url))
+        paths = options['path'] or READ_PATHS
+
+        self.stdout.write(
+            f'{"профиль":<10}{"запросов":>10}{"ошибок":>8}{"RPS":>10}'
+            f'{"p50, мс":>10}{"p99, мс":>10}'
+        )
+        for name, url in targets:
+            stats = asyncio.run(run_load(
+                url, paths, options['connections'], options['duration']
+            ))
+            latencies = stats['latencies']
+            rps = len(latencies) / stats['elapsed']
+            p50 = statistics.median(latencies) * 1000 if latencies else 0
+            p99 = percentile(latencies, 0.99) * 1000
+            self.stdout.write(
+                f'{name:<10}{len(latencies):>10}{stats["errors"]:>8}'
+                f'{rps:>10.0f}{p50:>10.1f}{p99:>10.1f}'
+            )
@@ -0,0 +1,50 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import export
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает произведения, отзывы или комментарии в NDJSON или CSV '
+        'потоком, без загрузки всей таблицы в память. С --nested - '
+        'произведения вместе с отзывами и комментариями.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'resource', nargs='?', default='titles',
+            choices=sorted(export.RESOURCES),
+        )
+        parser.add_argument(
+            '--output', default='ndjson', choices=sorted(export.FORMATS)
+        )
+        parser.add_argument(
+            '--file', help='Файл для записи, по умолчанию stdout.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=export.CHUNK_SIZE
+        )
+        parser.add_argument(
+            '--nested', action='store_true',
+            help='Отзывы с комментариями внутри произведений (titles, '
+                 'ndjson).'
+        )
+
+    def handle(self, *args, **options):
+        if options['nested'] and (
+            options['resource'], options['output']
+        ) != ('titles', 'ndjson'):
+            raise CommandError('--nested - только для titles в ndjson.')
+        chunks = export.stream(
+            options['resource'], options['output'], options['chunk_size'],
+            nested=options['nested'],
+        )
+        if not options['file']:
+            for chunk in chunks:
+                sys.stdout.write(chunk)
+            return
+        with open(options['file'], 'w', newline='', encoding='utf-8') as file:
+            for chunk in chunks:
+                file.write(chunk)
@@ -0,0 +1,17 @@
+import threading
+from collections import Counter
+
+_lock = threading.Lock()
+_counters = Counter()
+
+
+def incr(name, value=1):
+    """Увеличивает счётчик процесса."""
+    with _lock:
+        _counters[name] += value
+
+
+def snapshot():
+    """Возвращает копию всех счётчиков процесса."""
+    with _lock:
+        return dict(_counters)
@@ -1,4 +1,51 @@
+import calendar
+import hashlib
+
+from django.db.models import Count, Max
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from rest_framework import mixins, viewsets
+from rest_framework.response import Response
+
+from reviews.models import Review, Title
+from .cache import (cached_response, generation, last_modified,
+                    recently_written, request_digest)
+from .timing import phase
+
+
+class TimingMixin:
+    """Фазы auth, serialize и app для Server-Timing (api.timing)."""
+
+    def initial(self, request, *args, **kwargs):
+        timing = getattr(request, 'timing', None)
+        if timing is None:
+            return super().initial(request, *args, **kwargs)
+        with timing.phase('auth'):
+            super().initial(request, *args, **kwargs)
+        timing.handler_started()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        timing = getattr(request, 'timing', None)
+        if timing is not None:
+            timing.handler_finished()
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if getattr(self.request, 'timing', None) is not None:
+            # Проверка данных и представление - фаза serialize.
+            for name in ('run_validation', 'to_representation'):
+                setattr(serializer, name, self._serialize_phase(
+                    getattr(serializer, name)
+                ))
+        return serializer
+
+    def _serialize_phase(self, method):
+        def timed(*args, **kwargs):
+            with phase(self.request, 'serialize'):
+                return method(*args, **kwargs)
+        return timed
 
 
 class ReadOrCreateOrDeleteViewSet(
@@ -8,3 +55,136 @@ class ReadOrCreateOrDeleteViewSet(
     viewsets.GenericViewSet
 ):
     pass
+
+
+class ProjectionListMixin:
+    """list без экземпляров моделей: словари из projection
+    (api/projections.py) с тем же JSON, что у serializer_class."""
+    projection = None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.projection.values(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            with phase(request, 'serialize'):
+                data = self.projection.represent(page)
+            return self.get_paginated_response(data)
+        with phase(request, 'serialize'):
+            data = self.projection.represent(queryset)
+        return Response(data)
+
+
+class CatalogCacheMixin:
+    """Кэширует list до следующего изменения каталога."""
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(super().list, request, *args, **kwargs)
+
+
+class CatalogDetailCacheMixin(CatalogCacheMixin):
+    """Кэширует list и retrieve до следующего изменения каталога.
+
+    Отдельно от CatalogCacheMixin: по наличию retrieve роутер решает,
+    открывать ли GET к записи.
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(super().retrieve, request, *args, **kwargs)
+
+
+class ConditionalGetMixin:
+    """Отвечает 304 на If-None-Match/If-Modified-Since без сериализации.
+
+    Валидаторы (etag, last_modified) возвращает get_validators().
+    """
+
+    def get_validators(self, request):
+        return None, None
+
+    def aggregate_validators(self, queryset, version_key):
+        """ETag по COUNT, MAX(id) и MAX(pub_date) выборки.
+
+        Правки записей этих агрегатов не меняют, поэтому в ETag входит
+        ещё поколение version_key, которое сдвигают сигналы моделей.
+        Last-Modified - время последнего сдвига этого поколения, а не
+        MAX(pub_date): тот не растёт при правке и уменьшается при удалении.
+        """
+        if recently_written(version_key):
+            return None, None
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        if lookup in self.kwargs:
+            queryset = queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup]}
+            )
+        stats = queryset.order_by().aggregate(
+            count=Count('pk'),
+            last_id=Max('pk'),
+            last_modified=Max('pub_date'),
+        )
+        etag = hashlib.md5('{}:{}:{}:{}:{}'.format(
+            stats['count'],
+            stats['last_id'],
+            stats['last_modified'],
+            generation(version_key),
+            request_digest(self.request),
+        ).encode()).hexdigest()
+        return etag, last_modified(version_key)
+
+    def conditional_response(self, view_method, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        if etag is not None:
+            etag = quote_etag(etag)
+        if last_modified is not None:
+            last_modified = calendar.timegm(last_modified.utctimetuple())
+        response = get_conditional_response(
+            request._request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = view_method(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        if etag is not None:
+            response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class NestedResourceMixin:
+    """Находит родительские произведение и отзыв один раз за запрос.
+
+    Результат хранится на request, поэтому get_queryset, create и
+    perform_create не повторяют запрос. Отзыв ищется вместе с
+    произведением по паре (review_id, title_id): чужая пара даёт 404.
+    """
+
+    def get_title(self):
+        if not hasattr(self.request, 'nested_title'):
+            if 'review_id' in self.kwargs:
+                self.request.nested_title = self.get_review().title
+            else:
+                self.request.nested_title = get_object_or_404(
+                    Title, id=self.kwargs.get('title_id')
+                )
+        return self.request.nested_title
+
+    def get_review(self):
+        if not hasattr(self.request, 'nested_review'):
+            self.request.nested_review = get_object_or_404(
+                Review.objects.select_related('title'),
+                id=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id'),
+            )
+        return self.request.nested_review
@@ -1,5 +1,53 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import (CursorPagination,
+                                       LimitOffsetPagination,
+                                       PageNumberPagination)
 
 
-class DefaultPagination(PageNumberPagination):
+class KeysetPagination(CursorPagination):
+    """Курсорная пагинация без COUNT(*) и OFFSET.
+
+    Порядок берётся из атрибута cursor_ordering представления.
+    """
     page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    def __init__(self, ordering):
+        self.ordering = ordering
+
+
+class CursorOptInMixin:
+    """Включает курсорную пагинацию, если в запросе есть параметр cursor.
+
+    Пустое значение (?cursor=) открывает первую страницу, дальше клиент
+    переходит по ссылкам next/previous. Без параметра работает обычная
+    пагинация, поэтому старые клиенты ничего не замечают.
+    """
+    keyset = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = getattr(view, 'cursor_ordering', None)
+        if ordering and KeysetPagination.cursor_query_param in (
+            request.query_params
+        ):
+            self.keyset = KeysetPagination(ordering)
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.keyset is not None:
+            return self.keyset.to_html()
+        return super().to_html()
+
+
+class DefaultPagination(CursorOptInMixin, PageNumberPagination):
+    page_size = 10
+
+
+class DefaultLimitOffsetPagination(CursorOptInMixin, LimitOffsetPagination):
+    pass
@@ -0,0 +1,32 @@
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from .renderers import FastJSONRenderer, orjson
+
+# Целые длиннее 64 бит orjson молча читает как float. Такие тела разбирает
+# DRF; искать 20 цифр подряд через translate намного быстрее регулярки.
+DIGITS_TO_ZERO = bytes.maketrans(b'123456789', b'000000000')
+LONG_NUMBER = b'0' * 20
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser на orjson; без orjson и для тел не в UTF-8 - DRF."""
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower() not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        if LONG_NUMBER in body.translate(DIGITS_TO_ZERO):
+            return super().parse(io.BytesIO(body), media_type,
+                                 parser_context)
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            # Текст ошибки - как у DRF.
+            return super().parse(io.BytesIO(body), media_type,
+                                 parser_context)
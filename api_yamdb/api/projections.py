@@ -0,0 +1,134 @@
+"""Быстрое чтение списков: values() вместо экземпляров моделей.
+
+Projection берёт из выборки только колонки ответа (жанры произведений -
+ещё одним запросом на страницу) и собирает словари сам, без полей
+сериализатора на каждую строку. Ключи и их порядок, а также формат дат
+берутся из сериализатора ответа, поэтому JSON совпадает с ним байт в байт.
+"""
+from itertools import groupby
+from operator import itemgetter
+
+from rest_framework import serializers
+
+from reviews.models import GenreTitle
+from .serializers import (CategorySerializer, CommentsSerializer,
+                          GenreSerializer, ReviewsSerializer,
+                          TitleSerializer)
+
+
+class Projection:
+    serializer_class = None
+    # Поле ответа -> колонка values(). Поля без колонки дополняет
+    # represent() наследника.
+    columns = {}
+    extra_columns = ()
+
+    def __init__(self):
+        self._layout = None
+
+    def layout(self):
+        """[(поле, колонка, преобразование)] в порядке полей сериализатора."""
+        if self._layout is None:
+            self._layout = [
+                (name, self.columns.get(name), self.converter(field))
+                for name, field in self.serializer_class().fields.items()
+            ]
+        return self._layout
+
+    @staticmethod
+    def converter(field):
+        # Даты DRF переводит в текущую зону и форматирует сам.
+        if isinstance(field, (serializers.DateTimeField,
+                              serializers.DateField)):
+            return field.to_representation
+        return None
+
+    def values(self, queryset):
+        """Выборка словарей; её можно отдать пагинатору."""
+        return queryset.prefetch_related(None).values(
+            *self.columns.values(), *self.extra_columns
+        )
+
+    def represent(self, rows):
+        layout = self.layout()
+        items = []
+        for row in rows:
+            item = {}
+            for name, column, convert in layout:
+                value = row[column] if column is not None else None
+                if convert is not None and value is not None:
+                    value = convert(value)
+                item[name] = value
+            items.append(item)
+        return items
+
+
+class NamedProjection(Projection):
+    columns = {'name': 'name', 'slug': 'slug'}
+
+
+class CategoryProjection(NamedProjection):
+    serializer_class = CategorySerializer
+
+
+class GenreProjection(NamedProjection):
+    serializer_class = GenreSerializer
+
+
+class TitleProjection(Projection):
+    serializer_class = TitleSerializer
+    columns = {
+        'id': 'id',
+        'rating': 'rating',
+        'name': 'name',
+        'year': 'year',
+        'description': 'description',
+    }
+    extra_columns = ('category__name', 'category__slug')
+
+    def represent(self, rows):
+        rows = list(rows)
+        genres = title_genres([row['id'] for row in rows])
+        items = super().represent(rows)
+        for item, row in zip(items, rows):
+            item['genre'] = genres.get(row['id'], [])
+            item['category'] = {
+                'name': row['category__name'],
+                'slug': row['category__slug'],
+            }
+        return items
+
+
+def title_genres(title_ids):
+    """Жанры произведений одним запросом, в порядке связей."""
+    links = (
+        GenreTitle.objects.filter(title_id__in=title_ids)
+        .order_by('title_id', 'id')
+        .values_list('title_id', 'genre__name', 'genre__slug')
+    )
+    return {
+        title_id: [{'name': name, 'slug': slug} for _, name, slug in group]
+        for title_id, group in groupby(links, key=itemgetter(0))
+    }
+
+
+class ReviewProjection(Projection):
+    serializer_class = ReviewsSerializer
+    columns = {
+        'id': 'id',
+        'author': 'author__username',
+        'text': 'text',
+        'score': 'score',
+        'pub_date': 'pub_date',
+        'title': 'title',
+    }
+
+
+class CommentProjection(Projection):
+    serializer_class = CommentsSerializer
+    columns = {
+        'id': 'id',
+        'text': 'text',
+        'author': 'author__username',
+        'pub_date': 'pub_date',
+    }
@@ -0,0 +1,49 @@
+"""JSON через orjson, если он установлен; без него - JSONRenderer DRF.
+
+Вывод совпадает с DRF при его настройках по умолчанию (UNICODE_JSON,
+COMPACT_JSON): даты, Decimal, ленивые строки переводов и остальные типы
+вне JSON orjson передаёт кодировщику DRF. С отступами (?indent, browsable
+API) и то, чего orjson не умеет (целые больше 64 бит), рендерит DRF.
+Отличия: NaN и бесконечность orjson пишет как null, а не падает с
+ValueError; экспоненту у float пишет короче (1e-7 вместо 1e-07) - значение
+то же, а рейтинги и прочие числа API в экспоненту не попадают.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+# DRF экранирует эти символы: JSON остаётся подмножеством JavaScript.
+LINE_SEPARATORS = (
+    ('\u2028'.encode(), b'\\u2028'),
+    ('\u2029'.encode(), b'\\u2029'),
+)
+
+encode_default = JSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None or self.ensure_ascii
+                or not self.compact
+                or self.get_indent(accepted_media_type,
+                                   renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        try:
+            result = orjson.dumps(data, default=encode_default,
+                                  option=OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        for char, escaped in LINE_SEPARATORS:
+            if char in result:
+                result = result.replace(char, escaped)
+        return result
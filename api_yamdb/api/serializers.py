@@ -1,8 +1,10 @@
 from django.utils.timezone import now
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.db.models import Q
 from rest_framework import serializers
 from rest_framework.relations import SlugRelatedField
-from django.db.models import Avg
+from rest_framework.settings import api_settings
 
 from reviews.models import (
     Title,
@@ -44,15 +46,19 @@ class CategorySerializer(serializers.ModelSerializer):
 class TitleSerializer(serializers.ModelSerializer):
     genre = GenreTitleSerializer(source='genretitle_set', many=True)
     category = CategorySerializer()
-    rating = serializers.SerializerMethodField()
+    rating = serializers.ReadOnlyField()
 
     class Meta:
         model = Title
-        fields = ('__all__')
-
-    def get_rating(self, obj):
-        rating = obj.reviews.aggregate(Avg('score')).get('score__avg')
-        return rating
+        fields = (
+            'id',
+            'genre',
+            'category',
+            'rating',
+            'name',
+            'year',
+            'description',
+        )
 
 
 class TitlePostSerializer(serializers.ModelSerializer):
@@ -95,17 +101,22 @@ class ReviewsSerializer(serializers.ModelSerializer):
         model = Review
         read_only_fields = ['title']
 
-    def validate(self, data):
-        if self.context['request'].method == 'POST':
-            title_id = (
-                self.context['request'].parser_context['kwargs']['title_id']
-            )
-            user = self.context['request'].user
-            if user.reviews.filter(title_id=title_id).exists():
-                raise serializers.ValidationError(
+    def create(self, validated_data):
+        # Повторный отзыв отсекает ограничение unique_review в базе.
+        try:
+            return super().create(validated_data)
+        except IntegrityError:
+            # Остальные нарушения целостности - ошибки, а не ввод клиента.
+            if not Review.objects.filter(
+                title_id=validated_data['title_id'],
+                author=validated_data['author'],
+            ).exists():
+                raise
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
                     'Нельзя оставить отзыв на одно произведение дважды'
-                )
-        return data
+                ]
+            })
 
     def validate_score(self, value):
         if 0 >= value >= 10:
@@ -135,27 +146,31 @@ class UserCreateSerializer(serializers.ModelSerializer):
         if value == 'me':
             raise serializers.ValidationError(
                 'Cannot create user with username="me"')
-        check_query = User.objects.filter(username=value)
-        if check_query.exists():
-            raise serializers.ValidationError(
-                'Cannot create a user whose username is already in use')
-        return value
-
-    def validate_email(self, value):
-        check_query = User.objects.filter(email=value)
-        if check_query.exists():
-            raise serializers.ValidationError(
-                'Cannot create a user whose email is already in use')
         return value
 
+    def validate(self, data):
+        # Занятость имени и почты проверяется одним запросом.
+        taken = User.objects.filter(
+            Q(username=data['username']) | Q(email=data['email'])
+        ).order_by().values_list('username', 'email')
+        errors = {}
+        for username, email in taken:
+            if username == data['username']:
+                errors['username'] = [
+                    'Cannot create a user whose username is already in use'
+                ]
+            if email == data['email']:
+                errors['email'] = [
+                    'Cannot create a user whose email is already in use'
+                ]
+        if errors:
+            raise serializers.ValidationError(errors)
+        return data
 
-class MyTokenObtainSerializer(serializers.ModelSerializer):
-    confirmation_code = SlugRelatedField(slug_field='password', read_only=True)
 
-    class Meta:
-        fields = ('username', 'confirmation_code')
-        read_only_fields = ('username', 'confirmation_code')
-        model = User
+class MyTokenObtainSerializer(serializers.Serializer):
+    username = serializers.CharField()
+    confirmation_code = serializers.CharField()
 
 
 class UserSerializer(serializers.ModelSerializer):
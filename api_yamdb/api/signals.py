@@ -0,0 +1,43 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title)
+from .cache import bump_catalog_generation, bump_generation
+
+
+def invalidate_catalog(sender, **kwargs):
+    bump_catalog_generation()
+
+
+def invalidate_reviews(sender, instance, **kwargs):
+    bump_generation(f'reviews:{instance.title_id}')
+
+
+def invalidate_comments(sender, instance, **kwargs):
+    bump_generation(f'comments:{instance.review_id}')
+
+
+for model in (Category, Genre, Title, GenreTitle, Review):
+    post_save.connect(
+        invalidate_catalog, sender=model,
+        dispatch_uid=f'catalog_cache_save_{model.__name__}'
+    )
+    post_delete.connect(
+        invalidate_catalog, sender=model,
+        dispatch_uid=f'catalog_cache_delete_{model.__name__}'
+    )
+m2m_changed.connect(
+    invalidate_catalog, sender=Title.genre.through,
+    dispatch_uid='catalog_cache_title_genre'
+)
+
+for model, receiver in ((Review, invalidate_reviews),
+                        (Comment, invalidate_comments)):
+    post_save.connect(
+        receiver, sender=model,
+        dispatch_uid=f'version_save_{model.__name__}'
+    )
+    post_delete.connect(
+        receiver, sender=model,
+        dispatch_uid=f'version_delete_{model.__name__}'
+    )
@@ -0,0 +1,149 @@
+"""Куда уходит время запроса: заголовок Server-Timing и строка лога.
+
+Фазы считаются без времени БД, БД - отдельно:
+    db        запросы к базам и их число;
+    auth      аутентификация, права и троттлинг DRF (TimingMixin.initial);
+    serialize проверка данных и представление сериализатора, в списках -
+              represent() проекции (api/projections.py);
+    app       остальной обработчик DRF до finalize_response: фильтры,
+              пагинация, логика представления;
+    render    отрисовка Response в байты;
+    total     весь запрос.
+Выключено (SERVER_TIMING = False) - middleware убирает себя из цепочки,
+а TimingMixin сводится к одному getattr.
+"""
+import json
+import logging
+import time
+from contextlib import ExitStack, contextmanager, nullcontext
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+PHASES = ('auth', 'serialize', 'app', 'render')
+
+
+class Timing:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self._handler = None
+        self._render = None
+
+    def query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - started
+            self.queries += 1
+
+    def _mark(self):
+        return time.perf_counter(), self.db, self.phases['serialize']
+
+    def _add(self, phase, mark):
+        started, db, serialize = mark
+        elapsed = time.perf_counter() - started - (self.db - db)
+        if phase == 'app':
+            # Сериализация внутри обработчика учтена своей фазой.
+            elapsed -= self.phases['serialize'] - serialize
+        self.phases[phase] += elapsed
+
+    @contextmanager
+    def phase(self, name):
+        mark = self._mark()
+        try:
+            yield
+        finally:
+            self._add(name, mark)
+
+    def handler_started(self):
+        self._handler = self._mark()
+
+    def handler_finished(self):
+        if self._handler is not None:
+            self._add('app', self._handler)
+            self._handler = None
+
+    def render_started(self, response):
+        self._render = self._mark()
+        response.add_post_render_callback(self.render_finished)
+        return response
+
+    def render_finished(self, response):
+        self._add('render', self._render)
+
+    def header(self, total):
+        parts = [f'db;dur={self.db * 1000:.1f};desc="{self.queries} queries"']
+        parts.extend(
+            f'{name};dur={self.phases[name] * 1000:.1f}' for name in PHASES
+        )
+        parts.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(parts)
+
+
+def phase(request, name):
+    """Фаза name запроса request или пустой контекст без Server-Timing."""
+    timing = getattr(request, 'timing', None)
+    if timing is None:
+        return nullcontext()
+    return timing.phase(name)
+
+
+def slow_threshold(request):
+    """Порог медленного запроса в мс для маршрута; None - не проверять."""
+    match = request.resolver_match
+    routes = settings.SERVER_TIMING_SLOW_ROUTES
+    if match is not None and match.view_name in routes:
+        return routes[match.view_name]
+    return settings.SERVER_TIMING_SLOW_MS
+
+
+class ServerTimingMiddleware:
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.timing = timing = Timing()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timing.query))
+            response = self.get_response(request)
+        total = time.perf_counter() - timing.started
+        response['Server-Timing'] = timing.header(total)
+        self.log(request, response, timing, total)
+        return response
+
+    def process_template_response(self, request, response):
+        return request.timing.render_started(response)
+
+    def log(self, request, response, timing, total):
+        match = request.resolver_match
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'route': match.view_name if match else None,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 1),
+            'db_ms': round(timing.db * 1000, 1),
+            'queries': timing.queries,
+        }
+        for name in PHASES:
+            record[f'{name}_ms'] = round(timing.phases[name] * 1000, 1)
+        threshold = slow_threshold(request)
+        record['slow'] = threshold is not None and (
+            record['total_ms'] > threshold
+        )
+        logger.log(
+            logging.WARNING if record['slow'] else logging.INFO,
+            json.dumps(record, ensure_ascii=False),
+        )
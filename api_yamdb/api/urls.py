@@ -9,7 +9,10 @@ from .views import (
     ReviewViewSet,
     UserAuthView,
     MyTokenObtainView,
-    UserViewSet
+    UserViewSet,
+    MetricsView,
+    ExportView,
+    ReadinessView,
 )
 
 app_name = 'api'
@@ -40,4 +43,7 @@ router.register(
 urlpatterns = [
     path('v1/', include(router.urls)),
     path('v1/', include(auth)),
+    path('v1/metrics/', MetricsView.as_view()),
+    path('v1/export/', ExportView.as_view(), name='export'),
+    path('v1/ready/', ReadinessView.as_view()),
 ]
@@ -1,15 +1,21 @@
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Case, FloatField, Prefetch, Q, Value, When
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.core.mail import send_mail
+from django.utils.timezone import now
 from rest_framework import status, viewsets, views, filters
+from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from django.contrib.auth import authenticate
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken
 from django_filters import rest_framework as d_filters
 
-from reviews.models import Review, Title, Category, Genre
-from .paginator import DefaultPagination
+from reviews.models import Title, Category, Genre, GenreTitle
+from users.outbox import enqueue
+from users.tokens import check_confirmation_code, make_confirmation_code
+from .paginator import DefaultLimitOffsetPagination, DefaultPagination
 from .permissions import (AuthorAndStaffOrReadOnly,
                           IsAdminOrReadOnly,
                           IsOwners,
@@ -23,48 +29,114 @@ from .serializers import (CommentsSerializer,
                           UserCreateSerializer,
                           MyTokenObtainSerializer,
                           UserSerializer)
-from .mixins import ReadOrCreateOrDeleteViewSet
+from .cache import (GENERATION_KEY, catalog_cache_key, catalog_last_modified,
+                    recently_written)
+from .mixins import (CatalogCacheMixin,
+                     CatalogDetailCacheMixin,
+                     ConditionalGetMixin,
+                     NestedResourceMixin,
+                     ProjectionListMixin,
+                     ReadOrCreateOrDeleteViewSet,
+                     TimingMixin)
+from . import export, metrics, projections, warmup
 
 User = get_user_model()
 
 
 class TitleFilter(d_filters.FilterSet):
-    category = d_filters.CharFilter(field_name="category__slug",
-                                    lookup_expr='icontains')
+    category = d_filters.CharFilter(field_name="category__slug")
     genre = d_filters.CharFilter(field_name="genre__slug")
     name = d_filters.CharFilter(field_name="name", lookup_expr='icontains')
     year = d_filters.NumberFilter(field_name="year")
+    search = d_filters.CharFilter(method='search_titles')
 
     class Meta:
         model = Title
-        fields = ["category", "genre", "name", "year"]
-
-
-class CategoryViewSet(ReadOrCreateOrDeleteViewSet):
+        fields = ["category", "genre", "name", "year", "search"]
+
+    def search_titles(self, queryset, name, value):
+        """Поиск подстроки в названии и описании, сначала лучшие.
+
+        На postgresql условия обслуживают trigram-индексы, а к рангу
+        добавляется сходство названия с запросом. На sqlite остаётся
+        тот же LIKE без индекса.
+        """
+        rank = Case(
+            When(name__icontains=value, then=Value(1.0)),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+        if connections[queryset.db].vendor == 'postgresql':
+            rank = rank + TrigramSimilarity('name', value)
+        return queryset.filter(
+            Q(name__icontains=value) | Q(description__icontains=value)
+        ).annotate(search_rank=rank).order_by('-search_rank', '-id')
+
+
+class CategoryViewSet(TimingMixin,
+                      CatalogCacheMixin,
+                      ProjectionListMixin,
+                      ReadOrCreateOrDeleteViewSet):
+    query_budget = {'list': 2, 'create': 3, 'destroy': 3}
     queryset = Category.objects.all()
     lookup_field = 'slug'
     serializer_class = CategorySerializer
+    projection = projections.CategoryProjection()
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     permission_classes = [IsAdminOrReadOnly]
 
 
-class GenreeViewSet(ReadOrCreateOrDeleteViewSet):
+class GenreeViewSet(TimingMixin,
+                    CatalogCacheMixin,
+                    ProjectionListMixin,
+                    ReadOrCreateOrDeleteViewSet):
+    query_budget = {'list': 2, 'create': 3, 'destroy': 5}
     queryset = Genre.objects.all()
     lookup_field = 'slug'
     serializer_class = GenreSerializer
+    projection = projections.GenreProjection()
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     permission_classes = [IsAdminOrReadOnly]
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(TimingMixin,
+                   ConditionalGetMixin,
+                   CatalogDetailCacheMixin,
+                   ProjectionListMixin,
+                   viewsets.ModelViewSet):
+    query_budget = {
+        'list': 3, 'retrieve': 2, 'create': 9, 'update': 5,
+        'partial_update': 5, 'destroy': 13,
+    }
     queryset = Title.objects.all()
     lookup_field = 'id'
     serializer_class = TitleSerializer
+    projection = projections.TitleProjection()
     permission_classes = [IsAdminOrReadOnly]
     filter_backends = (d_filters.DjangoFilterBackend,)
     filterset_class = TitleFilter
+    pagination_class = DefaultLimitOffsetPagination
+    cursor_ordering = ('-id',)
+
+    def get_queryset(self):
+        if self.action in ['list', 'retrieve']:
+            return self.queryset.select_related('category').prefetch_related(
+                Prefetch(
+                    'genretitle_set',
+                    queryset=GenreTitle.objects.select_related(
+                        'genre'
+                    ).order_by('id'),
+                )
+            )
+        return super().get_queryset()
+
+    def get_validators(self, request):
+        # Любая запись в каталог сдвигает поколение кэша, его и сверяем.
+        if recently_written(GENERATION_KEY):
+            return None, None
+        return catalog_cache_key(request), catalog_last_modified()
 
     def get_serializer_class(self):
         if self.action in ['list', 'retrieve']:
@@ -72,92 +144,114 @@ class TitleViewSet(viewsets.ModelViewSet):
         return TitlePostSerializer
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(TimingMixin,
+                    NestedResourceMixin,
+                    ConditionalGetMixin,
+                    ProjectionListMixin,
+                    viewsets.ModelViewSet):
+    query_budget = {
+        'list': 4, 'retrieve': 3, 'create': 5, 'update': 7,
+        'partial_update': 7, 'destroy': 7,
+    }
     serializer_class = ReviewsSerializer
+    projection = projections.ReviewProjection()
     pagination_class = DefaultPagination
+    cursor_ordering = ('-pub_date', 'id')
     permission_classes = [AuthorAndStaffOrReadOnly]
 
     def get_queryset(self):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        new_queryset = title.reviews.all()
-        return new_queryset
+        return self.get_title().reviews.select_related('author')
 
-    def create(self, request, *args, **kwargs):
-        serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        if not title.reviews.filter(author=self.request.user).exists():
-            self.perform_create(serializer)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    def get_validators(self, request):
+        return self.aggregate_validators(
+            self.filter_queryset(self.get_queryset()),
+            f'reviews:{self.kwargs.get("title_id")}',
+        )
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
-
-
-class CommentViewSet(viewsets.ModelViewSet):
+        # Произведение не читаем: обновление его рейтинга в той же
+        # транзакции и есть проверка существования.
+        try:
+            serializer.save(
+                author=self.request.user,
+                title_id=int(self.kwargs.get('title_id')),
+            )
+        except Title.DoesNotExist:
+            raise Http404
+
+
+class CommentViewSet(TimingMixin,
+                     NestedResourceMixin,
+                     ConditionalGetMixin,
+                     ProjectionListMixin,
+                     viewsets.ModelViewSet):
+    query_budget = {
+        'list': 4, 'retrieve': 3, 'create': 3, 'update': 4,
+        'partial_update': 4, 'destroy': 4,
+    }
     serializer_class = CommentsSerializer
+    projection = projections.CommentProjection()
     pagination_class = DefaultPagination
+    cursor_ordering = ('-id',)
     permission_classes = [AuthorAndStaffOrReadOnly]
 
     def get_queryset(self):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        review = get_object_or_404(Review, id=self.kwargs.get('review_id'))
-        if review in title.reviews.all():
-            queryset = review.comments.all()
-        else:
-            raise KeyError('No Review to Comment')
-        return queryset
+        return self.get_review().comments.select_related('author')
+
+    def get_validators(self, request):
+        return self.aggregate_validators(
+            self.filter_queryset(self.get_queryset()),
+            f'comments:{self.kwargs.get("review_id")}',
+        )
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review, id=self.kwargs.get('review_id'))
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_review())
 
 
-class UserAuthView(views.APIView):
+class UserAuthView(TimingMixin, views.APIView):
+    query_budget = {'post': 5}
     queryset = User.objects.all()
     serializer_class = UserCreateSerializer
+    permission_classes = (AllowAny,)
     http_method_names = ['post', ]
 
     def post(self, validated_data):
-        username = self.request.data.get('username')
-        email = self.request.data.get('email')
-
         serializer = UserCreateSerializer(data=self.request.data)
         if serializer.is_valid(raise_exception=True):
-            serializer.save()
-            new_user = get_object_or_404(User, username=username)
-            code = User.objects.make_random_password()
-            new_user.set_password(code)
-            new_user.save(update_fields=['password'])
-            send_mail(
-                f'Hello, {username} Confirm your email',
-                f'Your confirmation code: {code}.',
-                'info@yamdb.fake',
-                [email],
-                fail_silently=False,
-            )
+            # Письмо уходит из очереди командой send_emails, запрос
+            # ждёт только коммита пользователя и строки очереди.
+            with transaction.atomic():
+                new_user = serializer.save()
+                code = make_confirmation_code(new_user)
+                enqueue(
+                    f'Hello, {new_user.username} Confirm your email',
+                    f'Your confirmation code: {code}.',
+                    new_user.email,
+                )
 
             return Response(data=serializer.data, status=status.HTTP_200_OK)
         return Response(data=serializer.data,
                         status=status.HTTP_400_BAD_REQUEST)
 
 
-class MyTokenObtainView(views.APIView):
+class MyTokenObtainView(TimingMixin, views.APIView):
+    query_budget = {'post': 2}
+    permission_classes = (AllowAny,)
+
     def post(self, request):
         if not request.data.get("username"):
             return Response(status=status.HTTP_400_BAD_REQUEST)
         serializer = MyTokenObtainSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        username = request.data.get("username")
-        password = request.data.get("confirmation_code")
-        user = get_object_or_404(User, username=username)
-        if not user:
-            return Response(data="User not found",
-                            status=status.HTTP_404_NOT_FOUND)
-
-        if authenticate(username=username, password=password):
+        user = get_object_or_404(
+            User, username=serializer.validated_data['username']
+        )
+        if check_confirmation_code(
+            user, serializer.validated_data['confirmation_code']
+        ):
+            # Новый last_login делает использованный код недействительным.
+            user.last_login = now()
+            user.save(update_fields=['last_login'])
             token = RefreshToken.for_user(user).access_token
             return Response(
                 {"token": str(token)},
@@ -166,7 +260,11 @@ class MyTokenObtainView(views.APIView):
         return Response(status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(TimingMixin, viewsets.ModelViewSet):
+    query_budget = {
+        'list': 3, 'retrieve': 2, 'create': 4, 'update': 3,
+        'partial_update': 3, 'destroy': 8, 'get_user_info': 3,
+    }
     queryset = User.objects.all()
     lookup_field = 'username'
     serializer_class = UserSerializer
@@ -193,3 +291,61 @@ class UserViewSet(viewsets.ModelViewSet):
         if serializer.is_valid():
             serializer.save()
         return Response(serializer.data)
+
+
+class MetricsView(TimingMixin, views.APIView):
+    """Счётчики текущего процесса: попадания в кэш и т.п."""
+    query_budget = {'get': 1}
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        return Response(metrics.snapshot())
+
+
+class ExportView(TimingMixin, views.APIView):
+    """Потоковая выгрузка каталога: ?resource=titles|reviews|comments,
+    ?output=ndjson|csv (параметр format занят DRF), ?nested=1 - titles
+    с отзывами и комментариями (только ndjson)."""
+    # Запросы выгрузки идут уже при отдаче ответа и в бюджет не входят.
+    query_budget = {'get': 1}
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        resource = request.query_params.get('resource', 'titles')
+        output = request.query_params.get('output', 'ndjson')
+        nested = request.query_params.get('nested') in ('1', 'true')
+        if (resource not in export.RESOURCES or output not in export.FORMATS
+                or nested and (resource, output) != ('titles', 'ndjson')):
+            return Response(
+                {'detail': 'resource: titles, reviews или comments; '
+                           'output: ndjson или csv; nested: только для '
+                           'titles в ndjson'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        response = StreamingHttpResponse(
+            export.stream(resource, output, nested=nested),
+            content_type=export.FORMATS[output],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{resource}.{output}"'
+        )
+        return response
+
+
+class ReadinessView(TimingMixin, views.APIView):
+    """Готовность к трафику: процесс прогрет и база отвечает."""
+    query_budget = {'get': 1}
+    authentication_classes = ()
+    permission_classes = (AllowAny,)
+
+    def get(self, request):
+        if not warmup.is_ready():
+            return Response({'status': 'warming up'},
+                            status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        try:
+            with connections['default'].cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except DatabaseError:
+            return Response({'status': 'database unavailable'},
+                            status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response({'status': 'ok'})
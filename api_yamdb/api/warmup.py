@@ -0,0 +1,70 @@
+import inspect
+import logging
+import threading
+import time
+
+from django.urls import get_resolver
+from rest_framework import serializers as drf_serializers
+
+from . import serializers
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_ready = threading.Event()
+
+
+def is_ready():
+    return _ready.is_set()
+
+
+def touch_serializers():
+    """Строит поля всех сериализаторов api: ModelSerializer собирает их
+    из метаданных моделей при первом обращении."""
+    for _, serializer_class in inspect.getmembers(
+        serializers, inspect.isclass
+    ):
+        if (issubclass(serializer_class, drf_serializers.BaseSerializer)
+                and serializer_class.__module__ == serializers.__name__):
+            serializer_class().fields
+
+
+def touch_viewsets():
+    """Проходит по всем маршрутам роутера: сериализатор каждого действия,
+    projection списка, фильтры и пагинация."""
+    # urls импортирует views, а views - этот модуль.
+    from .urls import router
+
+    for _, viewset_class, _ in router.registry:
+        view = viewset_class(request=None, format_kwarg=None, kwargs={})
+        actions = [
+            action for action in ('list', 'retrieve', 'create',
+                                  'partial_update')
+            if hasattr(viewset_class, action)
+        ] + [action.__name__ for action in viewset_class.get_extra_actions()]
+        for action in actions:
+            view.action = action
+            view.get_serializer_class()().fields
+        if getattr(viewset_class, 'projection', None) is not None:
+            viewset_class.projection.layout()
+        filterset_class = getattr(viewset_class, 'filterset_class', None)
+        if filterset_class is not None:
+            filterset_class(
+                queryset=filterset_class._meta.model.objects.none()
+            ).form
+        if viewset_class.pagination_class is not None:
+            viewset_class.pagination_class()
+
+
+def run():
+    """Прогрев процесса до первого запроса; без обращений к БД."""
+    with _lock:
+        if _ready.is_set():
+            return
+        started = time.monotonic()
+        get_resolver().reverse_dict
+        touch_serializers()
+        touch_viewsets()
+        _ready.set()
+    logger.info('Прогрев завершён за %.0f мс',
+                (time.monotonic() - started) * 1000)
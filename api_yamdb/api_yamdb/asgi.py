@@ -3,14 +3,122 @@ ASGI config for YaMDb project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
-For more information on this file, see
-https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
+Django 2.2 has no ASGI handler and no async views, so the WSGI application
+runs in thread pools behind an ASGI server (uvicorn). Read-only list and
+retrieve requests for the catalogue, reviews and comments get their own pool,
+so slow writes cannot take every thread.
+
+    gunicorn api_yamdb.asgi:application -k uvicorn.workers.UvicornWorker
 """
 
+import asyncio
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from tempfile import SpooledTemporaryFile
 
-from django.core.asgi import get_asgi_application
+from asgiref.wsgi import WsgiToAsgiInstance
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
-application = get_asgi_application()
+READ_PATH = re.compile(
+    r'^/api/v1/(?:categories|genres|titles'
+    r'|titles/\d+/reviews|titles/\d+/reviews/\d+/comments)/(?:[^/]+/)?$'
+)
+
+
+class ThreadedWsgiToAsgi:
+    """WSGI-приложение за ASGI-сервером на двух пулах потоков.
+
+    В отличие от asgiref.wsgi.WsgiToAsgi закрывает ответ WSGI, иначе
+    Django не отправляет request_finished и не закрывает соединения с БД.
+    """
+
+    def __init__(self, wsgi_application, read_threads, write_threads):
+        self.wsgi_application = wsgi_application
+        self.read_pool = ThreadPoolExecutor(
+            read_threads, thread_name_prefix='asgi-read'
+        )
+        self.write_pool = ThreadPoolExecutor(
+            write_threads, thread_name_prefix='asgi-write'
+        )
+
+    def pool_for(self, scope):
+        if scope['method'] in ('GET', 'HEAD') and READ_PATH.match(
+            scope['path']
+        ):
+            return self.read_pool
+        return self.write_pool
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            raise ValueError(f'Неподдерживаемый тип ASGI: {scope["type"]}')
+        with SpooledTemporaryFile(max_size=65536) as body:
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    return
+                body.write(message.get('body', b''))
+                if not message.get('more_body'):
+                    break
+            body.seek(0)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                self.pool_for(scope), self.run, scope, body, send, loop
+            )
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                from api import warmup
+
+                await asyncio.get_running_loop().run_in_executor(
+                    self.write_pool, warmup.run
+                )
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.read_pool.shutdown()
+                self.write_pool.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def run(self, scope, body, send, loop):
+        """Выполняется в потоке пула: вызывает WSGI и отдаёт ответ."""
+        def send_sync(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        instance = WsgiToAsgiInstance(self.wsgi_application)
+        instance.scope = scope
+        environ = instance.build_environ(scope, body)
+        environ['wsgi.errors'] = BytesIO()
+        response = self.wsgi_application(environ, instance.start_response)
+        try:
+            for chunk in response:
+                if not instance.response_started:
+                    instance.response_started = True
+                    send_sync(instance.response_start)
+                if chunk:
+                    send_sync({
+                        'type': 'http.response.body',
+                        'body': chunk,
+                        'more_body': True,
+                    })
+        finally:
+            if hasattr(response, 'close'):
+                response.close()
+        if not instance.response_started:
+            send_sync(instance.response_start)
+        send_sync({'type': 'http.response.body'})
+
+
+application = ThreadedWsgiToAsgi(
+    get_wsgi_application(),
+    read_threads=settings.ASGI_READ_THREADS,
+    write_threads=settings.ASGI_WRITE_THREADS,
+)
@@ -0,0 +1,93 @@
+"""PostgreSQL с проверкой переиспользуемых соединений и пулом.
+
+Проверка (CONN_HEALTH_CHECKS, как в Django 4.1): перед первым запросом в
+рамках HTTP-запроса постоянное соединение проверяется SELECT 1 и при обрыве
+открывается заново, а не падает на первом запросе пользователя.
+
+Пул (POOL с MAX_SIZE > 0): соединения не закрываются, а возвращаются в общий
+пул процесса; CONN_MAX_AGE при этом должен быть 0. Пул ищется по текущему
+pid при каждом подключении: обёртка, созданная до fork (preload_app в
+gunicorn), в воркере берёт пул воркера.
+"""
+import os
+from functools import partial
+
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+from .pool import PoolTimeout, get_pool
+
+Database = base.Database
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_done = False
+        # Процесс, в котором открыто текущее соединение.
+        self.connection_pid = None
+
+    @property
+    def pool(self):
+        options = self.settings_dict.get('POOL') or {}
+        if not options.get('MAX_SIZE'):
+            return None
+        return get_pool(self.alias, options)
+
+    @property
+    def health_check_enabled(self):
+        return self.settings_dict.get('CONN_HEALTH_CHECKS', False)
+
+    def get_new_connection(self, conn_params):
+        connect = partial(super().get_new_connection, conn_params)
+        pool = self.pool
+        if pool is None:
+            return connect()
+        check = self.check_pooled if self.health_check_enabled else None
+        try:
+            connection = pool.checkout(connect, check)
+        except PoolTimeout as error:
+            raise Database.OperationalError(str(error)) from error
+        self.connection_pid = os.getpid()
+        return connection
+
+    def check_pooled(self, connection):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except Database.Error:
+            return False
+        return True
+
+    def _close(self):
+        pool = self.pool
+        if pool is None or self.connection is None:
+            return super()._close()
+        if self.connection_pid != os.getpid():
+            # Соединение унаследовано от родителя через fork: его сокет
+            # общий с родителем, закрытие оборвало бы сессию родителя.
+            return None
+        connection = self.connection
+        if connection.closed:
+            return pool.discard(connection)
+        status = connection.get_transaction_status()
+        if status != extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                connection.rollback()
+            except Database.Error:
+                return pool.discard(connection)
+        pool.checkin(connection)
+
+    def ensure_connection(self):
+        if (self.connection is not None and self.health_check_enabled
+                and not self.health_check_done and not self.in_atomic_block):
+            if not self.is_usable():
+                self.close()
+            self.health_check_done = True
+        super().ensure_connection()
+
+    def close_if_unusable_or_obsolete(self):
+        # Вызывается в начале и в конце каждого HTTP-запроса.
+        self.health_check_done = False
+        super().close_if_unusable_or_obsolete()
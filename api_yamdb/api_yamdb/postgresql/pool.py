@@ -0,0 +1,127 @@
+import collections
+import os
+import threading
+import time
+
+from api import metrics
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """Пул соединений процесса, общий для всех потоков.
+
+    Счётчики в api.metrics: db_pool.checkout, db_pool.connect, db_pool.wait,
+    db_pool.wait_ms, db_pool.timeout, db_pool.discard.
+    """
+
+    def __init__(self, max_size, idle_timeout, wait_timeout):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.wait_timeout = wait_timeout
+        self.size = 0
+        self._idle = collections.deque()
+        self._condition = threading.Condition()
+
+    def checkout(self, connect, check=None):
+        """Свободное соединение, новое (connect) или ожидание wait_timeout.
+
+        check проверяет свободное соединение перед выдачей; не прошедшие
+        проверку закрываются.
+        """
+        started = None
+        while True:
+            connection, started = self._take(started)
+            if connection is None:
+                connection = self._connect(connect)
+                break
+            if check is None or check(connection):
+                break
+            self.discard(connection)
+        if started is not None:
+            metrics.incr(
+                'db_pool.wait_ms',
+                int((time.monotonic() - started) * 1000),
+            )
+        metrics.incr('db_pool.checkout')
+        return connection
+
+    def _take(self, started):
+        """Свободное соединение или None, если можно открыть новое."""
+        with self._condition:
+            while True:
+                self._close_expired()
+                if self._idle:
+                    return self._idle.pop()[0], started
+                if self.size < self.max_size:
+                    self.size += 1
+                    return None, started
+                if started is None:
+                    started = time.monotonic()
+                    metrics.incr('db_pool.wait')
+                remaining = started + self.wait_timeout - time.monotonic()
+                if remaining <= 0:
+                    metrics.incr('db_pool.timeout')
+                    raise PoolTimeout(
+                        f'Нет свободного соединения за '
+                        f'{self.wait_timeout} с (пул {self.max_size})'
+                    )
+                self._condition.wait(remaining)
+
+    def _connect(self, connect):
+        try:
+            connection = connect()
+        except BaseException:
+            self._release()
+            raise
+        metrics.incr('db_pool.connect')
+        return connection
+
+    def checkin(self, connection):
+        with self._condition:
+            self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    def discard(self, connection):
+        metrics.incr('db_pool.discard')
+        try:
+            connection.close()
+        except Exception:
+            pass
+        self._release()
+
+    def _release(self):
+        with self._condition:
+            self.size -= 1
+            self._condition.notify()
+
+    def _close_expired(self):
+        # Слева самые давно возвращённые; выдаются соединения справа.
+        deadline = time.monotonic() - self.idle_timeout
+        while self._idle and self._idle[0][1] < deadline:
+            connection, _ = self._idle.popleft()
+            self.size -= 1
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, options):
+    """Пул для базы alias; после fork создаётся заново, соединения
+    родителя не используются."""
+    key = (alias, os.getpid())
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(
+                max_size=options['MAX_SIZE'],
+                idle_timeout=options.get('IDLE_TIMEOUT', 300),
+                wait_timeout=options.get('WAIT_TIMEOUT', 5),
+            )
+        return _pools[key]
@@ -0,0 +1,96 @@
+"""Чтение с реплик в безопасных запросах API.
+
+ReplicaMiddleware отмечает GET/HEAD/OPTIONS к /api/, ReplicaRouter отправляет
+их чтения на одну из DATABASE_REPLICAS. После успешной записи пользователь
+DB_REPLICA_PIN_SECONDS секунд читает с основной базы: свою запись он увидит
+даже при отставании реплики.
+"""
+import random
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.utils.functional import LazyObject, empty
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_state = threading.local()
+
+
+def pin_key(user_id):
+    return f'replica:pin:{user_id}'
+
+
+def known_user(request):
+    """Пользователь запроса, если он уже определён.
+
+    Ленивый request.user из AuthenticationMiddleware не вычисляется: это
+    запрос к сессии, который сам пришёл бы в роутер.
+    """
+    user = request.__dict__.get('user')
+    if isinstance(user, LazyObject) and user._wrapped is empty:
+        return None
+    if user is None or not user.is_authenticated:
+        return None
+    return user
+
+
+def is_pinned(request):
+    user = known_user(request)
+    if user is None:
+        return False
+    # Пользователь определяется посреди запроса (JWT в DRF), поэтому
+    # кэшируется пара (id, ответ), а не только ответ.
+    cached = getattr(request, '_replica_pin', None)
+    if cached is None or cached[0] != user.pk:
+        cached = (user.pk, bool(cache.get(pin_key(user.pk))))
+        request._replica_pin = cached
+    return cached[1]
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        request = getattr(_state, 'request', None)
+        if request is None or connections['default'].in_atomic_block:
+            return 'default'
+        if is_pinned(request):
+            return 'default'
+        if not hasattr(request, '_replica'):
+            # Одна реплика на весь запрос: данные ответа согласованы.
+            request._replica = random.choice(settings.DATABASE_REPLICAS)
+        return request._replica
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (not settings.DATABASE_REPLICAS
+                or not request.path.startswith('/api/')):
+            return self.get_response(request)
+        safe = request.method in SAFE_METHODS
+        _state.request = request if safe else None
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.request = None
+        if not safe and response.status_code < 400:
+            user = known_user(request)
+            if user is not None:
+                cache.set(
+                    pin_key(user.pk), True, settings.DB_REPLICA_PIN_SECONDS
+                )
+        return response
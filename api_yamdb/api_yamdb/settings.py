@@ -24,17 +24,21 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework_simplejwt',
     'django_filters',
-    'users',
-    'reviews',
-    'api',
+    'users.apps.UsersConfig',
+    'reviews.apps.ReviewsConfig',
+    'api.apps.ApiConfig',
 ]
 
 MIDDLEWARE = [
+    'api.timing.ServerTimingMiddleware',
+    'api.budget.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api_yamdb.replicas.ReplicaMiddleware',
+    'api.edge.EdgeCacheMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -61,17 +65,100 @@ TEMPLATES = [
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
 
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', default=0))
+
+# Соединений с PostgreSQL в худшем случае: без пула у каждого потока своё,
+# то есть (ASGI_READ_THREADS + ASGI_WRITE_THREADS) * GUNICORN_WORKERS в
+# ASGI-профиле - по умолчанию (32 + 8) * (2 * CPU + 1), 360 на 4 CPU - и
+# GUNICORN_THREADS * GUNICORN_WORKERS в WSGI; с пулом DB_POOL_MAX_SIZE *
+# GUNICORN_WORKERS. Сумма по всем процессам должна оставаться меньше
+# max_connections PostgreSQL (по умолчанию 100).
 DATABASES = {
     'default': {
-        'ENGINE': os.getenv('DB_ENGINE', default='django.db.backends.postgresql'),
+        'ENGINE': os.getenv('DB_ENGINE', default='api_yamdb.postgresql'),
         'NAME': os.getenv('DB_NAME', default='postgres'),
         'USER': os.getenv('thxphila', default='postgres'),
         'PASSWORD': os.getenv('421162', default='postgres'),
         'HOST': os.getenv('DB_HOST', default='db'),
-        'PORT': os.getenv('DB_PORT', default='5432')
+        'PORT': os.getenv('DB_PORT', default='5432'),
+        # Пул (DB_ENGINE=api_yamdb.postgresql) сам держит соединения, тогда
+        # постоянные соединения потоков не нужны.
+        'CONN_MAX_AGE': int(os.getenv(
+            'DB_CONN_MAX_AGE', default=0 if DB_POOL_MAX_SIZE else 60
+        )),
+        # Учитывается только бэкендом api_yamdb.postgresql.
+        'CONN_HEALTH_CHECKS': True,
+        'POOL': {
+            'MAX_SIZE': DB_POOL_MAX_SIZE,
+            'IDLE_TIMEOUT': int(os.getenv('DB_POOL_IDLE_TIMEOUT', default=300)),
+            'WAIT_TIMEOUT': float(os.getenv('DB_POOL_WAIT_TIMEOUT', default=5)),
+        },
     }
 }
 
+# Реплики для чтения: DB_REPLICA_HOSTS=replica1.db,replica2.db
+DATABASE_REPLICAS = []
+for number, host in enumerate(
+    filter(None, os.getenv('DB_REPLICA_HOSTS', default='').split(',')), 1
+):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'HOST': host.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['api_yamdb.replicas.ReplicaRouter']
+
+# Сколько секунд после записи пользователь читает с основной базы.
+DB_REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', default=10))
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='yamdb'),
+    }
+}
+
+# Кэш ответов каталога (категории, жанры, произведения).
+CATALOG_CACHE_ALIAS = 'default'
+CATALOG_CACHE_TIMEOUT = int(os.getenv('CATALOG_CACHE_TIMEOUT', default=600))
+
+# Кэш nginx для анонимных GET (api/edge.py): s-maxage и stale-while-revalidate.
+EDGE_CACHE_TTL = int(os.getenv('EDGE_CACHE_TTL', default=10))
+EDGE_CACHE_STALE = int(os.getenv('EDGE_CACHE_STALE', default=30))
+# Внутренний порт nginx для обновления записей, например http://nginx:8080.
+EDGE_PURGE_URL = os.getenv('EDGE_PURGE_URL', default='')
+# Слотов для адресов одного ключа и ключей в очереди обновления.
+EDGE_PURGE_MAX_URLS = 500
+EDGE_PURGE_MAX_PENDING = 100
+
+# Server-Timing и строка лога api.timing на каждый запрос (api/timing.py).
+SERVER_TIMING = os.getenv('SERVER_TIMING', default='') == '1'
+# Порог медленного запроса в мс; по имени маршрута можно задать свой
+# или None, чтобы не проверять: {'api:titles-list': 200}.
+SERVER_TIMING_SLOW_MS = int(os.getenv('SERVER_TIMING_SLOW_MS', default=500))
+SERVER_TIMING_SLOW_ROUTES = {
+    'api:titles-list': 300,
+    'api:titles-detail': 200,
+    'api:export': None,
+}
+
+# Проверка query_budget представлений (api/budget.py) при разработке:
+# 'log' - предупреждение в лог, 'raise' - исключение; пусто - выключено.
+QUERY_BUDGET = os.getenv('QUERY_BUDGET', default='')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.timing': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
 AUTH_USER_MODEL = 'users.User'
 # Password validation
 
@@ -117,6 +204,31 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+DEFAULT_FROM_EMAIL = 'info@yamdb.fake'
+
+# Очередь писем: команда send_emails повторяет неудачные отправки
+# с экспоненциальной задержкой от BASE до MAX секунд.
+EMAIL_OUTBOX_RETRY_BASE = 30
+EMAIL_OUTBOX_RETRY_MAX = 3600
+EMAIL_OUTBOX_MAX_ATTEMPTS = 8
+# Секунды аренды взятой воркером пачки: после падения воркера письма
+# снова уйдут в отправку (доставка не реже одного раза).
+EMAIL_OUTBOX_LEASE = 300
+
+# Срок жизни кода подтверждения в секундах.
+CONFIRMATION_CODE_TIMEOUT = 60 * 60
+
+# Кэш пользователей для CachedJWTAuthentication: записей и секунд жизни.
+# Кэш у каждого процесса свой, сигналы сбрасывают запись только в том,
+# где пользователь изменён: другие воркеры до TTL секунд видят старые
+# role и is_active (снятые права и блокировка вступают в силу не сразу).
+AUTH_USER_CACHE_SIZE = 10000
+AUTH_USER_CACHE_TTL = 30
+
+# Потоки ASGI-профиля (api_yamdb/asgi.py): у каждого своё соединение с БД.
+ASGI_READ_THREADS = int(os.getenv('ASGI_READ_THREADS', default=32))
+ASGI_WRITE_THREADS = int(os.getenv('ASGI_WRITE_THREADS', default=8))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -124,7 +236,7 @@ SIMPLE_JWT = {
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
@@ -136,3 +248,17 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 10,
 }
+
+# JSON через orjson (api/renderers.py, api/parsers.py); без установленного
+# orjson работает как JSONRenderer/JSONParser DRF.
+FAST_JSON = os.getenv('FAST_JSON', default='') == '1'
+if FAST_JSON:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    )
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'] = (
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    )
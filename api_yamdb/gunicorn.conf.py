@@ -0,0 +1,35 @@
+"""Настройки gunicorn: gunicorn api_yamdb.wsgi:application -c gunicorn.conf.py
+
+Все значения можно переопределить переменными окружения GUNICORN_*.
+"""
+import multiprocessing
+import os
+
+cpus = multiprocessing.cpu_count()
+
+bind = os.getenv('GUNICORN_BIND', '0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', 2 * cpus + 1))
+# На одном ядре лишние процессы только едят память: берём потоки.
+threads = int(os.getenv('GUNICORN_THREADS', 4 if cpus == 1 else 1))
+worker_class = os.getenv(
+    'GUNICORN_WORKER_CLASS', 'gthread' if threads > 1 else 'sync'
+)
+
+# Приложение импортируется в мастере, воркеры делят его память.
+preload_app = True
+
+# Перезапуск воркеров против утечек; разброс, чтобы не все сразу.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+
+
+def post_fork(server, worker):
+    # Без preload_app Django ещё не настроен: импорт wsgi это сделает.
+    import api_yamdb.wsgi  # noqa: F401
+    from api import warmup
+
+    warmup.run()
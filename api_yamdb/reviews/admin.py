@@ -4,14 +4,27 @@ from .models import Comment, Review, Title, Category, Genre
 
 class ReviewsAdmin(admin.ModelAdmin):
     list_display = ('pk', 'text', 'score', 'author', 'title')
+    list_select_related = ('author', 'title')
     search_fields = ('title', 'author')
     list_filter = ('score', 'text',)
     empty_value_display = '-пусто-'
+    # Два запроса на варианты list_filter, авторы и произведения - в JOIN.
+    query_budget = {'changelist_view': 7}
+
+
+class CommentAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'text', 'author', 'review')
+    list_select_related = ('author', 'review')
+    query_budget = {'changelist_view': 5}
+
+
+class CatalogAdmin(admin.ModelAdmin):
+    query_budget = {'changelist_view': 5}
 
 
 admin.site.register(Review, ReviewsAdmin)
-admin.site.register(Title)
-admin.site.register(Comment)
+admin.site.register(Title, CatalogAdmin)
+admin.site.register(Comment, CommentAdmin)
 
-admin.site.register(Category)
-admin.site.register(Genre)
+admin.site.register(Category, CatalogAdmin)
+admin.site.register(Genre, CatalogAdmin)
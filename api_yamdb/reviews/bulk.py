@@ -0,0 +1,84 @@
+"""Быстрая запись строк в таблицы моделей для загрузки и генерации данных."""
+import csv
+import io
+
+from django.core.management.color import no_style
+from django.db import connection
+
+PREPARED_TYPES = {
+    'DateField', 'DateTimeField', 'DecimalField', 'DurationField',
+    'TimeField', 'UUIDField',
+}
+
+
+def copy_rows(model, fields, rows):
+    """COPY ... FROM STDIN на postgresql; rows - кортежи в порядке fields."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(r'\N' if value is None else value for value in row)
+    buffer.seek(0)
+    columns = ', '.join(connection.ops.quote_name(field) for field in fields)
+    table = connection.ops.quote_name(model._meta.db_table)
+    with connection.cursor() as cursor, connection.wrap_database_errors:
+        cursor.cursor.copy_expert(
+            f"COPY {table} ({columns}) FROM STDIN "
+            f"WITH (FORMAT csv, NULL '\\N')",
+            buffer,
+        )
+
+
+def insert_rows(model, fields, rows):
+    """Многострочный INSERT с пропуском конфликтующих строк.
+
+    Строки пишутся пачками, как в bulk_create: один запрос на пачку
+    размера bulk_batch_size. Возвращает число действительно записанных
+    строк.
+    """
+    model_fields = [model._meta.get_field(name) for name in fields]
+    columns = ', '.join(
+        connection.ops.quote_name(field.column) for field in model_fields
+    )
+    table = connection.ops.quote_name(model._meta.db_table)
+    placeholders = ['%s'] * len(model_fields)
+    # Строки уже из int, str и bool; готовить для драйвера нужно только
+    # даты и подобные им поля, остальное get_db_prep_save лишь замедляет.
+    prepared = [
+        index for index, field in enumerate(model_fields)
+        if field.get_internal_type() in PREPARED_TYPES
+    ]
+    params = []
+    for row in rows:
+        row = list(row)
+        for index in prepared:
+            row[index] = model_fields[index].get_db_prep_save(
+                row[index], connection
+            )
+        params.append(row)
+    batch_size = max(connection.ops.bulk_batch_size(model_fields, params), 1)
+    written = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(params), batch_size):
+            batch = params[start:start + batch_size]
+            sql = '{} {} ({}) {} {}'.format(
+                connection.ops.insert_statement(ignore_conflicts=True),
+                table,
+                columns,
+                connection.ops.bulk_insert_sql(
+                    model_fields, [placeholders] * len(batch)
+                ),
+                connection.ops.ignore_conflicts_suffix_sql(
+                    ignore_conflicts=True
+                ),
+            )
+            cursor.execute(sql, [value for row in batch for value in row])
+            written += cursor.rowcount
+    return written
+
+
+def reset_sequences(models):
+    """Сдвигает счётчики id после записи строк с явными id."""
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
@@ -0,0 +1,238 @@
+import itertools
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+
+from reviews.bulk import copy_rows, insert_rows, reset_sequences
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from users.models import User
+
+WORDS = (
+    'фильм книга сюжет герой финал актёр режиссёр автор музыка сцена '
+    'история мир время жизнь любовь война дорога город ночь море '
+    'отличный скучный сильный странный смешной тёмный добрый долгий '
+    'неожиданный красивый честный живой тяжёлый лёгкий глубокий '
+    'понравился разочаровал удивил тронул затянул напугал рассмешил '
+    'советую пересмотрю перечитаю жаль очень слишком совсем почти'
+).split()
+
+
+# Даты отсчитываются от постоянной точки, а не от текущего времени: иначе
+# один и тот же --seed давал бы разные pub_date.
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def zipf_weights(count, skew):
+    return [1 / rank ** skew for rank in range(1, count + 1)]
+
+
+def next_id(model):
+    return (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует пользователей, категории, жанры, произведения, отзывы и '
+        'комментарии для нагрузочных замеров. Популярность произведений '
+        'распределена по Ципфу: при настройках по умолчанию у самых '
+        'популярных больше 100 тысяч отзывов. Один и тот же --seed на '
+        'пустой базе даёт одни и те же данные.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=150000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--genres', type=int, default=50)
+        parser.add_argument('--titles', type=int, default=20000)
+        parser.add_argument('--reviews', type=int, default=2000000)
+        parser.add_argument('--comments', type=int, default=1000000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--skew', type=float, default=1.0,
+            help='Показатель степени в распределении популярности.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=20000)
+        parser.add_argument(
+            '--no-copy', action='store_true',
+            help='Не использовать COPY даже на postgresql.'
+        )
+
+    def handle(self, *args, **options):
+        if min(options['users'], options['categories'],
+               options['genres'], options['titles']) < 1:
+            raise CommandError('Нужно хотя бы по одной записи каждого вида.')
+        self.rng = random.Random(options['seed'])
+        self.chunk_size = options['chunk_size']
+        self.use_copy = (
+            connection.vendor == 'postgresql' and not options['no_copy']
+        )
+        self.now = EPOCH
+        self.texts = [
+            ' '.join(self.rng.choices(WORDS, k=self.rng.randint(4, 16)))
+            .capitalize() + '.'
+            for _ in range(1000)
+        ]
+
+        self.users = self.generate_users(options['users'])
+        categories = self.generate_named(
+            Category, 'Категория', 'category', options['categories']
+        )
+        genres = self.generate_named(
+            Genre, 'Жанр', 'genre', options['genres']
+        )
+        titles = self.generate_titles(options['titles'], categories)
+        self.generate_genre_links(titles, genres)
+        reviews = self.generate_reviews(titles, options)
+        self.generate_comments(reviews, options['comments'])
+
+        reset_sequences([User, Category, Genre, Title, GenreTitle, Review,
+                         Comment])
+        call_command('rebuild_ratings', stdout=self.stdout)
+
+    def write(self, model, fields, rows):
+        """Пишет строки пачками по chunk_size, каждую в своей транзакции."""
+        started = time.monotonic()
+        written = 0
+        rows = iter(rows)
+        while True:
+            chunk = list(itertools.islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            with transaction.atomic():
+                if self.use_copy:
+                    copy_rows(model, fields, chunk)
+                    written += len(chunk)
+                else:
+                    written += insert_rows(model, fields, chunk)
+        elapsed = time.monotonic() - started
+        rate = written / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'{model._meta.db_table}: {written} строк, {elapsed:.1f} с, '
+            f'{rate:.0f} строк/с'
+        ))
+        return written
+
+    def random_date(self, days=5 * 365):
+        return self.now - timedelta(seconds=self.rng.randrange(days * 86400))
+
+    def generate_users(self, count):
+        first = next_id(User)
+        # Пароль не нужен: вход только по коду подтверждения.
+        password = make_password(None)
+        roles = ['user'] * 98 + ['moderator'] * 2
+        self.write(User, (
+            'id', 'username', 'email', 'role', 'bio', 'first_name',
+            'last_name', 'password', 'is_superuser', 'is_staff',
+            'is_active', 'date_joined',
+        ), (
+            (pk, f'user{pk}', f'user{pk}@yamdb.fake', self.rng.choice(roles),
+             '', '', '', password, False, False, True, self.now)
+            for pk in range(first, first + count)
+        ))
+        return range(first, first + count)
+
+    def generate_named(self, model, name, slug, count):
+        first = next_id(model)
+        ids = range(first, first + count)
+        self.write(model, ('id', 'name', 'slug'), (
+            (pk, f'{name} {pk}', f'{slug}-{pk}') for pk in ids
+        ))
+        return ids
+
+    def generate_titles(self, count, categories):
+        first = next_id(Title)
+        ids = range(first, first + count)
+        weights = zipf_weights(len(categories), 1.0)
+        year = self.now.year
+        self.write(Title, (
+            'id', 'name', 'year', 'category_id', 'description',
+            'review_count',
+        ), (
+            (pk, f'{self.rng.choice(WORDS).capitalize()} '
+                 f'{self.rng.choice(WORDS)} {pk}',
+             self.rng.randint(1920, year),
+             self.rng.choices(categories, weights)[0],
+             self.rng.choice(self.texts), 0)
+            for pk in ids
+        ))
+        return ids
+
+    def generate_genre_links(self, titles, genres):
+        weights = zipf_weights(len(genres), 1.0)
+
+        def links():
+            pk = next_id(GenreTitle)
+            for title_id in titles:
+                wanted = min(len(genres), self.rng.choice((1, 1, 2, 2, 3)))
+                chosen = set()
+                while len(chosen) < wanted:
+                    chosen.add(self.rng.choices(genres, weights)[0])
+                for genre_id in sorted(chosen):
+                    yield pk, title_id, genre_id
+                    pk += 1
+
+        self.write(GenreTitle, ('id', 'title_id', 'genre_id'), links())
+
+    def review_counts(self, titles, total, skew):
+        """Число отзывов на произведение: места в рейтинге популярности
+        случайны, доля места r пропорциональна 1 / r ** skew."""
+        ranked = list(titles)
+        self.rng.shuffle(ranked)
+        weights = zipf_weights(len(ranked), skew)
+        scale = total / sum(weights)
+        # Один автор пишет на произведение не больше одного отзыва.
+        return {
+            title_id: min(len(self.users), int(weight * scale))
+            for title_id, weight in zip(ranked, weights)
+        }
+
+    def generate_reviews(self, titles, options):
+        counts = self.review_counts(titles, options['reviews'],
+                                    options['skew'])
+        # (id первого отзыва, число отзывов) по произведениям для комментариев.
+        ranges = []
+
+        def rows():
+            pk = next_id(Review)
+            for title_id in titles:
+                count = counts[title_id]
+                if not count:
+                    continue
+                ranges.append((pk, count))
+                quality = self.rng.uniform(3, 9)
+                for index in self.rng.sample(range(len(self.users)), count):
+                    score = round(self.rng.gauss(quality, 1.5))
+                    yield (pk, title_id, self.rng.choice(self.texts),
+                           self.users[index], min(10, max(1, score)),
+                           self.random_date())
+                    pk += 1
+
+        self.write(Review, (
+            'id', 'title_id', 'text', 'author_id', 'score', 'pub_date'
+        ), rows())
+        return ranges
+
+    def generate_comments(self, reviews, total):
+        written = sum(count for _, count in reviews)
+        if not written:
+            return
+
+        def rows():
+            pk = next_id(Comment)
+            for first, count in reviews:
+                # Комментариев у произведения пропорционально его отзывам.
+                for _ in range(round(total * count / written)):
+                    yield (pk, first + self.rng.randrange(count),
+                           self.rng.choice(self.texts),
+                           self.rng.choice(self.users), self.random_date())
+                    pk += 1
+
+        self.write(Comment, (
+            'id', 'review_id', 'text', 'author_id', 'pub_date'
+        ), rows())
@@ -0,0 +1,375 @@
+import csv
+import itertools
+import json
+import os
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email, validate_slug
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from api.cache import bump_catalog_generation
+from reviews.bulk import copy_rows, insert_rows, reset_sequences
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from users.models import User
+
+ROLES = {role for role, _ in User.CHOICES}
+
+
+class IdMap:
+    """Допустимые значения внешнего ключа: id и, если есть, natural key.
+
+    Для больших таблиц (произведения, отзывы) хранится только множество id.
+    """
+
+    def __init__(self, model, natural_key=None):
+        self.ids = set(model.objects.values_list('id', flat=True))
+        self.keys = {}
+        if natural_key:
+            self.keys = dict(
+                model.objects.values_list(natural_key, 'id')
+            )
+
+    def add(self, pk, key=None):
+        self.ids.add(pk)
+        if key is not None:
+            self.keys[key] = pk
+
+    def resolve(self, value, column):
+        value = value.strip()
+        if value.isdigit() and int(value) in self.ids:
+            return int(value)
+        if value in self.keys:
+            return self.keys[value]
+        raise ValueError(f'{column}: нет записи {value!r}')
+
+
+def _int(row, column, low=None, high=None):
+    try:
+        value = int(row[column])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f'{column}: ожидается целое число')
+    too_low = low is not None and value < low
+    too_high = high is not None and value > high
+    if too_low or too_high:
+        raise ValueError(f'{column}: {value} вне диапазона')
+    return value
+
+
+def _text(row, column, max_length=None, required=True):
+    value = (row.get(column) or '').strip()
+    if required and not value:
+        raise ValueError(f'{column}: пустое значение')
+    if max_length and len(value) > max_length:
+        raise ValueError(f'{column}: длиннее {max_length} символов')
+    return value
+
+
+def _slug(row, column):
+    value = _text(row, column, max_length=50)
+    try:
+        validate_slug(value)
+    except ValidationError:
+        raise ValueError(f'{column}: некорректный slug')
+    return value
+
+
+def _datetime(row, column):
+    raw = (row.get(column) or '').strip()
+    if not raw:
+        return timezone.now()
+    value = parse_datetime(raw.replace(' ', 'T', 1))
+    if value is None:
+        raise ValueError(f'{column}: некорректная дата')
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value, timezone.utc)
+    return value
+
+
+class Importer:
+    """Загрузка одного файла: разбор строк, проверка и запись пачками."""
+    filename = None
+    model = None
+    fields = ()
+
+    def __init__(self, maps):
+        self.maps = maps
+
+    def parse(self, row):
+        raise NotImplementedError
+
+    def remember(self, values):
+        """Добавляет загруженную строку в карты id для следующих файлов."""
+
+
+class CategoryImporter(Importer):
+    filename = 'category.csv'
+    model = Category
+    fields = ('id', 'name', 'slug')
+    map_name = 'category'
+
+    def parse(self, row):
+        return (
+            _int(row, 'id', low=1),
+            _text(row, 'name', max_length=256),
+            _slug(row, 'slug'),
+        )
+
+    def remember(self, values):
+        self.maps[self.map_name].add(values[0], values[2])
+
+
+class GenreImporter(CategoryImporter):
+    filename = 'genre.csv'
+    model = Genre
+    map_name = 'genre'
+
+
+class TitleImporter(Importer):
+    filename = 'titles.csv'
+    model = Title
+    fields = ('id', 'name', 'year', 'category_id', 'description',
+              'review_count')
+
+    def parse(self, row):
+        return (
+            _int(row, 'id', low=1),
+            _text(row, 'name', max_length=200),
+            _int(row, 'year', low=0, high=timezone.now().year),
+            self.maps['category'].resolve(row.get('category', ''),
+                                          'category'),
+            _text(row, 'description', required=False),
+            0,
+        )
+
+    def remember(self, values):
+        self.maps['title'].add(values[0])
+
+
+class GenreTitleImporter(Importer):
+    filename = 'genre_title.csv'
+    model = GenreTitle
+    fields = ('id', 'title_id', 'genre_id')
+
+    def parse(self, row):
+        return (
+            _int(row, 'id', low=1),
+            self.maps['title'].resolve(row.get('title_id', ''), 'title_id'),
+            self.maps['genre'].resolve(row.get('genre_id', ''), 'genre_id'),
+        )
+
+
+class UserImporter(Importer):
+    filename = 'users.csv'
+    model = User
+    fields = ('id', 'username', 'email', 'role', 'bio', 'first_name',
+              'last_name', 'password', 'is_superuser', 'is_staff',
+              'is_active', 'date_joined')
+
+    def parse(self, row):
+        email = _text(row, 'email', max_length=254)
+        try:
+            validate_email(email)
+        except ValidationError:
+            raise ValueError('email: некорректный адрес')
+        role = _text(row, 'role', required=False) or 'user'
+        if role not in ROLES:
+            raise ValueError(f'role: неизвестная роль {role!r}')
+        return (
+            _int(row, 'id', low=1),
+            _text(row, 'username', max_length=150),
+            email,
+            role,
+            _text(row, 'bio', required=False),
+            _text(row, 'first_name', max_length=30, required=False),
+            _text(row, 'last_name', max_length=150, required=False),
+            # Пароль не нужен: вход только по коду подтверждения.
+            make_password(None),
+            False,
+            False,
+            True,
+            timezone.now(),
+        )
+
+    def remember(self, values):
+        self.maps['user'].add(values[0], values[1])
+
+
+class ReviewImporter(Importer):
+    filename = 'review.csv'
+    model = Review
+    fields = ('id', 'title_id', 'text', 'author_id', 'score', 'pub_date')
+
+    def parse(self, row):
+        return (
+            _int(row, 'id', low=1),
+            self.maps['title'].resolve(row.get('title_id', ''), 'title_id'),
+            _text(row, 'text'),
+            self.maps['user'].resolve(row.get('author', ''), 'author'),
+            _int(row, 'score', low=1, high=10),
+            _datetime(row, 'pub_date'),
+        )
+
+    def remember(self, values):
+        self.maps['review'].add(values[0])
+
+
+class CommentImporter(Importer):
+    filename = 'comments.csv'
+    model = Comment
+    fields = ('id', 'review_id', 'text', 'author_id', 'pub_date')
+
+    def parse(self, row):
+        return (
+            _int(row, 'id', low=1),
+            self.maps['review'].resolve(row.get('review_id', ''),
+                                        'review_id'),
+            _text(row, 'text'),
+            self.maps['user'].resolve(row.get('author', ''), 'author'),
+            _datetime(row, 'pub_date'),
+        )
+
+
+IMPORTERS = (
+    CategoryImporter,
+    GenreImporter,
+    TitleImporter,
+    GenreTitleImporter,
+    UserImporter,
+    ReviewImporter,
+    CommentImporter,
+)
+
+
+class Checkpoint:
+    """Сколько строк каждого файла уже записано в базу."""
+
+    def __init__(self, path, resume):
+        self.path = path
+        self.done = {}
+        if resume and os.path.exists(path):
+            with open(path) as file:
+                self.done = json.load(file)
+
+    def save(self, filename, rows):
+        self.done[filename] = rows
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump(self.done, file)
+        os.replace(tmp_path, self.path)
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает категории, жанры, произведения, пользователей, отзывы '
+        'и комментарии из CSV-файлов каталога.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Каталог с CSV-файлами.')
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Продолжить с места, сохранённого в --checkpoint.'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл прогресса, по умолчанию <directory>/.import.json.'
+        )
+        parser.add_argument(
+            '--no-copy', action='store_true',
+            help='Не использовать COPY даже на postgresql.'
+        )
+
+    def handle(self, *args, **options):
+        directory = options['directory']
+        if not os.path.isdir(directory):
+            raise CommandError(f'Нет каталога {directory}')
+        checkpoint = Checkpoint(
+            options['checkpoint'] or os.path.join(directory, '.import.json'),
+            options['resume'],
+        )
+        self.use_copy = (
+            connection.vendor == 'postgresql' and not options['no_copy']
+        )
+        maps = {
+            'category': IdMap(Category, 'slug'),
+            'genre': IdMap(Genre, 'slug'),
+            'title': IdMap(Title),
+            'user': IdMap(User, 'username'),
+            'review': IdMap(Review),
+        }
+        imported = []
+        for importer_class in IMPORTERS:
+            path = os.path.join(directory, importer_class.filename)
+            if not os.path.exists(path):
+                continue
+            importer = importer_class(maps)
+            self.import_file(
+                importer, path, checkpoint, options['chunk_size']
+            )
+            imported.append(importer.model)
+
+        if imported:
+            reset_sequences(imported)
+        if Review in imported:
+            call_command('rebuild_ratings', stdout=self.stdout)
+        bump_catalog_generation()
+
+    def import_file(self, importer, path, checkpoint, chunk_size):
+        filename = importer.filename
+        done = checkpoint.done.get(filename, 0)
+        started = time.monotonic()
+        written = skipped = conflicts = 0
+        # После сбоя последняя пачка могла записаться без отметки в
+        # checkpoint, поэтому первая пачка пишется с пропуском конфликтов.
+        tolerate_conflicts = done > 0
+        with open(path, newline='', encoding='utf-8-sig') as file:
+            reader = enumerate(csv.DictReader(file), start=1)
+            rows = itertools.islice(reader, done, None)
+            while True:
+                chunk = list(itertools.islice(rows, chunk_size))
+                if not chunk:
+                    break
+                values = []
+                for line, row in chunk:
+                    try:
+                        values.append(importer.parse(row))
+                    except ValueError as error:
+                        skipped += 1
+                        self.stderr.write(f'{filename}:{line + 1}: {error}')
+                with transaction.atomic():
+                    inserted = self.write(importer, values, tolerate_conflicts)
+                for item in values:
+                    importer.remember(item)
+                tolerate_conflicts = False
+                written += inserted
+                conflicts += len(values) - inserted
+                done = chunk[-1][0]
+                checkpoint.save(filename, done)
+
+        elapsed = time.monotonic() - started
+        rate = written / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'{filename}: записано {written}, пропущено {skipped}, '
+            f'уже в базе {conflicts}, {elapsed:.1f} с, {rate:.0f} строк/с'
+        ))
+
+    def write(self, importer, values, tolerate_conflicts):
+        """Записывает пачку и возвращает число новых строк: строки, уже
+        бывшие в базе, пропускаются и в записанные не входят."""
+        if not values:
+            return 0
+        if self.use_copy and not tolerate_conflicts:
+            try:
+                with transaction.atomic():
+                    copy_rows(importer.model, importer.fields, values)
+                return len(values)
+            except IntegrityError:
+                pass
+        return insert_rows(importer.model, importer.fields, values)
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import (Avg, Count, FloatField, IntegerField, OuterRef,
+                              Subquery)
+from django.db.models.functions import Coalesce
+
+from api.cache import bump_catalog_generation
+from reviews.models import Review, Title
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинг и число отзывов всех произведений.'
+
+    def handle(self, *args, **options):
+        reviews = (
+            Review.objects.filter(title=OuterRef('pk'))
+            .order_by()
+            .values('title')
+        )
+        with transaction.atomic():
+            updated = Title.objects.update(
+                rating=Subquery(
+                    reviews.annotate(avg=Avg('score')).values('avg'),
+                    output_field=FloatField(),
+                ),
+                review_count=Coalesce(
+                    Subquery(
+                        reviews.annotate(count=Count('pk')).values('count'),
+                        output_field=IntegerField(),
+                    ),
+                    0,
+                ),
+            )
+            bump_catalog_generation()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитаны рейтинги {updated} произведений')
+        )
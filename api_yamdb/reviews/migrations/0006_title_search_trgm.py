@@ -0,0 +1,41 @@
+from django.db import migrations
+
+# Индексы по тем же выражениям, что строит icontains на postgresql:
+# UPPER(col::text) LIKE UPPER('%...%'), поэтому поиск и фильтр name
+# перестают сканировать всю таблицу.
+INDEXES = {
+    'reviews_title_name_trgm': 'UPPER("name"::text)',
+    'reviews_title_description_trgm': 'UPPER("description"::text)',
+}
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    # Расширение может быть общим с другими объектами базы, поэтому при
+    # откате миграции оно не удаляется.
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, expression in INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" '
+            f'ON "reviews_title" USING gin ({expression} gin_trgm_ops)'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('reviews', '0005_title_rating_review_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
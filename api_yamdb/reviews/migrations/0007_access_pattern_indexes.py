@@ -0,0 +1,101 @@
+from django.db import migrations, models
+from django.db.models import Min
+
+# Индексы под выборки представлений: отзывы произведения по -pub_date,
+# комментарии отзыва по -id, произведения по категории и году по -id.
+INDEXES = [
+    ('review', models.Index(fields=['title', '-pub_date', 'id'],
+                            name='review_title_pub_date_idx')),
+    ('comment', models.Index(fields=['review', '-id'],
+                             name='comment_review_id_idx')),
+    ('title', models.Index(fields=['category', '-id'],
+                           name='title_category_id_idx')),
+    ('title', models.Index(fields=['year', '-id'],
+                           name='title_year_id_idx')),
+]
+UNIQUE_GENRE_TITLE = models.UniqueConstraint(
+    fields=['genre', 'title'], name='unique_genre_title'
+)
+
+
+def create_indexes(apps, schema_editor):
+    # На postgresql индексы строятся CONCURRENTLY, без блокировки записи.
+    postgresql = schema_editor.connection.vendor == 'postgresql'
+    for model_name, index in INDEXES:
+        model = apps.get_model('reviews', model_name)
+        if postgresql:
+            sql = str(index.create_sql(model, schema_editor))
+            schema_editor.execute(sql.replace(
+                'CREATE INDEX', 'CREATE INDEX CONCURRENTLY IF NOT EXISTS', 1
+            ))
+        else:
+            schema_editor.add_index(model, index)
+
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    first = GenreTitle.objects.order_by().values('genre', 'title').annotate(
+        first=Min('id')
+    ).values('first')
+    GenreTitle.objects.exclude(id__in=first).delete()
+    if postgresql:
+        name = UNIQUE_GENRE_TITLE.name
+        table = GenreTitle._meta.db_table
+        schema_editor.execute(
+            f'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS "{name}" '
+            f'ON "{table}" ("genre_id", "title_id")'
+        )
+        schema_editor.execute(
+            f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" '
+            f'UNIQUE USING INDEX "{name}"'
+        )
+    else:
+        # add_constraint на sqlite пересобирает таблицу по исторической
+        # модели, в которой ограничения ещё нет, - создаём его напрямую.
+        schema_editor.execute(
+            UNIQUE_GENRE_TITLE.create_sql(GenreTitle, schema_editor)
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    postgresql = schema_editor.connection.vendor == 'postgresql'
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    if postgresql:
+        schema_editor.execute(
+            f'ALTER TABLE "{GenreTitle._meta.db_table}" DROP CONSTRAINT '
+            f'IF EXISTS "{UNIQUE_GENRE_TITLE.name}"'
+        )
+    else:
+        schema_editor.execute(
+            UNIQUE_GENRE_TITLE.remove_sql(GenreTitle, schema_editor)
+        )
+    for model_name, index in INDEXES:
+        if postgresql:
+            schema_editor.execute(
+                f'DROP INDEX CONCURRENTLY IF EXISTS "{index.name}"'
+            )
+        else:
+            schema_editor.remove_index(
+                apps.get_model('reviews', model_name), index
+            )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('reviews', '0006_title_search_trgm'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(create_indexes, drop_indexes),
+            ],
+            state_operations=[
+                migrations.AddIndex(model_name=model_name, index=index)
+                for model_name, index in INDEXES
+            ] + [
+                migrations.AddConstraint(model_name='genretitle',
+                                         constraint=UNIQUE_GENRE_TITLE),
+            ],
+        ),
+    ]
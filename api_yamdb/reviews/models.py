@@ -1,5 +1,5 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -66,9 +66,25 @@ class Title(models.Model):
         blank=True,
         verbose_name='Title description'
     )
+    rating = models.FloatField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Title rating'
+    )
+    review_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Title review count'
+    )
 
     class Meta:
         ordering = ["-id"]
+        indexes = [
+            models.Index(fields=['category', '-id'],
+                         name='title_category_id_idx'),
+            models.Index(fields=['year', '-id'], name='title_year_id_idx'),
+        ]
         verbose_name = 'Title'
 
 
@@ -85,6 +101,10 @@ class GenreTitle(models.Model):
     )
 
     class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['genre', 'title'], name='unique_genre_title')
+        ]
         verbose_name = 'GenreTitle'
 
 
@@ -124,8 +144,26 @@ class Review(models.Model):
             models.UniqueConstraint(
                 fields=['author', 'title'], name="unique_review")
         ]
+        indexes = [
+            # id - как в cursor_ordering ReviewViewSet.
+            models.Index(fields=['title', '-pub_date', 'id'],
+                         name='review_title_pub_date_idx'),
+        ]
         verbose_name = 'Reviews'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем оценку из базы, чтобы пересчитать рейтинг при её смене.
+        instance._loaded_score = instance.__dict__.get('score')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Отзыв и агрегаты произведения сохраняются в одной транзакции,
+        # их обновляет обработчик post_save из reviews.signals.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     review = models.ForeignKey(
@@ -151,6 +189,10 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ["-id"]
+        indexes = [
+            models.Index(fields=['review', '-id'],
+                         name='comment_review_id_idx'),
+        ]
         verbose_name = 'Comment'
 
     def __str__(self):
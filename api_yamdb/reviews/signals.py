@@ -0,0 +1,55 @@
+from django.db.models import (Case, ExpressionWrapper, F, FloatField, Value,
+                              When)
+from django.db.models.functions import Coalesce, Round
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Review, Title
+
+
+def update_title_rating(title_id, count_delta, score_delta):
+    """Сдвигает рейтинг и число отзывов произведения одним UPDATE.
+
+    Сумма оценок восстанавливается из rating * review_count: оценки целые,
+    поэтому округление даёт её точно и рейтинг совпадает с AVG(score).
+    Возвращает число обновлённых строк.
+    """
+    new_count = F('review_count') + count_delta
+    score_sum = Round(ExpressionWrapper(
+        Coalesce(F('rating'), Value(0.0)) * F('review_count'),
+        output_field=FloatField(),
+    ))
+    return Title.objects.filter(pk=title_id).update(
+        review_count=new_count,
+        rating=Case(
+            When(review_count=-count_delta, then=Value(None)),
+            default=ExpressionWrapper(
+                (score_sum + score_delta) / new_count,
+                output_field=FloatField(),
+            ),
+            output_field=FloatField(),
+        ),
+    )
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    loaded_score = getattr(instance, '_loaded_score', None)
+    if created:
+        if not update_title_rating(instance.title_id, 1, instance.score):
+            # Откатывает транзакцию Review.save() вместе с отзывом.
+            raise Title.DoesNotExist(
+                f'Title {instance.title_id} does not exist'
+            )
+    elif loaded_score is not None and instance.score != loaded_score:
+        update_title_rating(
+            instance.title_id, 0, instance.score - loaded_score
+        )
+    instance._loaded_score = instance.score
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    update_title_rating(instance.title_id, -1, -instance.score)
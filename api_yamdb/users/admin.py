@@ -1,5 +1,18 @@
 from django.contrib import admin
 
-from .models import User
+from .models import OutgoingEmail, User
 
-admin.site.register(User)
+
+class UserAdmin(admin.ModelAdmin):
+    query_budget = {'changelist_view': 5}
+
+
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'to', 'subject', 'attempts', 'sent', 'failed')
+    list_filter = ('failed',)
+    search_fields = ('to',)
+    query_budget = {'changelist_view': 5}
+
+
+admin.site.register(User, UserAdmin)
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
@@ -1,5 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class UsersConfig(AppConfig):
     name = 'users'
+
+    def ready(self):
+        from .authentication import invalidate_user
+        from .models import User
+
+        post_save.connect(
+            invalidate_user, sender=User, dispatch_uid='user_cache_save'
+        )
+        post_delete.connect(
+            invalidate_user, sender=User, dispatch_uid='user_cache_delete'
+        )
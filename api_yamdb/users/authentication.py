@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+
+# Поля, которых хватает аутентификации и классам из api/permissions.py.
+CACHED_FIELDS = ('id', 'username', 'role', 'is_active', 'is_superuser')
+
+
+class UserCache:
+    """LRU-кэш полей пользователя с ограниченным временем жизни.
+
+    Кэш свой у каждого процесса. Сигналы модели User сбрасывают запись в
+    процессе, где пользователь изменён; в остальных она живёт не дольше ttl.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+user_cache = UserCache(
+    settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL
+)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication, который не читает пользователя на каждый запрос.
+
+    Возвращает экземпляр User с загруженными CACHED_FIELDS, остальные
+    поля отложены и подгрузятся из базы при обращении к ним.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+
+        cached = user_cache.get(user_id)
+        if cached is None:
+            queryset = self.user_model.objects.filter(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+            values = queryset.values_list(*CACHED_FIELDS).first()
+            if values is None:
+                raise AuthenticationFailed(
+                    _('User not found'), code='user_not_found'
+                )
+            # База, из которой прочитана строка (с репликами - не default).
+            cached = (queryset.db, values)
+            user_cache.set(user_id, cached)
+
+        user = _user_from_values(self.user_model, *cached)
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+        return user
+
+
+def _user_from_values(user_model, alias, values):
+    loaded = dict(zip(CACHED_FIELDS, values))
+    field_names = [
+        field.attname for field in user_model._meta.concrete_fields
+        if field.attname in loaded
+    ]
+    return user_model.from_db(
+        alias, field_names, [loaded[name] for name in field_names]
+    )
+
+
+def invalidate_user(sender, instance, **kwargs):
+    user_cache.invalidate(getattr(instance, api_settings.USER_ID_FIELD))
@@ -0,0 +1,76 @@
+import time
+from contextlib import ExitStack
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.authentication import CachedJWTAuthentication, user_cache
+
+
+class Command(BaseCommand):
+    help = (
+        'Замер аутентификации по JWT: JWTAuthentication (пользователь из '
+        'базы на каждый запрос) против CachedJWTAuthentication. Запросов '
+        'в секунду и запросов к базе на один запрос API.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5000)
+        parser.add_argument(
+            '--username', help='Чей токен; по умолчанию первый пользователь.'
+        )
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.order_by('id')
+        if options['username']:
+            users = users.filter(username=options['username'])
+        user = users.first()
+        if user is None:
+            raise CommandError('Нет пользователя для токена.')
+        request = Request(APIRequestFactory().get(
+            '/api/v1/users/me/',
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}',
+        ))
+        self.stdout.write(
+            f'{"класс":<26}{"запросов/с":>12}{"мкс":>8}{"SQL/запрос":>12}'
+            f'{"ускорение":>11}'
+        )
+        baseline = None
+        for authentication in (JWTAuthentication(),
+                               CachedJWTAuthentication()):
+            user_cache.clear()
+            elapsed, queries = self.measure(
+                authentication, request, options['requests']
+            )
+            rate = options['requests'] / elapsed
+            baseline = baseline or rate
+            self.stdout.write(
+                f'{type(authentication).__name__:<26}{rate:>12.0f}'
+                f'{elapsed / options["requests"] * 1e6:>8.0f}'
+                f'{queries / options["requests"]:>12.3f}'
+                f'{rate / baseline:>10.1f}x'
+            )
+
+    def measure(self, authentication, request, requests):
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with ExitStack() as stack:
+            # Первый запрос заполняет кэш, замеряется установившийся режим.
+            authentication.authenticate(request)
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count))
+            started = time.perf_counter()
+            for _ in range(requests):
+                authentication.authenticate(request)
+            elapsed = time.perf_counter() - started
+        return elapsed, queries
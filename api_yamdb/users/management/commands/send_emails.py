@@ -0,0 +1,41 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.outbox import send_batch
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди OutgoingEmail.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--sleep', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Разобрать очередь и выйти.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                processed = send_batch(options['batch_size'])
+            except Exception:
+                # Сбой базы не должен останавливать воркер: пробуем
+                # снова после паузы.
+                logger.exception('Ошибка при разборе очереди писем')
+                if options['once']:
+                    raise
+                processed = 0
+            if processed:
+                self.stdout.write(f'Обработано писем: {processed}')
+                continue
+            if options['once']:
+                return
+            time.sleep(options['sleep'])
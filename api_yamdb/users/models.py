@@ -22,3 +22,21 @@ class User(AbstractUser):
 
     def is_moderator(self):
         return self.role == 'moderator'
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку (outbox)."""
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.CharField('Отправитель', max_length=254)
+    to = models.EmailField('Получатель')
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    next_attempt = models.DateTimeField('Следующая попытка', db_index=True)
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    sent = models.DateTimeField('Отправлено', null=True, blank=True)
+    failed = models.BooleanField('Не отправлено', default=False)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Outgoing email'
@@ -0,0 +1,106 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(subject, body, to, from_email=None):
+    """Кладёт письмо в очередь; отправит его команда send_emails."""
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=to,
+        next_attempt=timezone.now(),
+    )
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед повторной попыткой."""
+    return timedelta(seconds=min(
+        settings.EMAIL_OUTBOX_RETRY_BASE * 2 ** (attempts - 1),
+        settings.EMAIL_OUTBOX_RETRY_MAX,
+    ))
+
+
+def claim(batch_size):
+    """Берёт в аренду пачку писем, готовых к отправке.
+
+    Короткая транзакция с SKIP LOCKED переносит next_attempt на срок
+    аренды: другие воркеры эти письма не возьмут, а если воркер упадёт
+    до конца отправки, они снова станут доступны по истечении аренды.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True)
+            .filter(sent__isnull=True, failed=False, next_attempt__lte=now)
+            .order_by('next_attempt', 'id')[:batch_size]
+        )
+        lease = now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE)
+        OutgoingEmail.objects.filter(
+            pk__in=[email.pk for email in emails]
+        ).update(next_attempt=lease)
+    for email in emails:
+        email.next_attempt = lease
+    return emails
+
+
+def send_batch(batch_size):
+    """Отправляет пачку писем через одно соединение с почтовым сервером.
+
+    Письма берутся в аренду (claim), отправка идёт вне транзакции и без
+    блокировок строк. Ошибка соединения считается неудачной попыткой
+    каждого письма пачки. Возвращает число обработанных писем.
+    """
+    emails = claim(batch_size)
+    if not emails:
+        return 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            _failed(email, error)
+    else:
+        try:
+            for email in emails:
+                _send(connection, email)
+        finally:
+            connection.close()
+    for email in emails:
+        email.save(update_fields=[
+            'attempts', 'sent', 'failed', 'next_attempt', 'last_error'
+        ])
+    return len(emails)
+
+
+def _failed(email, error):
+    email.attempts += 1
+    logger.warning('Письмо %s не отправлено: %s', email.pk, error)
+    email.last_error = str(error)
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.failed = True
+    else:
+        email.next_attempt = timezone.now() + retry_delay(email.attempts)
+
+
+def _send(connection, email):
+    try:
+        EmailMessage(
+            email.subject, email.body, email.from_email, [email.to],
+            connection=connection,
+        ).send()
+    except Exception as error:
+        _failed(email, error)
+    else:
+        email.attempts += 1
+        email.sent = timezone.now()
+        email.last_error = ''
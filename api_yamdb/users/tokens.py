@@ -0,0 +1,33 @@
+import time
+
+from django.conf import settings
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import base36_to_int, int_to_base36
+
+KEY_SALT = 'users.tokens.confirmation_code'
+
+
+def _signature(user, timestamp):
+    # last_login меняется при выдаче токена, поэтому код одноразовый.
+    value = f'{user.pk}:{user.last_login}:{user.is_active}:{timestamp}'
+    return salted_hmac(KEY_SALT, value).hexdigest()[::2]
+
+
+def make_confirmation_code(user):
+    """Код подтверждения: время выпуска и HMAC от состояния пользователя."""
+    timestamp = int_to_base36(int(time.time()))
+    return f'{timestamp}-{_signature(user, timestamp)}'
+
+
+def check_confirmation_code(user, code):
+    """Проверяет подпись и срок жизни кода без обращений к базе."""
+    try:
+        timestamp, _ = code.split('-')
+        issued = base36_to_int(timestamp)
+    except (AttributeError, ValueError):
+        return False
+    if time.time() - issued > settings.CONFIRMATION_CODE_TIMEOUT:
+        return False
+    return constant_time_compare(
+        code, f'{timestamp}-{_signature(user, timestamp)}'
+    )
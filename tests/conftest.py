@@ -1,9 +1,47 @@
+import os
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
+    'tests.fixtures.fixture_user',
+    'tests.fixtures.fixture_data',
+    'tests.fixtures.fixture_query_budget',
+    'tests.fixtures.fixture_query_plan',
 ]
+
+
+def pytest_configure(config):
+    # Без явно заданной DB_ENGINE тесты работают на sqlite в памяти,
+    # чтобы не требовать запущенный postgres.
+    if os.getenv('DB_ENGINE'):
+        return
+    from django.conf import settings
+    from django.db import connections
+    settings.DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        },
+        # Отдельная база вместо реплики; включается в test_replicas.
+        'replica': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        },
+    }
+    # django.setup() уже успел создать подключения по старым настройкам.
+    connections.__dict__.pop('databases', None)
+    connections.__init__(settings.DATABASES)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+    from users.authentication import user_cache
+    cache.clear()
+    user_cache.clear()
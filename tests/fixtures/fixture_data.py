@@ -0,0 +1,45 @@
+import pytest
+
+from reviews.models import Category, Genre, GenreTitle, Title
+
+
+@pytest.fixture
+def category():
+    return Category.objects.create(name='Фильм', slug='films')
+
+
+@pytest.fixture
+def genres():
+    return [
+        Genre.objects.create(name='Драма', slug='drama'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+    ]
+
+
+@pytest.fixture
+def title(category, genres):
+    title = Title.objects.create(
+        name='Побег из Шоушенка', year=1994, category=category
+    )
+    for genre in genres:
+        GenreTitle.objects.create(title=title, genre=genre)
+    return title
+
+
+@pytest.fixture
+def make_titles(category, genres):
+    def make(count):
+        existing = set(Title.objects.values_list('id', flat=True))
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {number}', year=2000, category=category)
+            for number in range(count)
+        )
+        # sqlite не возвращает id из bulk_create, перечитываем записи.
+        titles = list(Title.objects.all())
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title=title, genre=genre)
+            for title in titles for genre in genres
+            if title.id not in existing
+        )
+        return titles
+    return make
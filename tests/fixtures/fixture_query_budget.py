@@ -0,0 +1,31 @@
+from contextlib import ExitStack
+from urllib.parse import urlsplit
+
+import pytest
+from django.db import connections
+from django.urls import resolve
+
+from api.budget import get_budget, over_budget
+
+
+@pytest.fixture
+def assert_query_budget():
+    """Выполняет запрос клиентом и сверяет число запросов ко всем базам,
+    включая реплики, с query_budget действия, которое его обработало."""
+    def check(client, method, path, **kwargs):
+        name, budget = get_budget(resolve(urlsplit(path).path).func, method)
+        assert budget is not None, f'{name}: не объявлен query_budget'
+        queries = []
+
+        def capture(execute, sql, params, many, context):
+            queries.append(f'[{context["connection"].alias}] {sql}')
+            return execute(sql, params, many, context)
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(capture))
+            response = getattr(client, method.lower())(path, **kwargs)
+        error = over_budget(name, budget, len(queries))
+        assert error is None, '\n'.join([error] + queries)
+        return response
+    return check
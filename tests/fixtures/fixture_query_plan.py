@@ -0,0 +1,121 @@
+import json
+import re
+from collections import namedtuple
+
+import pytest
+from django.db import connection
+
+# Таблицы, которые в работе растут без предела: их нельзя читать целиком.
+LARGE_TABLES = frozenset({
+    'reviews_title', 'reviews_genretitle', 'reviews_review',
+    'reviews_comment', 'users_user',
+})
+
+Plan = namedtuple('Plan', 'scans sorted text')
+
+SQLITE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)')
+INDEX_SCANS = ('Index Scan', 'Index Only Scan')
+WHERE = re.compile(r'\bWHERE\b')
+LIMIT = re.compile(r'\bLIMIT\b')
+OFFSET = re.compile(r'\bOFFSET\b')
+UNFILTERED_COUNT = re.compile(r'^SELECT COUNT\(\*\)(?:(?!\bWHERE\b).)*$', re.S)
+
+
+def bounded(sql):
+    """Без условий и со LIMIT без OFFSET обход по порядку индекса
+    останавливается через LIMIT строк, а не читает таблицу."""
+    return (LIMIT.search(sql) and not OFFSET.search(sql)
+            and not WHERE.search(sql))
+
+
+def explain_sqlite(cursor, sql, params):
+    # sqlite3 кэширует подготовленные запросы по тексту, а EXPLAIN не
+    # перестраивается после изменения схемы: версия схемы в тексте не даёт
+    # взять план, построенный до удаления индекса.
+    cursor.execute('PRAGMA schema_version')
+    version = cursor.fetchone()[0]
+    cursor.execute(f'EXPLAIN QUERY PLAN /* {version} */ {sql}', params)
+    details = [row[-1] for row in cursor.fetchall()]
+    sorted_ = any('TEMP B-TREE' in detail for detail in details)
+    # Поиск по индексу - только SEARCH. SCAN читает таблицу или индекс
+    # целиком, даже USING INDEX под ORDER BY: с фильтром вне индекса обход
+    # по порядку дойдёт до конца таблицы.
+    scans = set()
+    if not (bounded(sql) and not sorted_):
+        scans = {match.group(1)
+                 for match in filter(None, map(SQLITE_SCAN.match, details))}
+    return Plan(scans, sorted_, '\n'.join(details))
+
+
+def explain_postgresql(cursor, sql, params):
+    # На маленькой тестовой базе seq scan дешевле любого индекса; с
+    # запретом планировщик выберет его, только если индекса нет.
+    cursor.execute('SET enable_seqscan = off')
+    try:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    finally:
+        cursor.execute('RESET enable_seqscan')
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    scans, sorted_ = set(), False
+    nodes = [plan[0]['Plan']]
+    while nodes:
+        node = nodes.pop()
+        if node['Node Type'] == 'Seq Scan':
+            scans.add(node['Relation Name'])
+        # Без seq scan планировщик обходит весь индекс pkey и отбрасывает
+        # строки фильтром: это тот же полный просмотр.
+        if (node['Node Type'] in INDEX_SCANS and 'Index Cond' not in node
+                and ('Filter' in node or not bounded(sql))):
+            scans.add(node['Relation Name'])
+        sorted_ = sorted_ or node['Node Type'] in ('Sort', 'Incremental Sort')
+        nodes.extend(node.get('Plans', ()))
+    return Plan(scans, sorted_, json.dumps(plan, indent=2))
+
+
+def explain(sql, params):
+    """План запроса: таблицы, прочитанные целиком, и есть ли сортировка
+    вне индекса."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            return explain_postgresql(cursor, sql, params)
+        return explain_sqlite(cursor, sql, params)
+
+
+@pytest.fixture
+def assert_index_scans():
+    """Выполняет GET клиентом и проверяет EXPLAIN каждого SELECT: большие
+    таблицы читаются только по индексу. С ordered=True основной запрос
+    страницы (с LIMIT) должен ещё и получать порядок из индекса.
+
+    COUNT(*) без условий читает всю таблицу при любых индексах; с
+    unfiltered_count=True такой запрос (общее число страниц) не
+    проверяется.
+    """
+    def check(client, path, ordered=False, unfiltered_count=False):
+        queries = []
+
+        def capture(execute, sql, params, many, context):
+            skip = unfiltered_count and UNFILTERED_COUNT.match(sql)
+            if sql.lstrip().upper().startswith('SELECT') and not skip:
+                queries.append((sql, params))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(capture):
+            response = client.get(path)
+        assert response.status_code == 200, path
+        assert queries, f'{path}: нет запросов к базе'
+        for sql, params in queries:
+            plan = explain(sql, params)
+            scans = plan.scans & LARGE_TABLES
+            assert not scans, (
+                f'{path}: полный просмотр {", ".join(sorted(scans))}\n'
+                f'{sql}\n{plan.text}'
+            )
+            if ordered and ' LIMIT ' in sql:
+                assert not plan.sorted, (
+                    f'{path}: сортировка не по индексу\n{sql}\n{plan.text}'
+                )
+        return response
+    return check
@@ -0,0 +1,68 @@
+import asyncio
+import threading
+
+from api_yamdb.asgi import ThreadedWsgiToAsgi
+
+
+class Body(list):
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def call(app, method, path, body=b''):
+    scope = {
+        'type': 'http', 'method': method, 'path': path,
+        'query_string': b'', 'http_version': '1.1', 'headers': [],
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return messages
+
+
+class TestThreadedWsgiToAsgi:
+
+    def setup_method(self):
+        self.responses = []
+
+        def wsgi(environ, start_response):
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            response = Body([
+                threading.current_thread().name.encode(),
+                environ['wsgi.input'].read(),
+            ])
+            self.responses.append(response)
+            return response
+
+        self.app = ThreadedWsgiToAsgi(wsgi, read_threads=1, write_threads=1)
+
+    def test_reads_and_writes_use_separate_pools(self):
+        for path in ('/api/v1/titles/', '/api/v1/titles/1/',
+                     '/api/v1/genres/', '/api/v1/titles/1/reviews/2/',
+                     '/api/v1/titles/1/reviews/2/comments/'):
+            messages = call(self.app, 'GET', path)
+            assert messages[1]['body'].startswith(b'asgi-read'), (
+                f'Проверьте, что GET {path} идёт в пул чтения'
+            )
+        messages = call(self.app, 'POST', '/api/v1/titles/', b'data')
+        assert messages[1]['body'].startswith(b'asgi-write')
+        assert messages[2]['body'] == b'data'
+        messages = call(self.app, 'GET', '/api/v1/users/me/')
+        assert messages[1]['body'].startswith(b'asgi-write')
+
+    def test_response_is_closed(self):
+        messages = call(self.app, 'GET', '/api/v1/titles/')
+        assert messages[0]['status'] == 200
+        assert messages[-1] == {'type': 'http.response.body'}
+        assert self.responses[0].closed, (
+            'Проверьте, что ответ WSGI закрывается: иначе Django не '
+            'отправит request_finished и не закроет соединение с БД'
+        )
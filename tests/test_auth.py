@@ -0,0 +1,69 @@
+import re
+from unittest import mock
+
+import pytest
+from rest_framework.test import APIClient
+
+from users.models import OutgoingEmail
+
+
+def _signup(client, username='newuser', email='new@yamdb.fake'):
+    return client.post(
+        '/api/v1/auth/signup/', {'username': username, 'email': email}
+    )
+
+
+def _code():
+    body = OutgoingEmail.objects.latest('id').body
+    return re.search(r'Your confirmation code: (\S+)\.', body).group(1)
+
+
+@pytest.mark.django_db
+class TestAuthFlow:
+
+    def test_signup_and_token(self, django_assert_max_num_queries):
+        client = APIClient()
+        with mock.patch(
+            'django.contrib.auth.hashers.PBKDF2PasswordHasher.encode'
+        ) as encode:
+            # проверка занятости, пользователь, письмо в очереди
+            # и SAVEPOINT/RELEASE от atomic внутри тестовой транзакции
+            with django_assert_max_num_queries(5):
+                assert _signup(client).status_code == 200
+            code = _code()
+            # пользователь, отметка об использовании кода
+            with django_assert_max_num_queries(2):
+                response = client.post('/api/v1/auth/token/', {
+                    'username': 'newuser', 'confirmation_code': code
+                })
+        assert response.status_code == 201 and 'token' in response.json()
+        assert not encode.called, (
+            'Проверьте, что код подтверждения не хешируется как пароль'
+        )
+
+        again = client.post('/api/v1/auth/token/', {
+            'username': 'newuser', 'confirmation_code': code
+        })
+        assert again.status_code == 400, 'Проверьте, что код одноразовый'
+
+    def test_wrong_and_expired_code(self, settings):
+        client = APIClient()
+        _signup(client)
+        code = _code()
+        assert client.post('/api/v1/auth/token/', {
+            'username': 'newuser', 'confirmation_code': code + 'x'
+        }).status_code == 400
+        assert client.post('/api/v1/auth/token/', {
+            'username': 'nobody', 'confirmation_code': code
+        }).status_code == 404
+        settings.CONFIRMATION_CODE_TIMEOUT = -1
+        assert client.post('/api/v1/auth/token/', {
+            'username': 'newuser', 'confirmation_code': code
+        }).status_code == 400
+
+    def test_signup_conflicts(self, user):
+        response = _signup(APIClient(), user.username, user.email)
+        assert response.status_code == 400
+        assert set(response.json()) == {'username', 'email'}
+        response = _signup(APIClient(), 'me', 'me@yamdb.fake')
+        assert response.status_code == 400
@@ -0,0 +1,100 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from api.loadtest import Connection
+from api.management.commands.bench_api import MIX, regressions
+from users.models import User
+
+
+def result(rps, p95):
+    return {
+        'rps': rps,
+        'routes': {'titles-list': {'requests': 100, 'p95_ms': p95}},
+    }
+
+
+class TestRegressions:
+
+    def test_within_threshold(self):
+        assert regressions(result(90, 11), result(100, 10), 0.2) == []
+
+    def test_slower_route(self):
+        found = regressions(result(100, 13), result(100, 10), 0.2)
+        assert len(found) == 1 and found[0].startswith('titles-list'), (
+            'Проверьте, что рост p95 маршрута больше порога - регрессия'
+        )
+
+    def test_lower_throughput(self):
+        found = regressions(result(70, 10), result(100, 10), 0.2)
+        assert len(found) == 1 and found[0].startswith('RPS')
+
+    def test_few_samples_ignored(self):
+        current = result(100, 50)
+        current['routes']['titles-list']['requests'] = 5
+        assert regressions(current, result(100, 10), 0.2) == []
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBenchApi:
+
+    def test_run(self, live_server, tmp_path):
+        call_command(
+            'generate_data', '--users', '30', '--titles', '10',
+            '--reviews', '100', '--comments', '40',
+        )
+        saved = tmp_path / 'result.json'
+        # Одно соединение: sqlite в памяти не выдерживает параллельных
+        # записей из потоков live_server.
+        call_command(
+            'bench_api', '--url', live_server.url, '--connections', '1',
+            '--duration', '1.5', '--warmup', '0', '--save', str(saved),
+        )
+        result = json.loads(saved.read_text(encoding='utf-8'))
+        assert result['requests'] > 0
+        assert result['errors'] == 0, (
+            'Проверьте, что смесь запросов проходит без ошибок'
+        )
+        assert set(result['routes']) <= set(MIX) | {'token'}
+        for row in result['routes'].values():
+            assert row['p50_ms'] <= row['p95_ms'] <= row['p99_ms']
+        assert not User.objects.filter(
+            username__startswith='bench-'
+        ).exists(), 'Проверьте, что созданные замером пользователи удалены'
+
+        with pytest.raises(CommandError, match='Регрессия'):
+            result['rps'] *= 10
+            saved.write_text(json.dumps(result), encoding='utf-8')
+            call_command(
+                'bench_api', '--url', live_server.url, '--connections', '1',
+                '--duration', '0.5', '--warmup', '0',
+                '--baseline', str(saved),
+            )
+
+    def test_network_error_keeps_visitor(self, live_server, tmp_path,
+                                         monkeypatch):
+        call_command('generate_data', '--users', '5', '--titles', '5',
+                     '--reviews', '10', '--comments', '5')
+        request = Connection.request
+        failed = []
+
+        async def flaky(self, *args, **kwargs):
+            if not failed:
+                failed.append(True)
+                raise ConnectionResetError
+            return await request(self, *args, **kwargs)
+
+        monkeypatch.setattr(Connection, 'request', flaky)
+        saved = tmp_path / 'result.json'
+        call_command(
+            'bench_api', '--url', live_server.url, '--connections', '1',
+            '--duration', '0.5', '--warmup', '0', '--save', str(saved),
+        )
+        result = json.loads(saved.read_text(encoding='utf-8'))
+        assert result['errors'] == 1
+        assert result['requests'] > 0, (
+            'Проверьте, что после сетевой ошибки посетитель продолжает '
+            'отправлять запросы'
+        )
@@ -0,0 +1,82 @@
+import pytest
+from rest_framework.test import APIClient
+
+from api import metrics
+from reviews.models import Category, Genre, Review
+
+
+def _counters():
+    counters = metrics.snapshot()
+    return (
+        counters.get('catalog_cache.hit', 0),
+        counters.get('catalog_cache.miss', 0),
+    )
+
+
+@pytest.mark.django_db
+class TestCatalogCache:
+
+    def test_hit_skips_database(self, title, django_assert_num_queries):
+        client = APIClient()
+        hits, misses = _counters()
+        first = client.get('/api/v1/titles/')
+        with django_assert_num_queries(0):
+            second = client.get('/api/v1/titles/')
+        assert first.json() == second.json()
+        assert _counters() == (hits + 1, misses + 1), (
+            'Проверьте, что попадания и промахи кэша считаются'
+        )
+
+    def test_query_string_in_key(self, make_titles):
+        make_titles(3)
+        client = APIClient()
+        assert len(client.get('/api/v1/titles/?limit=1').json()['results']) == 1
+        assert len(client.get('/api/v1/titles/?limit=2').json()['results']) == 2
+        first = client.get('/api/v1/titles/?limit=1&offset=1').json()
+        second = client.get('/api/v1/titles/?offset=1&limit=1').json()
+        assert first == second
+
+    @pytest.mark.parametrize('url, change', [
+        ('/api/v1/categories/',
+         lambda title, user: Category.objects.create(name='Книга', slug='b')),
+        ('/api/v1/genres/',
+         lambda title, user: Genre.objects.create(name='Ужасы', slug='h')),
+        ('/api/v1/titles/',
+         lambda title, user: Review.objects.create(
+             title=title, author=user, text='a', score=9)),
+        ('/api/v1/titles/',
+         lambda title, user: title.genretitle_set.first().delete()),
+    ])
+    def test_write_invalidates(self, title, user, url, change):
+        client = APIClient()
+        before = client.get(url).json()
+        change(title, user)
+        assert client.get(url).json() != before, (
+            'Проверьте, что изменение каталога сбрасывает кэш'
+        )
+
+    def test_api_write_invalidates(self, title, genres, admin_client):
+        client = APIClient()
+        assert client.get('/api/v1/titles/').json()['count'] == 1
+        response = admin_client.post('/api/v1/titles/', {
+            'name': 'Новое', 'year': 2000, 'category': 'films',
+            'genre': ['drama'],
+        })
+        assert response.status_code == 201
+        assert client.get('/api/v1/titles/').json()['count'] == 2
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/categories/films/', '/api/v1/genres/drama/',
+        '/api/v1/categories/missing/', '/api/v1/genres/missing/',
+    ])
+    def test_catalog_detail_not_served(self, title, url):
+        # У категорий и жанров нет retrieve: кэш не должен его добавлять.
+        assert APIClient().get(url).status_code in (404, 405), (
+            'Проверьте, что GET к категории или жанру не падает с 500'
+        )
+
+    def test_metrics_endpoint(self, admin_client, user_client):
+        assert user_client.get('/api/v1/metrics/').status_code == 403
+        response = admin_client.get('/api/v1/metrics/')
+        assert response.status_code == 200
+        assert isinstance(response.json(), dict)
@@ -0,0 +1,147 @@
+from unittest import mock
+
+import pytest
+from rest_framework.test import APIClient
+
+from api import cache as catalog_cache
+from api.serializers import ReviewsSerializer, TitleSerializer
+from reviews.models import Comment, Review
+
+
+def _revalidate(client, url, response):
+    return client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+
+class Clock:
+    """Подменяет time в api.cache: секунды Last-Modified под контролем."""
+
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(1700000000.5)
+    monkeypatch.setattr(catalog_cache, 'time', clock)
+    return clock
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def test_reviews(self, title, user, admin):
+        review = Review.objects.create(
+            title=title, author=user, text='a', score=5
+        )
+        client = APIClient()
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        first = client.get(url)
+        assert first.status_code == 200 and first.has_header('ETag')
+
+        with mock.patch.object(ReviewsSerializer, 'to_representation') as rep:
+            second = _revalidate(client, url, first)
+        assert second.status_code == 304 and not rep.called, (
+            'Проверьте, что на неизменный ресурс приходит 304 без сериализации'
+        )
+
+        review = Review.objects.get(pk=review.pk)
+        review.text = 'изменено'
+        review.save()
+        assert _revalidate(client, url, first).status_code == 200, (
+            'Проверьте, что правка отзыва меняет ETag'
+        )
+        Review.objects.create(title=title, author=admin, text='b', score=7)
+        assert _revalidate(client, url, first).status_code == 200
+
+    def test_if_modified_since(self, clock, title, user):
+        Review.objects.create(title=title, author=user, text='a', score=5)
+        client = APIClient()
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        assert not client.get(url).has_header('Last-Modified'), (
+            'Проверьте, что Last-Modified не отдаётся, пока идёт секунда '
+            'последней записи'
+        )
+        clock.now += 2
+        first = client.get(url)
+        since = first['Last-Modified']
+        with mock.patch.object(ReviewsSerializer, 'to_representation') as rep:
+            second = client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        assert second.status_code == 304 and not rep.called, (
+            'Проверьте, что на If-Modified-Since без записей приходит 304'
+        )
+
+    @pytest.mark.parametrize('method,data', [
+        ('patch', {'text': 'изменено', 'score': 9}),
+        ('delete', None),
+    ])
+    def test_if_modified_since_after_write(self, clock, title, user, admin,
+                                           user_client, method, data):
+        Review.objects.create(title=title, author=admin, text='a', score=5)
+        review = Review.objects.create(
+            title=title, author=user, text='b', score=5
+        )
+        clock.now += 2
+        client = APIClient()
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        first = client.get(url)
+        since = first['Last-Modified']
+        # Запись в ту же секунду, что и первый ответ.
+        clock.now += 0.1
+        response = getattr(user_client, method)(
+            f'{url}{review.id}/', data, format='json'
+        )
+        assert response.status_code in (200, 204)
+        for _ in range(2):
+            second = client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+            assert second.status_code == 200, (
+                'Проверьте, что If-Modified-Since не даёт 304 после записи'
+            )
+            assert second.json() != first.json()
+            clock.now += 2
+
+    def test_review_detail_and_page(self, title, user):
+        review = Review.objects.create(
+            title=title, author=user, text='a', score=5
+        )
+        client = APIClient()
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/'
+        first = client.get(url)
+        assert _revalidate(client, url, first).status_code == 304
+        page = client.get(f'/api/v1/titles/{title.id}/reviews/?page=1')
+        assert page['ETag'] != first['ETag']
+
+    def test_comments(self, title, user):
+        review = Review.objects.create(
+            title=title, author=user, text='a', score=5
+        )
+        comment = Comment.objects.create(review=review, author=user, text='c')
+        client = APIClient()
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        first = client.get(url)
+        assert _revalidate(client, url, first).status_code == 304
+        comment.delete()
+        assert _revalidate(client, url, first).status_code == 200
+
+    def test_titles(self, clock, title, user):
+        clock.now += 2
+        client = APIClient()
+        url = f'/api/v1/titles/{title.id}/'
+        first = client.get(url)
+        assert client.get(
+            url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']
+        ).status_code == 304
+        with mock.patch.object(TitleSerializer, 'to_representation') as rep:
+            assert _revalidate(client, url, first).status_code == 304
+        assert not rep.called
+        Review.objects.create(title=title, author=user, text='a', score=5)
+        second = _revalidate(client, url, first)
+        assert second.status_code == 200 and second.json()['rating'] == 5
+        clock.now += 2
+        assert client.get(
+            url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']
+        ).status_code == 200, (
+            'Проверьте, что новый отзыв сдвигает Last-Modified произведения'
+        )
@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+
+import pytest
+from django.db.backends.postgresql import base as postgresql_base
+
+from api import metrics
+from api_yamdb.postgresql.base import DatabaseWrapper
+from api_yamdb.postgresql.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def counter(name):
+    return metrics.snapshot().get(name, 0)
+
+
+class TestConnectionPool:
+
+    def test_reuses_connections(self):
+        pool = ConnectionPool(max_size=2, idle_timeout=60, wait_timeout=1)
+        first = pool.checkout(FakeConnection)
+        pool.checkin(first)
+        assert pool.checkout(FakeConnection) is first, (
+            'Проверьте, что возвращённое соединение выдаётся повторно'
+        )
+        assert pool.size == 1
+
+    def test_timeout(self):
+        pool = ConnectionPool(max_size=1, idle_timeout=60, wait_timeout=0.05)
+        pool.checkout(FakeConnection)
+        timeouts = counter('db_pool.timeout')
+        with pytest.raises(PoolTimeout):
+            pool.checkout(FakeConnection)
+        assert counter('db_pool.timeout') == timeouts + 1
+
+    def test_waiter_gets_returned_connection(self):
+        pool = ConnectionPool(max_size=1, idle_timeout=60, wait_timeout=5)
+        connection = pool.checkout(FakeConnection)
+        waits = counter('db_pool.wait')
+        timer = threading.Timer(0.05, pool.checkin, [connection])
+        timer.start()
+        assert pool.checkout(FakeConnection) is connection
+        timer.join()
+        assert counter('db_pool.wait') == waits + 1
+
+    def test_idle_and_broken_connections_are_closed(self):
+        pool = ConnectionPool(max_size=2, idle_timeout=0.01, wait_timeout=1)
+        stale = pool.checkout(FakeConnection)
+        pool.checkin(stale)
+        time.sleep(0.02)
+        fresh = pool.checkout(FakeConnection)
+        assert stale.closed and fresh is not stale
+        pool.checkin(fresh)
+        other = pool.checkout(FakeConnection, check=lambda conn: False)
+        assert fresh.closed and other is not fresh
+        assert pool.size == 1
+
+    def test_backend_uses_pool_only_when_configured(self):
+        settings_dict = {'NAME': 'x', 'OPTIONS': {}, 'CONN_MAX_AGE': 0,
+                         'POOL': {'MAX_SIZE': 0}}
+        assert DatabaseWrapper(settings_dict, 'plain').pool is None
+        settings_dict['POOL'] = {'MAX_SIZE': 3}
+        pool = DatabaseWrapper(settings_dict, 'pooled').pool
+        assert pool.max_size == 3
+        assert DatabaseWrapper(settings_dict, 'pooled').pool is pool, (
+            'Проверьте, что потоки процесса делят один пул'
+        )
+
+    def test_pool_resolved_after_fork(self, monkeypatch):
+        monkeypatch.setattr(
+            postgresql_base.DatabaseWrapper, 'get_new_connection',
+            lambda self, conn_params: FakeConnection(),
+        )
+        settings_dict = {'NAME': 'x', 'OPTIONS': {}, 'CONN_MAX_AGE': 0,
+                         'POOL': {'MAX_SIZE': 2}}
+        # Обёртка создана в родителе до fork (preload_app).
+        wrapper = DatabaseWrapper(settings_dict, 'forked')
+        parent = wrapper.pool
+        inherited = wrapper.get_new_connection({})
+        wrapper.connection = inherited
+
+        pid = os.getpid()
+        monkeypatch.setattr(os, 'getpid', lambda: pid + 1)
+        child = wrapper.pool
+        assert child is not parent, (
+            'Проверьте, что после fork обёртка берёт пул своего процесса'
+        )
+        wrapper._close()
+        assert not inherited.closed and child.size == 0, (
+            'Проверьте, что соединение родителя не закрывается и не '
+            'попадает в пул воркера'
+        )
+        wrapper.connection = None
+        wrapper.get_new_connection({})
+        assert (parent.size, child.size) == (1, 1)
@@ -0,0 +1,140 @@
+import re
+import threading
+from os.path import join
+
+import pytest
+from django.test import RequestFactory
+
+from api import edge, metrics
+from .conftest import infra_dir_path
+
+
+def directives(response):
+    return {
+        part.strip() for part in response['Cache-Control'].split(',')
+    }
+
+
+@pytest.mark.django_db
+class TestEdgeCache:
+
+    def test_anonymous_catalog(self, client, title):
+        response = client.get('/api/v1/titles/')
+        assert {'public', 's-maxage=10', 'max-age=0',
+                'stale-while-revalidate=30'} <= directives(response), (
+            'Проверьте, что анонимный ответ каталога кэшируется в nginx'
+        )
+        assert response['Surrogate-Key'] == 'catalog:generation'
+        assert 'Authorization' in response['Vary']
+
+    def test_reviews_and_comments_keys(self, client, title):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        assert client.get(url)['Surrogate-Key'] == f'reviews:{title.id}'
+        assert edge.surrogate_key(
+            f'/api/v1/titles/{title.id}/reviews/7/comments/'
+        ) == 'comments:7'
+        assert edge.surrogate_key('/api/v1/users/me/') is None
+
+    def test_authenticated_is_private(self, user_client, title):
+        response = user_client.get('/api/v1/titles/')
+        assert 'private' in directives(response)
+        assert 'Surrogate-Key' not in response
+
+    def test_purge_refreshes_remembered_urls(self, client, title, settings,
+                                             monkeypatch):
+        settings.EDGE_PURGE_URL = 'http://nginx:8080'
+        requested = []
+
+        class Response:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                pass
+
+            def read(self):
+                return b''
+
+        def urlopen(request, timeout):
+            requested.append((request.full_url, request.get_header('Host')))
+            return Response()
+
+        monkeypatch.setattr(edge.urllib.request, 'urlopen', urlopen)
+        client.get('/api/v1/titles/?year=1994')
+        client.get('/api/v1/titles/?year=1994')
+        edge.purge('catalog:generation')
+        edge._executor.submit(lambda: None).result()
+        assert requested == [
+            ('http://nginx:8080/api/v1/titles/?year=1994', 'testserver')
+        ], 'Проверьте, что purge обновляет адреса ключа через nginx'
+
+    def test_purge_coalesces_and_is_bounded(self, settings, monkeypatch):
+        settings.EDGE_PURGE_URL = 'http://nginx:8080'
+        settings.EDGE_PURGE_MAX_PENDING = 2
+        refreshed = []
+        monkeypatch.setattr(edge, 'remembered', refreshed.append)
+        # Занимаем поток обновлений, чтобы очередь копилась.
+        release = threading.Event()
+        edge._executor.submit(release.wait)
+        counters = metrics.snapshot()
+        for _ in range(50):
+            edge.purge('catalog:generation')
+        edge.purge('reviews:1')
+        edge.purge('reviews:2')
+        release.set()
+        edge._executor.submit(lambda: None).result()
+        assert refreshed == ['catalog:generation', 'reviews:1'], (
+            'Проверьте, что сдвиги одного ключа дают одно обновление'
+        )
+        after = metrics.snapshot()
+        assert after.get('edge.refresh_coalesced', 0) - counters.get(
+            'edge.refresh_coalesced', 0) == 49
+        assert after.get('edge.refresh_dropped', 0) - counters.get(
+            'edge.refresh_dropped', 0) == 1
+        edge.purge('catalog:generation')
+        edge._executor.submit(lambda: None).result()
+        assert refreshed[-1] == 'catalog:generation'
+
+    def test_remember_concurrent(self):
+        paths = [f'/api/v1/titles/?year={year}' for year in range(60)]
+        barrier = threading.Barrier(len(paths))
+
+        def remember(path):
+            request = RequestFactory().get(path)
+            barrier.wait()
+            edge.remember('catalog:generation', request)
+
+        threads = [threading.Thread(target=remember, args=(path,))
+                   for path in paths]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        urls = {('testserver', path) for path in paths}
+        stored = set(edge.remembered('catalog:generation'))
+        slots = {
+            edge.zlib.crc32(f'testserver{path}'.encode()) % 500
+            for path in paths
+        }
+        assert stored <= urls and len(stored) == len(slots), (
+            'Проверьте, что одновременные запросы не теряют адреса'
+        )
+
+
+def test_nginx_config_structure():
+    """Без nginx в окружении - хотя бы скобки и точки с запятой."""
+    with open(join(infra_dir_path, 'nginx', 'default.conf')) as file:
+        text = re.sub(r'#[^\n]*', '', file.read())
+    depth, statement = 0, ''
+    for token in re.split(r'([;{}])', text):
+        if token == '{':
+            depth += 1
+        elif token == '}':
+            depth -= 1
+            assert depth >= 0, 'Лишняя закрывающая скобка'
+            assert not statement.strip(), (
+                f'Директива без точки с запятой: {statement.strip()}'
+            )
+        statement = token
+    assert depth == 0, 'Незакрытая скобка в default.conf'
+    assert not statement.strip(), 'Директива без точки с запятой в конце'
@@ -0,0 +1,123 @@
+import os
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from users.models import OutgoingEmail
+from users.outbox import claim, enqueue, send_batch
+
+
+@pytest.fixture
+def file_backend(settings, tmp_path):
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+    settings.EMAIL_FILE_PATH = str(tmp_path)
+    return tmp_path
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+
+    def test_signup_only_enqueues(self, file_backend):
+        with mock.patch('django.core.mail.get_connection') as connection:
+            response = APIClient().post('/api/v1/auth/signup/', {
+                'username': 'newuser', 'email': 'new@yamdb.fake'
+            })
+        assert response.status_code == 200
+        assert not connection.called, (
+            'Проверьте, что регистрация не отправляет письмо в запросе'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.to == 'new@yamdb.fake' and email.sent is None
+
+        call_command('send_emails', '--once')
+        email.refresh_from_db()
+        assert email.sent is not None and email.attempts == 1
+        sent = ''.join(
+            (file_backend / name).read_text()
+            for name in os.listdir(file_backend)
+        )
+        assert 'Your confirmation code' in sent
+
+    def test_one_connection_per_batch(self):
+        for number in range(5):
+            enqueue('s', 'b', f'user{number}@yamdb.fake')
+        with mock.patch(
+            'users.outbox.get_connection', wraps=mail.get_connection
+        ) as get_connection:
+            assert send_batch(10) == 5
+        assert get_connection.call_count == 1
+        assert len(mail.outbox) == 5
+
+    def test_retry_with_backoff(self, settings):
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        email = enqueue('s', 'b', 'user@yamdb.fake')
+        with mock.patch(
+            'users.outbox.EmailMessage.send', side_effect=OSError('relay')
+        ):
+            send_batch(10)
+            email.refresh_from_db()
+            assert email.attempts == 1 and not email.failed
+            assert email.next_attempt > timezone.now(), (
+                'Проверьте, что повтор откладывается'
+            )
+            assert send_batch(10) == 0
+
+            OutgoingEmail.objects.update(
+                next_attempt=timezone.now() - timedelta(seconds=1)
+            )
+            send_batch(10)
+        email.refresh_from_db()
+        assert email.failed and email.last_error == 'relay'
+        assert email.sent is None
+
+    def test_connection_open_fails(self, settings):
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 3
+        enqueue('s', 'b', 'user1@yamdb.fake')
+        enqueue('s', 'b', 'user2@yamdb.fake')
+        connection = mock.Mock()
+        connection.open.side_effect = OSError('relay down')
+        with mock.patch('users.outbox.get_connection',
+                        return_value=connection):
+            assert send_batch(10) == 2
+        for email in OutgoingEmail.objects.all():
+            assert email.attempts == 1 and email.last_error == 'relay down'
+            assert email.next_attempt > timezone.now(), (
+                'Проверьте, что сбой соединения откладывает письма'
+            )
+            assert email.sent is None and not email.failed
+        assert not connection.send_messages.called
+        assert send_batch(10) == 0
+
+    def test_claim_leases_rows(self):
+        enqueue('s', 'b', 'user@yamdb.fake')
+        claimed = []
+
+        def send(connection, email):
+            claimed.extend(claim(10))
+            email.sent = timezone.now()
+
+        with mock.patch('users.outbox._send', side_effect=send):
+            assert send_batch(10) == 1
+        assert claimed == [], (
+            'Проверьте, что взятое в отправку письмо не берёт другой воркер'
+        )
+
+    def test_worker_survives_errors(self):
+        with mock.patch(
+            'users.management.commands.send_emails.send_batch',
+            side_effect=[DatabaseError('db down'), 0],
+        ) as batch, mock.patch(
+            'users.management.commands.send_emails.time.sleep',
+            side_effect=[None, StopIteration],
+        ):
+            with pytest.raises(StopIteration):
+                call_command('send_emails')
+        assert batch.call_count == 2, (
+            'Проверьте, что воркер не падает при ошибке разбора очереди'
+        )
@@ -0,0 +1,128 @@
+import csv
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.export import stream
+from reviews.models import Comment, Review
+
+
+def content(response):
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+class TestExport:
+    url = '/api/v1/export/'
+
+    def test_only_admin(self, user_client):
+        assert user_client.get(self.url).status_code == 403
+
+    def test_bad_params(self, admin_client):
+        response = admin_client.get(self.url, {'output': 'xml'})
+        assert response.status_code == 400
+
+    def test_titles_ndjson(self, admin_client, title):
+        response = admin_client.get(self.url)
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+        assert response.streaming, 'Проверьте, что выгрузка идёт потоком'
+        lines = content(response).splitlines()
+        assert len(lines) == 1
+        record = json.loads(lines[0])
+        assert record['name'] == title.name
+        assert record['category'] == {'name': 'Фильм', 'slug': 'films'}
+        assert {genre['slug'] for genre in record['genre']} == {
+            'drama', 'comedy'
+        }
+        assert (record['rating'], record['review_count']) == (None, 0)
+
+    def test_reviews_csv(self, admin_client, title, user, admin):
+        review = Review.objects.create(
+            title=title, author=user, text='Хорошо', score=8
+        )
+        Comment.objects.create(review=review, author=admin, text='Да')
+        response = admin_client.get(
+            self.url, {'resource': 'reviews', 'output': 'csv'}
+        )
+        assert response['Content-Type'] == 'text/csv; charset=utf-8'
+        rows = list(csv.reader(io.StringIO(content(response))))
+        assert rows[0] == [
+            'id', 'title_id', 'text', 'author', 'score', 'pub_date'
+        ], 'Проверьте, что колонки совпадают с review.csv для import_csv'
+        assert rows[1][:5] == [
+            str(review.id), str(title.id), 'Хорошо', user.username, '8'
+        ]
+        response = admin_client.get(
+            self.url, {'resource': 'comments', 'output': 'csv'}
+        )
+        rows = list(csv.reader(io.StringIO(content(response))))
+        assert rows[1][1:4] == [str(review.id), 'Да', admin.username]
+
+    def test_titles_in_chunks(self, make_titles):
+        make_titles(25)
+        with CaptureQueriesContext(connection) as context:
+            chunks = list(stream('titles', 'csv', chunk_size=10))
+        assert len(chunks) == 4
+        assert chunks[0].count('\n') == 2, (
+            'Проверьте, что заголовок и первая запись уходят сразу'
+        )
+        assert sum(chunk.count('\n') for chunk in chunks) == 26
+        assert len(context.captured_queries) == 7, (
+            'Проверьте, что на пачку произведений приходится два запроса'
+        )
+
+    def test_command(self, title, tmp_path):
+        path = tmp_path / 'titles.ndjson'
+        call_command('export_catalog', '--file', str(path))
+        record = json.loads(path.read_text(encoding='utf-8'))
+        assert record['id'] == title.id
+
+    def test_first_chunk_before_next_query(self, make_titles):
+        make_titles(5)
+        with CaptureQueriesContext(connection) as context:
+            first = next(stream('titles', 'ndjson', chunk_size=1000))
+        assert first.count('\n') == 1
+        assert len(context.captured_queries) == 2
+
+    def test_nested(self, admin_client, make_titles, title, user, admin):
+        make_titles(4)
+        reviews = [
+            Review.objects.create(title=title, author=author, text=text,
+                                  score=5)
+            for author, text in ((user, 'первый'), (admin, 'второй'))
+        ]
+        Comment.objects.create(review=reviews[1], author=user, text='а')
+        Comment.objects.create(review=reviews[1], author=admin, text='б')
+        with CaptureQueriesContext(connection) as context:
+            records = [
+                json.loads(line) for line in ''.join(
+                    stream('titles', 'ndjson', chunk_size=2, nested=True)
+                ).splitlines()
+            ]
+        assert len(records) == 5
+        # Четыре запроса на пачку: произведения, жанры, отзывы, комментарии.
+        assert len(context.captured_queries) == 13
+        by_id = {record['id']: record for record in records}
+        nested = by_id[title.id]['reviews']
+        assert [review['text'] for review in nested] == ['первый', 'второй']
+        assert nested[0]['comments'] == []
+        assert [comment['text'] for comment in nested[1]['comments']] == [
+            'а', 'б'
+        ], 'Проверьте, что комментарии попадают в свой отзыв'
+        assert nested[1]['comments'][1]['author'] == admin.username
+        assert all(
+            record['reviews'] == [] for record in records
+            if record['id'] != title.id
+        )
+
+        response = admin_client.get(self.url, {'nested': '1'})
+        assert [json.loads(line) for line in content(response).splitlines()
+                ] == records
+        assert admin_client.get(
+            self.url, {'nested': '1', 'output': 'csv'}
+        ).status_code == 400
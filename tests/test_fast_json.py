@@ -0,0 +1,132 @@
+import datetime
+import decimal
+import io
+import json
+import uuid
+from collections import OrderedDict
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from api import parsers, renderers
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+
+MOSCOW = datetime.timezone(datetime.timedelta(hours=3))
+
+PAYLOADS = [
+    {'id': 1, 'rating': 7.25, 'name': 'Побег из Шоушенка', 'year': None},
+    [1, -2, 0.1, 0.0001, 7.333333333333333, 3.0, True, False, None,
+     'строка', ''],
+    OrderedDict([('b', 1), ('a', [OrderedDict([('z', 'я')])])]),
+    ReturnList([ReturnDict({'x': 1}, serializer=None)], serializer=None),
+    {'utc': datetime.datetime(2021, 3, 1, 12, 30, 15, 123456,
+                              tzinfo=datetime.timezone.utc),
+     'zero_micro': datetime.datetime(2021, 3, 1, 12, 30,
+                                     tzinfo=datetime.timezone.utc),
+     'moscow': datetime.datetime(2021, 3, 1, 12, 30, tzinfo=MOSCOW),
+     'naive': datetime.datetime(2021, 3, 1, 12, 30, 15),
+     'date': datetime.date(2021, 3, 1),
+     'time': datetime.time(12, 30, 15, 5),
+     'delta': datetime.timedelta(hours=1, seconds=1.5)},
+    {'decimal': decimal.Decimal('7.50'), 'big': decimal.Decimal('1e3'),
+     'uuid': uuid.UUID('12345678123456781234567812345678')},
+    {'lazy': gettext_lazy('Not found.'), 'list': [gettext_lazy('a')]},
+    {'js': 'строка с разделителями', 'esc': '"\\/\n\t\x00'},
+    {1: 'целый ключ', 'tuple': (1, 2), 'set_like': frozenset()},
+    {'big_int': 2 ** 70},
+    [],
+    {},
+]
+
+
+@pytest.mark.parametrize('data', PAYLOADS)
+def test_renderer_matches_drf(data):
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data), (
+        'Проверьте, что FastJSONRenderer даёт те же байты, что и DRF'
+    )
+
+
+def test_renderer_indent_matches_drf():
+    data = {'a': [1, {'b': 'в'}]}
+    for media_type in ('application/json; indent=4', None):
+        context = {} if media_type else {'indent': 2}
+        assert FastJSONRenderer().render(data, media_type, context) == (
+            JSONRenderer().render(data, media_type, context)
+        )
+
+
+def test_renderer_float_exponent():
+    data = [1e-7, 1.5e300, 1e16]
+    assert json.loads(FastJSONRenderer().render(data)) == data
+
+
+def test_renderer_none():
+    assert FastJSONRenderer().render(None) == b''
+
+
+def test_renderer_unknown_type_fails_like_drf():
+    with pytest.raises(TypeError):
+        JSONRenderer().render({'a': object()})
+    with pytest.raises(TypeError):
+        FastJSONRenderer().render({'a': object()})
+
+
+def test_fallback_without_orjson(monkeypatch):
+    monkeypatch.setattr(renderers, 'orjson', None)
+    monkeypatch.setattr(parsers, 'orjson', None)
+    for data in PAYLOADS:
+        assert FastJSONRenderer().render(data) == (
+            JSONRenderer().render(data)
+        )
+    body = '{"a": [1, "б"]}'.encode()
+    assert FastJSONParser().parse(io.BytesIO(body)) == {'a': [1, 'б']}
+
+
+@pytest.mark.parametrize('body', [
+    '{"text": "Отзыв", "score": 7}',
+    '[1, 2.5, -3e2, true, false, null, "\\u2028", "\\ud83d\\ude00"]',
+    '{"big": 123456789012345678901234567890, "u64": 18446744073709551615}',
+    '{"long": "12345678901234567890123"}',
+    ' {"a": {"b": []}} ',
+])
+def test_parser_matches_drf(body):
+    body = body.encode()
+    assert FastJSONParser().parse(io.BytesIO(body)) == (
+        JSONParser().parse(io.BytesIO(body))
+    )
+
+
+@pytest.mark.parametrize('body', [b'', b'{"a": NaN}', b'{"a": 1,}',
+                                  b'\xff'])
+def test_parser_errors_like_drf(body):
+    with pytest.raises(ParseError) as expected:
+        JSONParser().parse(io.BytesIO(body))
+    with pytest.raises(ParseError) as actual:
+        FastJSONParser().parse(io.BytesIO(body))
+    assert str(actual.value) == str(expected.value)
+
+
+def test_parser_other_encoding():
+    body = '{"a": "б"}'.encode('cp1251')
+    context = {'encoding': 'cp1251'}
+    assert FastJSONParser().parse(io.BytesIO(body), None, context) == (
+        {'a': 'б'}
+    )
+
+
+@pytest.mark.django_db
+def test_benchmark(title, make_titles):
+    make_titles(3)
+    out = StringIO()
+    call_command('bench_json', 'titles', 'genres', '--rows', '10',
+                 '--repeat', '1', stdout=out)
+    assert len(out.getvalue().splitlines()) == 3, (
+        'Проверьте, что замер идёт по выбранным ресурсам'
+    )
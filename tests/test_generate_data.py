@@ -0,0 +1,65 @@
+import pytest
+from django.core.management import call_command
+from django.db.models import Count
+
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from users.models import User
+
+OPTIONS = ['--users', '50', '--categories', '3', '--genres', '5',
+           '--titles', '20', '--reviews', '300', '--comments', '100',
+           '--seed', '3', '--chunk-size', '64']
+
+
+def snapshot():
+    return (
+        list(Title.objects.order_by('id').values_list(
+            'name', 'year', 'category_id', 'rating', 'review_count'
+        )),
+        list(Review.objects.order_by('id').values_list(
+            'title_id', 'author_id', 'score', 'text', 'pub_date'
+        )),
+        list(Comment.objects.order_by('id').values_list(
+            'review_id', 'author_id', 'text', 'pub_date'
+        )),
+        list(User.objects.order_by('id').values_list(
+            'username', 'role', 'date_joined'
+        )),
+    )
+
+
+@pytest.mark.django_db
+class TestGenerateData:
+
+    def test_generate(self):
+        call_command('generate_data', *OPTIONS)
+        assert User.objects.count() == 50
+        assert Title.objects.count() == 20
+        assert Category.objects.count() == 3 and Genre.objects.count() == 5
+        assert GenreTitle.objects.values('title').distinct().count() == 20, (
+            'Проверьте, что у каждого произведения есть жанр'
+        )
+        assert 250 <= Review.objects.count() <= 300
+        assert 80 <= Comment.objects.count() <= 120
+        counts = sorted(
+            Title.objects.values_list('review_count', flat=True),
+            reverse=True,
+        )
+        assert counts[0] == 50, (
+            'Проверьте, что у самого популярного произведения отзыв от '
+            'каждого пользователя'
+        )
+        assert counts[-1] < counts[0] / 5, (
+            'Проверьте, что популярность распределена неравномерно'
+        )
+        assert not Review.objects.values('title', 'author').annotate(
+            n=Count('id')
+        ).filter(n__gt=1).exists()
+
+    def test_same_seed_same_data(self):
+        call_command('generate_data', *OPTIONS)
+        first = snapshot()
+        for model in (Comment, Review, GenreTitle, Title, Genre, Category,
+                      User):
+            model.objects.all().delete()
+        call_command('generate_data', *OPTIONS)
+        assert snapshot() == first
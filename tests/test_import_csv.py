@@ -0,0 +1,142 @@
+import csv
+import json
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.bulk import insert_rows
+from reviews.models import Category, Comment, GenreTitle, Review, Title
+from users.models import User
+
+FILES = {
+    'category.csv': [
+        ('id', 'name', 'slug'),
+        (1, 'Фильм', 'movie'),
+        (2, 'Книга', 'book'),
+    ],
+    'genre.csv': [
+        ('id', 'name', 'slug'),
+        (1, 'Драма', 'drama'),
+        (2, 'Комедия', 'comedy'),
+    ],
+    'titles.csv': [
+        ('id', 'name', 'year', 'category'),
+        (1, 'Шоушенк', 1994, 1),
+        (2, 'Мастер и Маргарита', 1967, 'book'),
+        (3, 'Без категории', 2000, 99),
+    ],
+    'genre_title.csv': [
+        ('id', 'title_id', 'genre_id'),
+        (1, 1, 1),
+        (2, 2, 1),
+        (3, 2, 2),
+    ],
+    'users.csv': [
+        ('id', 'username', 'email', 'role', 'bio', 'first_name',
+         'last_name'),
+        (100, 'bingobongo', 'bingo@yamdb.fake', 'user', '', '', ''),
+        (101, 'capt_obvious', 'capt@yamdb.fake', 'admin', '', '', ''),
+    ],
+    'review.csv': [
+        ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+        (1, 1, 'Отлично', 100, 10, '2019-09-24T21:08:21.567Z'),
+        (2, 1, 'Неплохо', 'capt_obvious', 7, '2019-09-24T21:08:21.567Z'),
+        (3, 2, 'Плохо', 100, 11, '2019-09-24T21:08:21.567Z'),
+    ],
+    'comments.csv': [
+        ('id', 'review_id', 'text', 'author', 'pub_date'),
+        (1, 1, 'Согласен', 101, '2019-09-24T21:08:21.567Z'),
+        (2, 2, 'Нет', 100, '2019-09-24T21:08:21.567Z'),
+        (3, 1, 'Ещё', 100, '2019-09-24T21:08:21.567Z'),
+    ],
+}
+
+
+@pytest.fixture
+def csv_dir(tmp_path):
+    for name, rows in FILES.items():
+        with open(tmp_path / name, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows(rows)
+    return tmp_path
+
+
+@pytest.mark.django_db
+class TestImportCsv:
+
+    def test_import(self, csv_dir, capsys):
+        call_command('import_csv', str(csv_dir), '--chunk-size', '2')
+        assert Title.objects.count() == 2, (
+            'Проверьте, что строки с несуществующей категорией пропускаются'
+        )
+        assert Title.objects.get(pk=2).category.slug == 'book'
+        assert GenreTitle.objects.count() == 3
+        assert User.objects.get(pk=101).role == 'admin'
+        assert Review.objects.count() == 2
+        assert Comment.objects.count() == 3
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что дата публикации берётся из файла'
+        )
+        title = Title.objects.get(pk=1)
+        assert (title.rating, title.review_count) == (8.5, 2)
+        captured = capsys.readouterr()
+        assert 'titles.csv:4' in captured.err and 'review.csv:4' in captured.err
+        assert 'строк/с' in captured.out
+
+    def test_resume(self, csv_dir):
+        checkpoint = csv_dir / 'progress.json'
+        call_command(
+            'import_csv', str(csv_dir), '--chunk-size', '1',
+            '--checkpoint', str(checkpoint),
+        )
+        # Как будто загрузка прервалась после первой строки комментариев.
+        Comment.objects.filter(pk__gt=1).delete()
+        progress = json.loads(checkpoint.read_text())
+        assert progress['comments.csv'] == 3
+        progress['comments.csv'] = 1
+        checkpoint.write_text(json.dumps(progress))
+
+        call_command(
+            'import_csv', str(csv_dir), '--resume',
+            '--checkpoint', str(checkpoint),
+        )
+        assert Comment.objects.count() == 3
+        assert Review.objects.count() == 2, (
+            'Проверьте, что повторная загрузка не дублирует записи'
+        )
+
+    def test_resume_counts_conflicts(self, csv_dir, capsys):
+        checkpoint = csv_dir / 'progress.json'
+        call_command(
+            'import_csv', str(csv_dir), '--checkpoint', str(checkpoint),
+        )
+        # Пачка записалась, а отметка в checkpoint - нет.
+        progress = json.loads(checkpoint.read_text())
+        progress['comments.csv'] = 1
+        checkpoint.write_text(json.dumps(progress))
+        capsys.readouterr()
+
+        call_command(
+            'import_csv', str(csv_dir), '--resume',
+            '--checkpoint', str(checkpoint),
+        )
+        report = [line for line in capsys.readouterr().out.splitlines()
+                  if line.startswith('comments.csv')]
+        assert 'записано 0' in report[0] and 'уже в базе 2' in report[0], (
+            'Проверьте, что строки, уже бывшие в базе, не считаются '
+            'записанными'
+        )
+        assert Comment.objects.count() == 3
+
+    def test_insert_rows_batches(self):
+        rows = [(number, f'Категория {number}', f'slug-{number}')
+                for number in range(1, 51)]
+        with CaptureQueriesContext(connection) as context:
+            assert insert_rows(Category, ('id', 'name', 'slug'), rows) == 50
+        assert len(context) == 1, (
+            'Проверьте, что пачка пишется одним многострочным INSERT'
+        )
+        assert insert_rows(Category, ('id', 'name', 'slug'), rows[:10]) == 0
+        assert Category.objects.count() == 50
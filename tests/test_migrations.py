@@ -0,0 +1,24 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+
+def title_indexes():
+    with connection.cursor() as cursor:
+        return connection.introspection.get_constraints(
+            cursor, 'reviews_title'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReviewsMigrations:
+
+    def test_search_indexes_reversible(self):
+        try:
+            call_command('migrate', 'reviews', '0005', verbosity=0)
+            assert 'title_year_id_idx' not in title_indexes()
+        finally:
+            call_command('migrate', 'reviews', verbosity=0)
+        assert 'title_year_id_idx' in title_indexes(), (
+            'Проверьте, что миграции reviews откатываются и применяются снова'
+        )
@@ -0,0 +1,60 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from reviews.models import Review, Title
+
+
+def _lookups(context, table):
+    return [
+        query for query in context.captured_queries
+        if query['sql'].startswith('SELECT')
+        and f'FROM "{table}"' in query['sql']
+        and 'COUNT(' not in query['sql']
+        and 'MAX(' not in query['sql']
+    ]
+
+
+@pytest.fixture
+def review(title, user):
+    return Review.objects.create(title=title, author=user, text='a', score=5)
+
+
+@pytest.mark.django_db
+class TestNestedResources:
+
+    def test_comments_resolve_once(self, title, review, user_client):
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, {'text': 'комментарий'})
+        assert response.status_code == 201
+        lookups = _lookups(context, 'reviews_review')
+        assert len(lookups) == 1 and 'reviews_title' in lookups[0]['sql'], (
+            'Проверьте, что отзыв и произведение ищутся одним запросом'
+        )
+        assert not _lookups(context, 'reviews_title')
+
+        with CaptureQueriesContext(connection) as context:
+            assert APIClient().get(url).status_code == 200
+        assert len(_lookups(context, 'reviews_review')) == 1
+
+    def test_reviews_resolve_title_once(self, title, user_client):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, {'text': 'a', 'score': 5})
+        assert response.status_code == 201
+        assert not _lookups(context, 'reviews_title'), (
+            'Проверьте, что при создании отзыва произведение не читается'
+        )
+
+    def test_mismatched_pair_is_404(self, title, review, category):
+        other = Title.objects.create(name='Другое', year=2000,
+                                     category=category)
+        url = f'/api/v1/titles/{other.id}/reviews/{review.id}/comments/'
+        assert APIClient().get(url).status_code == 404, (
+            'Проверьте, что отзыв чужого произведения даёт 404'
+        )
+        assert APIClient().get(
+            f'/api/v1/titles/{title.id}/reviews/999/comments/'
+        ).status_code == 404
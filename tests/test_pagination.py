@@ -0,0 +1,80 @@
+import pytest
+from rest_framework.test import APIClient
+
+from reviews.models import Comment, Review
+
+
+def _walk(client, url):
+    """Проходит все страницы по ссылкам next и возвращает id записей."""
+    ids = []
+    pages = 0
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что курсорная пагинация не считает COUNT(*)'
+        )
+        ids.extend(item['id'] for item in data['results'])
+        url = data['next']
+        pages += 1
+    return ids, pages
+
+
+@pytest.fixture
+def reviews(title, django_user_model):
+    django_user_model.objects.bulk_create(
+        django_user_model(username=f'author{number}')
+        for number in range(25)
+    )
+    authors = list(django_user_model.objects.filter(
+        username__startswith='author'
+    ))
+    return [
+        Review.objects.create(title=title, author=author, text='a', score=5)
+        for author in authors
+    ]
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def test_titles(self, make_titles):
+        titles = make_titles(25)
+        ids, pages = _walk(APIClient(), '/api/v1/titles/?cursor=')
+        assert ids == sorted((title.id for title in titles), reverse=True)
+        assert pages == 3
+
+    def test_reviews(self, title, reviews):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        ids, pages = _walk(APIClient(), url + '?cursor=')
+        expected = list(
+            Review.objects.order_by('-pub_date', 'id').values_list(
+                'id', flat=True
+            )
+        )
+        assert ids == expected and pages == 3
+
+    def test_comments(self, title, reviews, user):
+        review = reviews[0]
+        for number in range(15):
+            Comment.objects.create(review=review, author=user, text='c')
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        ids, pages = _walk(APIClient(), url + '?cursor=&page_size=5')
+        assert ids == sorted(ids, reverse=True) and len(ids) == 15
+        assert pages == 3
+
+    def test_no_count_query(self, make_titles, django_assert_num_queries):
+        make_titles(20)
+        with django_assert_num_queries(2):
+            APIClient().get('/api/v1/titles/?cursor=')
+
+    def test_page_number_clients(self, title, reviews, make_titles):
+        make_titles(15)
+        client = APIClient()
+        data = client.get(f'/api/v1/titles/{title.id}/reviews/?page=2').json()
+        assert data['count'] == 25 and len(data['results']) == 10, (
+            'Проверьте, что постраничная пагинация продолжает работать'
+        )
+        data = client.get('/api/v1/titles/?limit=5&offset=5').json()
+        assert data['count'] == 16 and len(data['results']) == 5
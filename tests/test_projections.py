@@ -0,0 +1,116 @@
+from datetime import datetime, timezone
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from api import projections
+from api.serializers import (CategorySerializer, CommentsSerializer,
+                             GenreSerializer, ReviewsSerializer,
+                             TitleSerializer)
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.fixture
+def catalog(title, category, make_titles, django_user_model):
+    """Произведения с жанрами и без, с рейтингом и без, даты отзывов с
+    микросекундами."""
+    make_titles(3)
+    Title.objects.create(name='Без жанров, «в кавычках»', year=1900,
+                         category=Category.objects.create(
+                             name='Книга', slug='books'
+                         ))
+    for number in range(3):
+        author = django_user_model.objects.create_user(
+            username=f'автор{number}', email=f'author{number}@yamdb.fake'
+        )
+        review = Review.objects.create(
+            title=title, author=author, text=f'Отзыв "{number}"\n',
+            score=number + 7,
+        )
+        Review.objects.filter(id=review.id).update(pub_date=datetime(
+            2021, 3, number + 1, 12, 30, 15, 123456 * number,
+            tzinfo=timezone.utc,
+        ))
+        Comment.objects.create(review=review, author=author, text='Ок')
+    Title.objects.filter(id=title.id).update(description='Тюрьма')
+
+
+def rendered(data):
+    return JSONRenderer().render(data)
+
+
+CASES = [
+    (projections.TitleProjection, TitleSerializer,
+     lambda: Title.objects.select_related('category').prefetch_related(
+         'genretitle_set__genre')),
+    (projections.CategoryProjection, CategorySerializer,
+     lambda: Category.objects.all()),
+    (projections.GenreProjection, GenreSerializer,
+     lambda: Genre.objects.all()),
+    (projections.ReviewProjection, ReviewsSerializer,
+     lambda: Review.objects.select_related('author')),
+    (projections.CommentProjection, CommentsSerializer,
+     lambda: Comment.objects.select_related('author')),
+]
+
+
+@pytest.mark.django_db
+class TestProjections:
+
+    @pytest.mark.parametrize('projection_class,serializer_class,queryset',
+                             CASES)
+    def test_same_json_as_serializer(self, catalog, projection_class,
+                                     serializer_class, queryset):
+        projection = projection_class()
+        expected = serializer_class(queryset(), many=True).data
+        actual = projection.represent(projection.values(queryset()))
+        assert len(actual) > 1
+        assert rendered(actual) == rendered(expected), (
+            'Проверьте, что быстрое чтение даёт тот же JSON, что и '
+            'сериализатор'
+        )
+
+    @pytest.mark.parametrize('path', [
+        '/api/v1/titles/?limit=3&offset=1',
+        '/api/v1/titles/?genre=drama',
+        '/api/v1/titles/?cursor=',
+        '/api/v1/categories/',
+        '/api/v1/genres/',
+    ])
+    def test_list_endpoints(self, catalog, path):
+        response = APIClient().get(path)
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert results
+        if path.startswith('/api/v1/titles/'):
+            assert set(results[0]) == set(TitleSerializer().fields)
+
+    def test_nested_list_endpoints(self, catalog, title):
+        client = APIClient()
+        response = client.get(f'/api/v1/titles/{title.id}/reviews/')
+        reviews = response.json()['results']
+        expected = ReviewsSerializer(
+            Review.objects.filter(title=title), many=True
+        ).data
+        assert reviews == expected
+        assert reviews[0]['pub_date'] == '2021-03-03T12:30:15.246912Z'
+
+        review = Review.objects.get(id=reviews[0]['id'])
+        response = client.get(
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+            '?cursor='
+        )
+        assert response.json()['results'] == CommentsSerializer(
+            review.comments.all(), many=True
+        ).data
+
+    def test_benchmark(self, catalog):
+        out = StringIO()
+        call_command('bench_serializers', '--rows', '10', '--repeat', '1',
+                     stdout=out)
+        assert out.getvalue().count('x\n') == 5, (
+            'Проверьте, что замер идёт по всем ресурсам'
+        )
@@ -0,0 +1,184 @@
+import pytest
+from django.contrib.admin.sites import site
+from django.core.exceptions import MiddlewareNotUsed
+from django.test import Client, override_settings
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework.test import APIClient
+
+from api.budget import (QueryBudgetExceeded, QueryBudgetMiddleware,
+                        get_budget)
+from api.views import TitleViewSet
+from reviews.models import Category, Comment, Review
+from users.tokens import make_confirmation_code
+
+AUTHORS = 4
+
+# (клиент, метод, адрес, данные, статус ответа). Отзывов и комментариев
+# в выборках по нескольку от разных авторов: запрос на строку виден.
+CASES = [
+    ('anon', 'get', '/api/v1/titles/', None, 200),
+    ('anon', 'get', '/api/v1/titles/{title}/', None, 200),
+    ('admin', 'post', '/api/v1/titles/',
+     {'name': 'Новое', 'year': 2000, 'category': 'films',
+      'genre': ['drama', 'comedy']}, 201),
+    ('admin', 'patch', '/api/v1/titles/{title}/', {'year': 1995}, 200),
+    ('admin', 'delete', '/api/v1/titles/{title}/', None, 204),
+    ('anon', 'get', '/api/v1/categories/', None, 200),
+    ('admin', 'post', '/api/v1/categories/',
+     {'name': 'Книга', 'slug': 'books'}, 201),
+    ('admin', 'delete', '/api/v1/categories/empty/', None, 204),
+    ('anon', 'get', '/api/v1/genres/', None, 200),
+    ('admin', 'post', '/api/v1/genres/',
+     {'name': 'Триллер', 'slug': 'thriller'}, 201),
+    ('admin', 'delete', '/api/v1/genres/drama/', None, 204),
+    ('anon', 'get', '/api/v1/titles/{title}/reviews/', None, 200),
+    ('anon', 'get', '/api/v1/titles/{title}/reviews/{review}/', None, 200),
+    ('user', 'post', '/api/v1/titles/{title}/reviews/',
+     {'text': 'Отзыв', 'score': 7}, 201),
+    ('admin', 'patch', '/api/v1/titles/{title}/reviews/{review}/',
+     {'score': 3}, 200),
+    ('admin', 'delete', '/api/v1/titles/{title}/reviews/{review}/', None,
+     204),
+    ('anon', 'get', '/api/v1/titles/{title}/reviews/{review}/comments/',
+     None, 200),
+    ('anon', 'get',
+     '/api/v1/titles/{title}/reviews/{review}/comments/{comment}/', None,
+     200),
+    ('user', 'post', '/api/v1/titles/{title}/reviews/{review}/comments/',
+     {'text': 'Комментарий'}, 201),
+    ('admin', 'patch',
+     '/api/v1/titles/{title}/reviews/{review}/comments/{comment}/',
+     {'text': 'Правка'}, 200),
+    ('admin', 'delete',
+     '/api/v1/titles/{title}/reviews/{review}/comments/{comment}/', None,
+     204),
+    ('admin', 'get', '/api/v1/users/', None, 200),
+    ('admin', 'get', '/api/v1/users/TestUser/', None, 200),
+    ('admin', 'post', '/api/v1/users/',
+     {'username': 'new', 'email': 'new@yamdb.fake'}, 201),
+    ('admin', 'patch', '/api/v1/users/TestUser/', {'bio': 'о себе'}, 200),
+    ('admin', 'delete', '/api/v1/users/TestUser/', None, 204),
+    ('user', 'get', '/api/v1/users/me/', None, 200),
+    ('user', 'patch', '/api/v1/users/me/', {'bio': 'о себе'}, 200),
+    ('anon', 'post', '/api/v1/auth/signup/',
+     {'username': 'new', 'email': 'new@yamdb.fake'}, 200),
+    ('anon', 'post', '/api/v1/auth/token/', 'token', 201),
+    ('admin', 'get', '/api/v1/metrics/', None, 200),
+    ('admin', 'get', '/api/v1/export/', None, 200),
+    ('anon', 'get', '/api/v1/ready/', None, None),
+    ('staff', 'get', '/admin/reviews/title/', None, 200),
+    ('staff', 'get', '/admin/reviews/review/', None, 200),
+    ('staff', 'get', '/admin/reviews/comment/', None, 200),
+    ('staff', 'get', '/admin/reviews/category/', None, 200),
+    ('staff', 'get', '/admin/reviews/genre/', None, 200),
+    ('staff', 'get', '/admin/users/user/', None, 200),
+    ('staff', 'get', '/admin/users/outgoingemail/', None, 200),
+]
+
+
+@pytest.fixture
+def catalog(title, django_user_model):
+    # Категорию с произведениями удалить нельзя (DO_NOTHING).
+    Category.objects.create(name='Пустая', slug='empty')
+    reviews = []
+    for number in range(AUTHORS):
+        author = django_user_model.objects.create_user(
+            username=f'author{number}', email=f'author{number}@yamdb.fake'
+        )
+        reviews.append(Review.objects.create(
+            title=title, author=author, text='отзыв', score=number + 1
+        ))
+    for number in range(AUTHORS):
+        Comment.objects.create(
+            review=reviews[0], author=reviews[number].author, text='текст'
+        )
+    return {
+        'title': title.id,
+        'review': reviews[0].id,
+        'comment': reviews[0].comments.first().id,
+    }
+
+
+@pytest.fixture
+def clients(user_client, admin_client, django_user_model):
+    staff = django_user_model.objects.create_superuser(
+        username='staff', email='staff@yamdb.fake', password='1234567'
+    )
+    client = Client()
+    client.force_login(staff)
+    return {'anon': APIClient(), 'user': user_client,
+            'admin': admin_client, 'staff': client}
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+
+    @pytest.mark.parametrize('who,method,path,data,status', CASES)
+    def test_action_within_budget(self, assert_query_budget, catalog,
+                                  clients, user, who, method, path, data,
+                                  status):
+        if data == 'token':
+            data = {'username': user.username,
+                    'confirmation_code': make_confirmation_code(user)}
+        kwargs = {}
+        if data is not None:
+            kwargs = {'data': data, 'format': 'json'}
+        response = assert_query_budget(
+            clients[who], method, path.format(**catalog), **kwargs
+        )
+        # Готовность зависит от прогрева процесса, её статус не важен.
+        assert status is None or response.status_code == status
+
+    def test_every_action_has_budget(self):
+        """Каждое действие API и список каждой модели в админке объявляют
+        бюджет."""
+        missing = []
+        for pattern in self.api_patterns(get_resolver().url_patterns):
+            view = pattern.callback
+            for method in getattr(view, 'actions', None) or dict.fromkeys(
+                map(str.lower, view.cls().allowed_methods)
+            ):
+                name, budget = get_budget(view, method)
+                if budget is None and method not in ('head', 'options'):
+                    missing.append(name)
+        for model, model_admin in site._registry.items():
+            if model._meta.app_label not in ('reviews', 'users'):
+                continue
+            if 'changelist_view' not in getattr(
+                model_admin, 'query_budget', {}
+            ):
+                missing.append(type(model_admin).__name__)
+        assert not missing, f'Нет бюджета запросов: {sorted(set(missing))}'
+
+    def api_patterns(self, patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                yield from self.api_patterns(pattern.url_patterns)
+            elif isinstance(pattern, URLPattern) and getattr(
+                pattern.callback, 'cls', None
+            ) and pattern.callback.cls.__module__.startswith('api.'):
+                yield pattern
+
+
+class TestQueryBudgetMiddleware:
+
+    def test_off_by_default(self):
+        with pytest.raises(MiddlewareNotUsed):
+            QueryBudgetMiddleware(lambda request: None)
+
+    @pytest.mark.django_db
+    def test_raise_over_budget(self, title, monkeypatch):
+        monkeypatch.setattr(TitleViewSet, 'query_budget', {'list': 1})
+        with override_settings(QUERY_BUDGET='raise'):
+            with pytest.raises(QueryBudgetExceeded, match='TitleViewSet.list'):
+                APIClient().get('/api/v1/titles/')
+
+    @pytest.mark.django_db
+    def test_log_over_budget(self, title, monkeypatch, caplog):
+        monkeypatch.setattr(TitleViewSet, 'query_budget', {'list': 1})
+        with override_settings(QUERY_BUDGET='log'):
+            response = APIClient().get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert 'TitleViewSet.list' in caplog.text, (
+            'Проверьте, что превышение бюджета попадает в лог'
+        )
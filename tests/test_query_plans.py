@@ -0,0 +1,88 @@
+import pytest
+from django.db import IntegrityError, connection, transaction
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Comment, GenreTitle, Review, Title
+from tests.fixtures.fixture_query_plan import explain
+
+AUTHORS = 3
+
+
+@pytest.fixture
+def catalog(title, make_titles, django_user_model):
+    make_titles(5)
+    Title.objects.create(name='Книга', year=1900, category=(
+        Category.objects.create(name='Книга', slug='books')
+    ))
+    review = None
+    for number in range(AUTHORS):
+        author = django_user_model.objects.create_user(
+            username=f'author{number}', email=f'author{number}@yamdb.fake'
+        )
+        review = Review.objects.create(
+            title=title, author=author, text='отзыв', score=number + 1
+        )
+        Comment.objects.create(review=review, author=author, text='текст')
+    return {'title': title.id, 'review': review.id}
+
+
+@pytest.mark.django_db
+class TestQueryPlans:
+
+    @pytest.mark.parametrize('path,ordered', [
+        ('/api/v1/titles/{title}/', False),
+        ('/api/v1/titles/?cursor=', True),
+        ('/api/v1/titles/?category=films', True),
+        ('/api/v1/titles/?cursor=&category=films', True),
+        ('/api/v1/titles/?year=2000', True),
+        ('/api/v1/titles/?genre=drama', False),
+        ('/api/v1/titles/?cursor=&year=2000', True),
+        ('/api/v1/titles/{title}/reviews/', True),
+        ('/api/v1/titles/{title}/reviews/?cursor=', True),
+        ('/api/v1/titles/{title}/reviews/{review}/', False),
+        ('/api/v1/titles/{title}/reviews/{review}/comments/', True),
+        ('/api/v1/titles/{title}/reviews/{review}/comments/?cursor=', True),
+    ])
+    def test_endpoint_uses_indexes(self, assert_index_scans, catalog, path,
+                                   ordered):
+        response = assert_index_scans(
+            APIClient(), path.format(**catalog), ordered=ordered
+        )
+        assert response.json(), path
+
+    def test_unfiltered_titles(self, assert_index_scans, catalog):
+        # Страница берётся обходом pkey с LIMIT, а общее число произведений
+        # для номеров страниц - проход по всей таблице при любых индексах.
+        assert_index_scans(APIClient(), '/api/v1/titles/', ordered=True,
+                           unfiltered_count=True)
+
+    def test_year_filter_needs_index(self, assert_index_scans, catalog):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX "title_year_id_idx"')
+        with pytest.raises(AssertionError, match='полный просмотр'):
+            assert_index_scans(APIClient(), '/api/v1/titles/?year=2000',
+                               ordered=True)
+        plan = explain(
+            'SELECT "reviews_title"."id" FROM "reviews_title" '
+            'WHERE "reviews_title"."year" = %s '
+            'ORDER BY "reviews_title"."id" DESC LIMIT 10',
+            [2000],
+        )
+        assert plan.scans == {'reviews_title'}, (
+            'Проверьте, что обход по pkey с фильтром вне индекса - полный '
+            'просмотр'
+        )
+
+    def test_explain_finds_full_scan(self, catalog):
+        plan = explain(
+            'SELECT id FROM reviews_review WHERE text = %s ORDER BY score',
+            ['отзыв'],
+        )
+        assert plan.scans == {'reviews_review'}, (
+            'Проверьте, что утилита находит полный просмотр таблицы'
+        )
+        assert plan.sorted
+
+    def test_genre_title_unique(self, title, genres):
+        with pytest.raises(IntegrityError), transaction.atomic():
+            GenreTitle.objects.create(title=title, genre=genres[0])
@@ -0,0 +1,46 @@
+import os
+import runpy
+
+import pytest
+from django.conf import settings
+
+from api import warmup
+
+
+@pytest.fixture
+def cold():
+    warmup._ready.clear()
+    yield
+    warmup._ready.clear()
+
+
+@pytest.mark.django_db
+class TestReadiness:
+    url = '/api/v1/ready/'
+
+    def test_not_ready_before_warmup(self, client, cold):
+        response = client.get(self.url)
+        assert response.status_code == 503, (
+            'Проверьте, что до прогрева процесс не готов к трафику'
+        )
+
+    def test_ready_after_warmup(self, client, cold):
+        warmup.run()
+        response = client.get(self.url)
+        assert response.status_code == 200
+        assert response.json() == {'status': 'ok'}
+
+
+class TestGunicornConfig:
+
+    def test_config(self, monkeypatch):
+        monkeypatch.setenv('GUNICORN_WORKERS', '3')
+        config = runpy.run_path(
+            os.path.join(settings.BASE_DIR, 'gunicorn.conf.py')
+        )
+        assert config['workers'] == 3
+        assert config['preload_app'] is True
+        assert config['max_requests'] and config['max_requests_jitter'], (
+            'Проверьте, что воркеры перезапускаются с разбросом'
+        )
+        assert callable(config['post_fork'])
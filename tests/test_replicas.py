@@ -0,0 +1,110 @@
+import pytest
+from django.conf import settings as django_settings
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api_yamdb import replicas
+from tests.fixtures import fixture_query_budget
+from reviews.models import Category, Review, Title
+from users.authentication import CachedJWTAuthentication
+
+pytestmark = [
+    pytest.mark.skipif(
+        'replica' not in django_settings.DATABASES,
+        reason='нужна тестовая база replica из conftest',
+    ),
+    # Без transaction=True тест идёт внутри atomic, а в транзакции роутер
+    # читает только с основной базы.
+    pytest.mark.django_db(transaction=True, databases=['default', 'replica']),
+]
+
+
+@pytest.fixture
+def replica(settings, category, title, user, admin):
+    settings.DATABASE_REPLICAS = ['replica']
+    # На реплике пока только пользователи, категория и произведение.
+    user.save(using='replica')
+    admin.save(using='replica')
+    Category.objects.using('replica').create(
+        id=category.id, name='С реплики', slug=category.slug
+    )
+    Title.objects.using('replica').create(
+        id=title.id, name=title.name, year=title.year,
+        category_id=category.id,
+    )
+    return 'replica'
+
+
+class TestReplicas:
+
+    def test_safe_reads_go_to_replica(self, client, replica):
+        response = client.get('/api/v1/categories/')
+        assert response.json()['results'][0]['name'] == 'С реплики', (
+            'Проверьте, что GET к API читает с реплики'
+        )
+
+    def test_budget_counts_replica(self, client, replica,
+                                   assert_query_budget, monkeypatch):
+        counted = []
+        monkeypatch.setattr(
+            fixture_query_budget, 'over_budget',
+            lambda name, budget, queries: counted.append(queries),
+        )
+        assert_query_budget(client, 'get', '/api/v1/categories/')
+        assert counted[0] > 0, (
+            'Проверьте, что бюджет в тестах считает запросы к репликам'
+        )
+
+    def test_writes_go_to_primary(self, user_client, replica, title):
+        response = user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/', {'text': 'a', 'score': 8}
+        )
+        assert response.status_code == 201
+        assert Review.objects.using('default').count() == 1
+        assert not Review.objects.using('replica').exists()
+
+    def test_writer_reads_own_write(self, user_client, admin_client,
+                                    replica, title):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        user_client.post(url, {'text': 'a', 'score': 8})
+        assert user_client.get(url).json()['count'] == 1, (
+            'Проверьте, что после записи пользователь читает с основной базы'
+        )
+        assert admin_client.get(url).json()['count'] == 0, (
+            'Проверьте, что остальные пользователи читают с реплики'
+        )
+
+    def test_pin_expires(self, user_client, replica, title, settings):
+        settings.DB_REPLICA_PIN_SECONDS = 0
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        user_client.post(url, {'text': 'a', 'score': 8})
+        assert user_client.get(url).json()['count'] == 0
+
+    def test_recent_write_is_not_cached(self, client, replica, genres):
+        client.get('/api/v1/categories/')
+        Category.objects.create(name='Книги', slug='books')
+        response = client.get('/api/v1/categories/')
+        assert 'ETag' not in response
+        Category.objects.using('replica').create(name='Книги', slug='books')
+        response = client.get('/api/v1/categories/')
+        assert response.json()['count'] == 2, (
+            'Проверьте, что ответ, собранный по отстающей реплике, '
+            'не попал в кэш'
+        )
+
+    def test_cached_user_keeps_alias(self, replica, user, monkeypatch):
+        request = Request(APIRequestFactory().get(
+            '/', HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        ))
+        # Как ReplicaMiddleware на время безопасного запроса.
+        monkeypatch.setattr(replicas._state, 'request', request._request,
+                            raising=False)
+        for _ in range(2):
+            authenticated, _ = CachedJWTAuthentication().authenticate(
+                request
+            )
+            assert authenticated._state.db == 'replica', (
+                'Проверьте, что пользователь из кэша помнит свою базу'
+            )
@@ -0,0 +1,60 @@
+from unittest import mock
+
+import pytest
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+
+from api.serializers import ReviewsSerializer
+from reviews.models import Review
+
+
+@pytest.mark.django_db
+class TestReviewCreate:
+
+    def test_single_round_trip(self, title, user_client):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        user_client.get(url)  # пользователь попадает в кэш аутентификации
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, {'text': 'a', 'score': 8})
+        assert response.status_code == 201
+        assert response.json()['title'] == title.id
+        statements = [
+            query['sql'].split()[0] for query in context.captured_queries
+            if 'SAVEPOINT' not in query['sql']
+        ]
+        assert statements == ['INSERT', 'UPDATE'], (
+            'Проверьте, что создание отзыва - это INSERT отзыва и UPDATE '
+            'рейтинга без дополнительных SELECT'
+        )
+        title.refresh_from_db()
+        assert (title.rating, title.review_count) == (8, 1)
+
+    def test_duplicate_is_400(self, title, user_client):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        user_client.post(url, {'text': 'a', 'score': 8})
+        response = user_client.post(url, {'text': 'b', 'score': 1})
+        assert response.status_code == 400
+        assert response.json() == {'non_field_errors': [
+            'Нельзя оставить отзыв на одно произведение дважды'
+        ]}
+        title.refresh_from_db()
+        assert (title.rating, title.review_count) == (8, 1)
+
+    def test_other_integrity_error_not_masked(self, title, user):
+        # Не всякая IntegrityError - повторный отзыв.
+        serializer = ReviewsSerializer(
+            data={'text': 'a', 'score': 8},
+            context={'request': mock.Mock(user=user)},
+        )
+        assert serializer.is_valid()
+        with mock.patch.object(
+            Review, 'save', side_effect=IntegrityError('NOT NULL')
+        ), pytest.raises(IntegrityError):
+            serializer.save(author=user, title_id=title.id)
+
+    def test_missing_title_is_404(self, user_client):
+        response = user_client.post(
+            '/api/v1/titles/999/reviews/', {'text': 'a', 'score': 8}
+        )
+        assert response.status_code == 404
+        assert not Review.objects.exists()
@@ -0,0 +1,90 @@
+import json
+import logging
+import time
+
+import pytest
+
+from api.projections import ReviewProjection
+from api.serializers import ReviewsSerializer
+from reviews.models import Review
+
+
+def timings(response):
+    result = {}
+    for part in response['Server-Timing'].split(', '):
+        name, duration = part.split(';')[:2]
+        result[name] = float(duration[len('dur='):])
+    return result
+
+
+@pytest.fixture
+def timing_on(settings):
+    settings.SERVER_TIMING = True
+
+
+@pytest.mark.django_db
+class TestServerTiming:
+
+    def test_disabled_by_default(self, client, title):
+        assert not client.get('/api/v1/titles/').has_header('Server-Timing')
+
+    def test_header(self, timing_on, user_client, title):
+        response = user_client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert response.status_code == 200
+        phases = timings(response)
+        assert set(phases) == {
+            'db', 'auth', 'serialize', 'app', 'render', 'total'
+        }, 'Проверьте фазы в заголовке Server-Timing'
+        assert phases['total'] >= phases['db'] + phases['render']
+        assert 'queries"' in response['Server-Timing']
+
+    @pytest.mark.parametrize('path,owner,method', [
+        ('/api/v1/titles/{title}/reviews/', ReviewProjection, 'represent'),
+        ('/api/v1/titles/{title}/reviews/{review}/', ReviewsSerializer,
+         'to_representation'),
+    ])
+    def test_serialize_phase(self, timing_on, client, title, user,
+                             monkeypatch, path, owner, method):
+        review = Review.objects.create(
+            title=title, author=user, text='отзыв', score=5
+        )
+        original = getattr(owner, method)
+
+        def slow(*args, **kwargs):
+            time.sleep(0.05)
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(owner, method, slow)
+        response = client.get(path.format(title=title.id, review=review.id))
+        assert response.status_code == 200
+        phases = timings(response)
+        assert phases['serialize'] >= 50, (
+            'Проверьте, что время сериализации попадает в фазу serialize'
+        )
+        assert phases['app'] < 50, (
+            'Проверьте, что сериализация не учитывается в фазе app'
+        )
+
+    def test_log_line(self, timing_on, client, title, caplog):
+        with caplog.at_level(logging.INFO, logger='api.timing'):
+            client.get('/api/v1/titles/')
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record['route'] == 'api:titles-list'
+        assert record['status'] == 200
+        assert record['queries'] >= 1
+        assert {'db_ms', 'auth_ms', 'serialize_ms', 'app_ms', 'render_ms',
+                'total_ms'} <= set(record)
+
+    def test_slow_threshold_per_route(self, timing_on, client, title,
+                                      settings, caplog):
+        settings.SERVER_TIMING_SLOW_ROUTES = {'api:titles-list': 0}
+        settings.SERVER_TIMING_SLOW_MS = 10 ** 6
+        with caplog.at_level(logging.INFO, logger='api.timing'):
+            client.get('/api/v1/titles/')
+            client.get('/api/v1/categories/')
+        titles, categories = caplog.records[-2:]
+        assert titles.levelno == logging.WARNING, (
+            'Проверьте, что медленный запрос пишется с уровнем WARNING'
+        )
+        assert json.loads(titles.getMessage())['slow'] is True
+        assert categories.levelno == logging.INFO
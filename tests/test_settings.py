@@ -1,3 +1,5 @@
+from importlib import import_module
+
 from api_yamdb import settings
 
 
@@ -6,6 +8,8 @@ class TestSettings:
     def test_settings(self):
 
         assert not settings.DEBUG, 'Проверьте, что DEBUG в настройках Django выключен'
-        assert settings.DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql', (
+        engine = settings.DATABASES['default']['ENGINE']
+        backend = import_module(f'{engine}.base').DatabaseWrapper
+        assert backend.vendor == 'postgresql', (
             'Проверьте, что используете базу данных postgresql'
         )
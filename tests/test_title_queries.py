@@ -0,0 +1,49 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.mark.django_db
+class TestTitleQueries:
+
+    @pytest.mark.parametrize('page_size', [10, 100, 1000])
+    def test_list_query_count(self, make_titles, django_assert_num_queries,
+                              page_size):
+        make_titles(page_size)
+        client = APIClient()
+        # COUNT(*), произведения с категориями, жанры всех произведений.
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/?limit={page_size}')
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert len(results) == page_size
+        assert all(len(title['genre']) == 2 for title in results), (
+            'Проверьте, что жанры произведений попадают в ответ'
+        )
+
+    @pytest.mark.parametrize('query', [
+        'genre=drama', 'category=films', 'genre=drama&category=films',
+    ])
+    def test_filtered_list_query_count(self, make_titles,
+                                       django_assert_num_queries, query):
+        make_titles(50)
+        client = APIClient()
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/?limit=100&{query}')
+        assert response.status_code == 200
+        assert response.json()['count'] == 50
+
+    def test_retrieve_query_count(self, title, django_assert_num_queries):
+        client = APIClient()
+        with django_assert_num_queries(2):
+            response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 200
+        assert len(response.json()['genre']) == 2
+
+    def test_category_exact_slug(self, make_titles):
+        make_titles(3)
+        client = APIClient()
+        exact = client.get('/api/v1/titles/?category=films').json()
+        partial = client.get('/api/v1/titles/?category=fil').json()
+        assert (exact['count'], partial['count']) == (3, 0), (
+            'Проверьте, что фильтр category сравнивает slug целиком'
+        )
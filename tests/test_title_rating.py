@@ -0,0 +1,64 @@
+import pytest
+from django.core.management import call_command
+from django.db.models import Avg
+
+from reviews.models import Review, Title
+
+
+def _aggregates(title):
+    title.refresh_from_db()
+    expected = title.reviews.aggregate(Avg('score'))['score__avg']
+    return title.rating, title.review_count, expected
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def test_rating_follows_reviews(self, title, user, admin):
+        assert _aggregates(title)[:2] == (None, 0), (
+            'Проверьте, что у произведения без отзывов нет рейтинга'
+        )
+        Review.objects.create(title=title, author=user, text='a', score=7)
+        review = Review.objects.create(
+            title=title, author=admin, text='b', score=8
+        )
+        rating, count, expected = _aggregates(title)
+        assert (rating, count) == (expected, 2), (
+            'Проверьте, что создание отзыва обновляет рейтинг произведения'
+        )
+
+        review = Review.objects.get(pk=review.pk)
+        review.score = 10
+        review.save()
+        rating, count, expected = _aggregates(title)
+        assert (rating, count) == (expected, 2) and rating == 8.5, (
+            'Проверьте, что изменение оценки обновляет рейтинг произведения'
+        )
+
+        review.delete()
+        assert _aggregates(title)[:2] == (7, 1), (
+            'Проверьте, что удаление отзыва обновляет рейтинг произведения'
+        )
+        Review.objects.all().delete()
+        assert _aggregates(title)[:2] == (None, 0), (
+            'Проверьте, что после удаления всех отзывов рейтинг сбрасывается'
+        )
+
+    def test_rating_matches_avg(self, title, django_user_model):
+        for number, score in enumerate((7, 7, 8, 1, 10, 3)):
+            author = django_user_model.objects.create(username=f'u{number}')
+            Review.objects.create(
+                title=title, author=author, text='text', score=score
+            )
+            rating, count, expected = _aggregates(title)
+            assert rating == expected and count == number + 1, (
+                'Проверьте, что хранимый рейтинг совпадает с AVG(score)'
+            )
+
+    def test_rebuild_ratings(self, title, user):
+        Review.objects.create(title=title, author=user, text='a', score=4)
+        Title.objects.update(rating=None, review_count=0)
+        call_command('rebuild_ratings')
+        assert _aggregates(title)[:2] == (4, 1), (
+            'Проверьте, что rebuild_ratings пересчитывает рейтинги'
+        )
@@ -0,0 +1,34 @@
+import pytest
+from rest_framework.test import APIClient
+
+from reviews.models import Title
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    def test_search_by_relevance(self, category):
+        in_description = Title.objects.create(
+            name='Другое', year=2000, category=category,
+            description='Фильм про космос',
+        )
+        in_name = Title.objects.create(
+            name='Космос', year=2000, category=category,
+        )
+        Title.objects.create(name='Море', year=2000, category=category)
+
+        response = APIClient().get('/api/v1/titles/?search=осмо')
+        assert response.status_code == 200
+        ids = [title['id'] for title in response.json()['results']]
+        assert ids == [in_name.id, in_description.id], (
+            'Проверьте, что search ищет по названию и описанию и '
+            'ставит совпадения в названии выше'
+        )
+
+    def test_search_with_filters(self, category, genres, make_titles):
+        make_titles(5)
+        response = APIClient().get(
+            '/api/v1/titles/?search=Произведение 3&genre=drama'
+        )
+        names = [title['name'] for title in response.json()['results']]
+        assert names == ['Произведение 3']
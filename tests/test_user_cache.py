@@ -0,0 +1,60 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review
+
+
+def _user_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return [
+        query for query in context.captured_queries
+        if 'FROM "users_user"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+
+    def test_user_loaded_once(self, title, user_client):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        assert len(_user_queries(user_client, url)) == 1
+        assert len(_user_queries(user_client, url)) == 0, (
+            'Проверьте, что повторный запрос не читает пользователя из базы'
+        )
+
+    def test_role_change_invalidates(self, title, admin, user, admin_client,
+                                     user_client):
+        review = Review.objects.create(
+            title=title, author=admin, text='a', score=5
+        )
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/'
+        assert user_client.patch(url, {'text': 'b'}).status_code == 403
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', {'role': 'moderator'}
+        )
+        assert response.status_code == 200
+        assert user_client.patch(url, {'text': 'b'}).status_code == 200, (
+            'Проверьте, что смена роли сбрасывает кэш пользователя'
+        )
+
+    def test_deactivation_invalidates(self, user, user_client):
+        assert user_client.get('/api/v1/users/me/').status_code == 200
+        user.is_active = False
+        user.save()
+        assert user_client.get('/api/v1/users/me/').status_code == 401
+
+    def test_benchmark(self, user):
+        out = StringIO()
+        call_command('bench_auth', '--requests', '10', stdout=out)
+        lines = out.getvalue().splitlines()
+        assert len(lines) == 3
+        assert lines[2].split()[0] == 'CachedJWTAuthentication'
+        assert float(lines[2].split()[3]) == 0, (
+            'Проверьте, что с кэшем аутентификация не ходит в базу'
+        )